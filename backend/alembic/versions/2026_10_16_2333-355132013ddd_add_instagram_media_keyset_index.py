@@ -0,0 +1,38 @@
+"""add instagram media keyset index
+
+Revision ID: 355132013ddd
+Revises: 55fc51571caf
+Create Date: 2026-10-16 23:33:14.056943
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '355132013ddd'
+down_revision = '55fc51571caf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination index for (timestamp, id) ordered media pages.
+    # Built concurrently so large media tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_instagram_media_account_timestamp_id',
+            'instagram_media',
+            ['account_id', sa.text('timestamp DESC NULLS LAST'), sa.text('id DESC')],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_instagram_media_account_timestamp_id',
+            table_name='instagram_media',
+            postgresql_concurrently=True
+        ) 
\ No newline at end of file
@@ -0,0 +1,52 @@
+"""add metrics snapshot tables
+
+Revision ID: 46564243932e
+Revises: 355132013ddd
+Create Date: 2026-10-16 23:35:16.553834
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '46564243932e'
+down_revision = '355132013ddd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Append-only snapshot tables, range-partitioned by month on captured_at.
+    # Monthly partitions are created on demand at ingest time.
+    op.create_table('instagram_media_metrics_snapshots',
+    sa.Column('media_id', sa.Integer(), nullable=False),
+    sa.Column('captured_at', sa.DateTime(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('like_count', sa.Integer(), nullable=False),
+    sa.Column('comments_count', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('media_id', 'captured_at'),
+    postgresql_partition_by='RANGE (captured_at)'
+    )
+    op.create_index('ix_instagram_media_metrics_snapshots_captured_at', 'instagram_media_metrics_snapshots', ['captured_at'], unique=False, postgresql_using='brin')
+    op.create_index('ix_instagram_media_metrics_snapshots_account_captured', 'instagram_media_metrics_snapshots', ['account_id', 'captured_at'], unique=False)
+    op.create_table('instagram_account_metrics_snapshots',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('captured_at', sa.DateTime(), nullable=False),
+    sa.Column('followers_count', sa.Integer(), nullable=False),
+    sa.Column('following_count', sa.Integer(), nullable=False),
+    sa.Column('media_count', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.PrimaryKeyConstraint('account_id', 'captured_at'),
+    postgresql_partition_by='RANGE (captured_at)'
+    )
+    op.create_index('ix_instagram_account_metrics_snapshots_captured_at', 'instagram_account_metrics_snapshots', ['captured_at'], unique=False, postgresql_using='brin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_instagram_account_metrics_snapshots_captured_at', table_name='instagram_account_metrics_snapshots')
+    op.drop_table('instagram_account_metrics_snapshots')
+    op.drop_index('ix_instagram_media_metrics_snapshots_account_captured', table_name='instagram_media_metrics_snapshots')
+    op.drop_index('ix_instagram_media_metrics_snapshots_captured_at', table_name='instagram_media_metrics_snapshots')
+    op.drop_table('instagram_media_metrics_snapshots') 
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""add account growth rollup tables
+
+Revision ID: fa507011a7db
+Revises: 46564243932e
+Create Date: 2026-10-16 23:40:22.922860
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa507011a7db'
+down_revision = '46564243932e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Daily and weekly growth rollups, maintained incrementally at ingest time
+    for table, period in (
+        ('instagram_account_daily_rollups', 'day'),
+        ('instagram_account_weekly_rollups', 'week_start'),
+    ):
+        op.create_table(table,
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column(period, sa.Date(), nullable=False),
+        sa.Column('posts', sa.Integer(), nullable=False),
+        sa.Column('likes', sa.BigInteger(), nullable=False),
+        sa.Column('comments', sa.BigInteger(), nullable=False),
+        sa.Column('followers_count', sa.Integer(), nullable=True),
+        sa.Column('following_count', sa.Integer(), nullable=True),
+        sa.Column('media_count', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['account_id'], ['instagram_accounts.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('account_id', period)
+        )
+
+    # Backfill from existing media and account snapshots
+    op.execute("""
+        INSERT INTO instagram_account_daily_rollups (account_id, day, posts, likes, comments, updated_at)
+        SELECT account_id, CAST(timestamp AS date), count(*),
+               sum(COALESCE(like_count, 0)), sum(COALESCE(comments_count, 0)), timezone('utc', now())
+        FROM instagram_media
+        WHERE timestamp IS NOT NULL
+        GROUP BY 1, 2
+    """)
+    op.execute("""
+        INSERT INTO instagram_account_daily_rollups (
+            account_id, day, posts, likes, comments,
+            followers_count, following_count, media_count, updated_at
+        )
+        SELECT DISTINCT ON (account_id, CAST(captured_at AS date))
+            account_id, CAST(captured_at AS date), 0, 0, 0,
+            followers_count, following_count, media_count, timezone('utc', now())
+        FROM instagram_account_metrics_snapshots
+        ORDER BY account_id, CAST(captured_at AS date), captured_at DESC
+        ON CONFLICT (account_id, day) DO UPDATE SET
+            followers_count = EXCLUDED.followers_count,
+            following_count = EXCLUDED.following_count,
+            media_count = EXCLUDED.media_count
+    """)
+    op.execute("""
+        INSERT INTO instagram_account_weekly_rollups (
+            account_id, week_start, posts, likes, comments,
+            followers_count, following_count, media_count, updated_at
+        )
+        SELECT
+            account_id, CAST(date_trunc('week', day) AS date),
+            sum(posts), sum(likes), sum(comments),
+            (array_agg(followers_count ORDER BY day DESC) FILTER (WHERE followers_count IS NOT NULL))[1],
+            (array_agg(following_count ORDER BY day DESC) FILTER (WHERE following_count IS NOT NULL))[1],
+            (array_agg(media_count ORDER BY day DESC) FILTER (WHERE media_count IS NOT NULL))[1],
+            timezone('utc', now())
+        FROM instagram_account_daily_rollups
+        GROUP BY 1, 2
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('instagram_account_weekly_rollups')
+    op.drop_table('instagram_account_daily_rollups') 
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""add content performance percentiles
+
+Revision ID: aff02277a42b
+Revises: fa507011a7db
+Create Date: 2026-10-16 23:41:37.849451
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'aff02277a42b'
+down_revision = 'fa507011a7db'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Cached per-account metric distributions for percentile lookups
+    op.create_table('instagram_content_percentiles',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('breakpoints', postgresql.ARRAY(sa.Float()), nullable=False),
+    sa.Column('posts', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['instagram_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('account_id', 'metric')
+    )
+
+    # Media type + date range filtering for content performance rankings.
+    # Built concurrently so large media tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_instagram_media_account_type_timestamp',
+            'instagram_media',
+            ['account_id', 'media_type', 'timestamp'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_instagram_media_account_type_timestamp',
+            table_name='instagram_media',
+            postgresql_concurrently=True
+        )
+    op.drop_table('instagram_content_percentiles') 
\ No newline at end of file
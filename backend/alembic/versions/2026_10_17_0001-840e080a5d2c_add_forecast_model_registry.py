@@ -0,0 +1,37 @@
+"""add forecast model registry
+
+Revision ID: 840e080a5d2c
+Revises: aff02277a42b
+Create Date: 2026-10-17 00:01:31.572616
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '840e080a5d2c'
+down_revision = 'aff02277a42b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Versioned fitted forecast model parameters per account
+    op.create_table('instagram_forecast_models',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('model', sa.String(length=30), nullable=False),
+    sa.Column('params', sa.LargeBinary(), nullable=False),
+    sa.Column('params_format', sa.SmallInteger(), nullable=False),
+    sa.Column('history_days', sa.Integer(), nullable=False),
+    sa.Column('observations', sa.Integer(), nullable=False),
+    sa.Column('fitted_through', sa.Date(), nullable=False),
+    sa.Column('fitted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['instagram_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('account_id', 'version')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('instagram_forecast_models') 
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""add posting time histograms
+
+Revision ID: 249aaf138f77
+Revises: 840e080a5d2c
+Create Date: 2026-10-17 00:07:49.592873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '249aaf138f77'
+down_revision = '840e080a5d2c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Decay-weighted hour-of-week engagement histograms, maintained incrementally at ingest time
+    op.create_table('instagram_posting_time_histograms',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('weights', postgresql.ARRAY(sa.Float()), nullable=False),
+    sa.Column('interactions', postgresql.ARRAY(sa.Float()), nullable=False),
+    sa.Column('posts', postgresql.ARRAY(sa.Integer()), nullable=False),
+    sa.Column('decay_anchor', sa.DateTime(), nullable=False),
+    sa.Column('half_life_days', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['instagram_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('account_id')
+    )
+
+    # Backfill from existing media with the default 90 day half-life; accounts
+    # kept with another POSTING_TIMES_HALF_LIFE_DAYS are rebuilt on their next ingest
+    op.execute("""
+        WITH params AS (
+            SELECT date_trunc('second', timezone('utc', now())) AS anchor, CAST(90 AS float8) AS half_life_days
+        ),
+        bins AS (
+            SELECT
+                media.account_id,
+                (CAST(extract(isodow FROM media.timestamp) AS integer) - 1) * 24
+                    + CAST(extract(hour FROM media.timestamp) AS integer) AS slot,
+                sum(power(CAST(2 AS float8),
+                    CAST(extract(epoch FROM media.timestamp - params.anchor) AS float8)
+                        / (params.half_life_days * 86400))) AS weight,
+                sum(power(CAST(2 AS float8),
+                    CAST(extract(epoch FROM media.timestamp - params.anchor) AS float8)
+                        / (params.half_life_days * 86400))
+                    * (COALESCE(media.like_count, 0) + COALESCE(media.comments_count, 0))) AS interactions,
+                count(*) AS posts
+            FROM instagram_media AS media, params
+            WHERE media.timestamp IS NOT NULL
+            GROUP BY 1, 2
+        )
+        INSERT INTO instagram_posting_time_histograms (
+            account_id, weights, interactions, posts, decay_anchor, half_life_days, updated_at
+        )
+        SELECT
+            accounts.id,
+            array_agg(COALESCE(bins.weight, 0) ORDER BY slots.slot),
+            array_agg(COALESCE(bins.interactions, 0) ORDER BY slots.slot),
+            array_agg(CAST(COALESCE(bins.posts, 0) AS integer) ORDER BY slots.slot),
+            params.anchor, params.half_life_days, params.anchor
+        FROM instagram_accounts AS accounts
+        CROSS JOIN params
+        CROSS JOIN generate_series(0, 167) AS slots (slot)
+        LEFT JOIN bins ON bins.account_id = accounts.id AND bins.slot = slots.slot
+        GROUP BY accounts.id, params.anchor, params.half_life_days
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('instagram_posting_time_histograms')
@@ -0,0 +1,50 @@
+"""add caption term index
+
+Revision ID: f201e9d45e2b
+Revises: 249aaf138f77
+Create Date: 2026-10-17 00:12:13.648014
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f201e9d45e2b'
+down_revision = '249aaf138f77'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Caption term index, maintained incrementally at ingest time. Captions
+    # are tokenized in Python, so existing media are indexed by running
+    # `python -m app.cli rebuild-caption-index` after upgrading.
+    op.create_table('instagram_caption_terms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=100), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('posts', sa.Integer(), nullable=False),
+    sa.Column('interactions', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['account_id'], ['instagram_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_instagram_caption_terms_account_term', 'instagram_caption_terms', ['account_id', 'term'], unique=True)
+    op.create_table('instagram_caption_postings',
+    sa.Column('term_id', sa.Integer(), nullable=False),
+    sa.Column('media_id', sa.Integer(), nullable=False),
+    sa.Column('interactions', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['term_id'], ['instagram_caption_terms.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['media_id'], ['instagram_media.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('term_id', 'media_id')
+    )
+    op.create_index('ix_instagram_caption_postings_media_id', 'instagram_caption_postings', ['media_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_instagram_caption_postings_media_id', table_name='instagram_caption_postings')
+    op.drop_table('instagram_caption_postings')
+    op.drop_index('ix_instagram_caption_terms_account_term', table_name='instagram_caption_terms')
+    op.drop_table('instagram_caption_terms')
@@ -0,0 +1,38 @@
+"""add instagram media updated at index
+
+Revision ID: dc3b498c4c6e
+Revises: f201e9d45e2b
+Create Date: 2026-10-17 00:15:17.880481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'dc3b498c4c6e'
+down_revision = 'f201e9d45e2b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Lets similar post search read an account's posts changed since its vectors were built.
+    # Built concurrently so large media tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_instagram_media_account_updated_at',
+            'instagram_media',
+            ['account_id', 'updated_at'],
+            unique=False,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_instagram_media_account_updated_at',
+            table_name='instagram_media',
+            postgresql_concurrently=True
+        )
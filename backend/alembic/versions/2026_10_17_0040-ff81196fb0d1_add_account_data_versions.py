@@ -0,0 +1,28 @@
+"""add account data versions
+
+Revision ID: ff81196fb0d1
+Revises: dc3b498c4c6e
+Create Date: 2026-10-17 00:40:12.511922
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ff81196fb0d1'
+down_revision = 'dc3b498c4c6e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Bumped by ingests on commit; forecast models are refit when it moves past the one they were fitted at.
+    # Existing models have none recorded, so every account is refit once.
+    op.add_column('instagram_accounts', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('instagram_forecast_models', sa.Column('data_version', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('instagram_forecast_models', 'data_version')
+    op.drop_column('instagram_accounts', 'data_version')
@@ -0,0 +1,44 @@
+"""add content performance ranking indexes
+
+Revision ID: d5f6696667f4
+Revises: ff81196fb0d1
+Create Date: 2026-10-17 00:46:30.346633
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f6696667f4'
+down_revision = 'ff81196fb0d1'
+branch_labels = None
+depends_on = None
+
+# Index name -> ranking metric expression, as rendered by
+# app.crud.content.metric_expression
+RANKING_INDEXES = {
+    'ix_instagram_media_account_likes': 'COALESCE(like_count, 0)',
+    'ix_instagram_media_account_comments': 'COALESCE(comments_count, 0)',
+    'ix_instagram_media_account_engagement': '(COALESCE(like_count, 0) + COALESCE(comments_count, 0))',
+}
+
+
+def upgrade() -> None:
+    # Lets content performance read an account's top and bottom posts in index order instead of sorting them all.
+    # Built concurrently so large media tables stay writable during the migration.
+    with op.get_context().autocommit_block():
+        for name, expression in RANKING_INDEXES.items():
+            op.create_index(
+                name,
+                'instagram_media',
+                [sa.text('account_id'), sa.text(expression), sa.text('id')],
+                unique=False,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in RANKING_INDEXES:
+            op.drop_index(name, table_name='instagram_media', postgresql_concurrently=True)
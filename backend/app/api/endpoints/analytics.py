@@ -2,24 +2,146 @@
 Analytics endpoints.
 """
 
-from fastapi import APIRouter
+import logging
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import get_db, get_db_readonly
+from app.core.deps import get_current_active_user
+from app.crud.instagram import instagram_account_crud
+from app.models.user import User
+from app.core.cache import response_cache
+from app.core.constants import INSTAGRAM_MEDIA_TYPES
+from app.crud.content import CONTENT_METRICS
+from app.schemas.analytics import ContentPerformance, EngagementAnalytics, GrowthAnalytics
+from app.services.analytics import (
+    GRANULARITY_DAY,
+    get_content_performance as compute_content_performance,
+    get_engagement_analytics as compute_engagement_analytics,
+    get_growth_analytics as compute_growth_analytics
+)
+
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/engagement")
-async def get_engagement_analytics():
+@router.get("/engagement", response_model=EngagementAnalytics)
+async def get_engagement_analytics(
+    account_id: int = Query(..., description="Instagram account ID"),
+    days: int = Query(90, ge=1, le=3650, description="Days covered by the rolling series"),
+    window: int = Query(7, ge=1, le=365, description="Rolling average window in days"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
     """Get engagement analytics data."""
-    return {"message": "Engagement analytics endpoint - to be implemented"}
+    # Verify account ownership
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+
+    async def compute() -> EngagementAnalytics:
+        analytics = await compute_engagement_analytics(
+            db, account_id, account.followers_count or 0, days=days, window=window
+        )
+        logger.info(f"Computed engagement analytics over {analytics.totals.posts} posts for account {account_id}")
+        return analytics
+
+    return await response_cache.get_or_compute(
+        "analytics:engagement", current_user.id, {account.id: account.data_version},
+        {"days": days, "window": window},
+        compute, EngagementAnalytics
+    )
+
+
+@router.get("/growth", response_model=GrowthAnalytics)
+async def get_growth_analytics(
+    account_id: int = Query(..., description="Instagram account ID"),
+    start: Optional[date] = Query(None, description="First day of the range, defaults to 90 days before end"),
+    end: Optional[date] = Query(None, description="Last day of the range (UTC), defaults to today"),
+    granularity: str = Query(GRANULARITY_DAY, pattern="^(day|week)$", description="Series granularity"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
+    """Get growth analytics data from the daily or weekly rollups."""
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must not be after end"
+        )
+    if (end - start).days >= 3660:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Date range must not exceed 3660 days"
+        )
+
+    # Verify account ownership
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+
+    return await response_cache.get_or_compute(
+        "analytics:growth", current_user.id, {account.id: account.data_version},
+        {"start": start, "end": end, "granularity": granularity},
+        lambda: compute_growth_analytics(db, account_id, start, end, granularity),
+        GrowthAnalytics
+    )
+
+
+@router.get("/content-performance", response_model=ContentPerformance)
+async def get_content_performance(
+    account_id: int = Query(..., description="Instagram account ID"),
+    metric: str = Query("engagement", description=f"Ranking metric: {', '.join(CONTENT_METRICS)}"),
+    limit: int = Query(10, ge=1, le=100, description="Number of top and bottom posts"),
+    media_type: Optional[str] = Query(None, description="Only rank this media type"),
+    start: Optional[date] = Query(None, description="Only rank posts published on or after this day (UTC)"),
+    end: Optional[date] = Query(None, description="Only rank posts published on or before this day (UTC)"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get the top and bottom performing posts of an account.
 
+    Uses the primary, as stale percentile tables are recomputed and stored.
+    """
+    if metric not in CONTENT_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid metric, expected one of: {', '.join(CONTENT_METRICS)}"
+        )
+    if media_type and media_type not in INSTAGRAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid media_type, expected one of: {', '.join(INSTAGRAM_MEDIA_TYPES)}"
+        )
 
-@router.get("/growth")
-async def get_growth_analytics():
-    """Get growth analytics data."""
-    return {"message": "Growth analytics endpoint - to be implemented"}
+    # Verify account ownership
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
 
+    async def compute() -> ContentPerformance:
+        performance = await compute_content_performance(
+            db, account_id, account.followers_count or 0,
+            metric=metric, limit=limit, media_type=media_type, start=start, end=end
+        )
+        await db.commit()
+        return performance
 
-@router.get("/content-performance")
-async def get_content_performance():
-    """Get content performance analytics."""
-    return {"message": "Content performance endpoint - to be implemented"} 
\ No newline at end of file
+    return await response_cache.get_or_compute(
+        "analytics:content-performance", current_user.id, {account.id: account.data_version},
+        {"metric": metric, "limit": limit, "media_type": media_type, "start": start, "end": end},
+        compute, ContentPerformance
+    )
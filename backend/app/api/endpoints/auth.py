@@ -7,7 +7,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.exceptions import ServiceBusyError
+from app.core.security import verify_password_async, create_access_token
 from app.core.deps import get_current_active_user
 from app.crud.user import user_crud
 from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
@@ -39,6 +40,8 @@ async def register(
     # Create new user
     try:
         db_user = await user_crud.create(db, user_data)
+    except ServiceBusyError:
+        raise
     except Exception:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -58,7 +61,7 @@ async def login(
     # Find user by email or username
     user = await user_crud.get_by_login(db, credentials.login)
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not user or not await verify_password_async(credentials.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect login credentials",
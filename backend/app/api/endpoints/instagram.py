@@ -8,22 +8,26 @@ This module provides limited functionality using existing database data only.
 import logging
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_db, get_db_readonly
 from app.core.deps import get_current_active_user
+from app.core.query_budget import set_query_budget
+from app.core.responses import ORJSONResponse
 from app.models.user import User
 from app.schemas.instagram import (
     InstagramOAuthURL,
     InstagramOAuthCallback,
     InstagramAccountResponse,
-    InstagramMediaResponse,
+    InstagramMediaPage,
     InstagramUserProfile,
-    InstagramAccountCreate
+    InstagramAccountCreate,
+    InstagramExportImportResult
 )
-from app.crud.instagram import instagram_account_crud, instagram_media_crud
+from app.crud.instagram import MEDIA_RESPONSE_FIELDS, instagram_account_crud, instagram_media_crud
 from app.services.instagram import instagram_service
+from app.services.instagram_export import import_instagram_export
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -71,7 +75,7 @@ async def instagram_oauth_callback(
 @router.get("/accounts", response_model=List[InstagramAccountResponse])
 async def get_instagram_accounts(
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_readonly)
 ):
     """
     Get user's Instagram accounts (LIMITED FUNCTIONALITY).
@@ -94,7 +98,7 @@ async def get_instagram_accounts(
 async def get_instagram_account(
     account_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_readonly)
 ):
     """
     Get specific Instagram account (LIMITED FUNCTIONALITY).
@@ -102,9 +106,9 @@ async def get_instagram_account(
     Instagram Basic Display API was deprecated on December 4, 2024.
     This endpoint returns existing account data but it is no longer connected.
     """
-    account = await instagram_account_crud.get_by_id(db, account_id)
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
     
-    if not account or account.user_id != current_user.id:
+    if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram account not found"
@@ -124,22 +128,15 @@ async def disconnect_instagram_account(
     db: AsyncSession = Depends(get_db)
 ):
     """Delete Instagram account from database."""
-    account = await instagram_account_crud.get_by_id(db, account_id)
+    # Ownership is checked by the DELETE itself
+    success = await instagram_account_crud.delete(db, account_id, user_id=current_user.id)
     
-    if not account or account.user_id != current_user.id:
+    if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram account not found"
         )
     
-    success = await instagram_account_crud.delete(db, account_id)
-    
-    if not success:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to delete Instagram account"
-        )
-    
     logger.info(f"Deleted Instagram account {account_id} for user {current_user.id}")
     return {"message": "Instagram account deleted successfully"}
 
@@ -159,8 +156,8 @@ async def sync_instagram_data(
     logger.warning(f"Attempt to sync deprecated Instagram account {account_id}")
     
     # Verify account ownership
-    account = await instagram_account_crud.get_by_id(db, account_id)
-    if not account or account.user_id != current_user.id:
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram account not found"
@@ -174,42 +171,89 @@ async def sync_instagram_data(
     )
 
 
-@router.get("/accounts/{account_id}/media", response_model=List[InstagramMediaResponse])
+@router.post("/accounts/{account_id}/import", response_model=InstagramExportImportResult)
+async def import_instagram_data_export(
+    account_id: int,
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Import media from an Instagram "Download Your Information" export.
+
+    Accepts the export ZIP archive or a single posts_N.json / reels.json file.
+    The upload is parsed incrementally and upserted on instagram_media_id, so
+    importing the same export again does not create duplicates.
+    """
+    # Verify account ownership
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+
+    # Imports run a few statements per COPY chunk, so they are exempt from the query budget
+    set_query_budget(0)
+    try:
+        result = await import_instagram_export(db, account_id, file.file, file.filename or "")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid Instagram data export: {str(e)}"
+        )
+
+    logger.info(f"Imported {result.imported} media items from data export for account {account_id}")
+    return result
+
+
+@router.get("/accounts/{account_id}/media", response_model=InstagramMediaPage)
 async def get_instagram_media(
     account_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_db_readonly),
     limit: int = Query(25, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor")
 ):
     """
     Get Instagram media for account (HISTORICAL DATA ONLY).
     
     Instagram Basic Display API was deprecated on December 4, 2024.
     This endpoint returns existing media from database but no new data can be fetched.
+    Results are newest first; pass `next_cursor` back as `cursor` to get the next page.
+    Rows are serialized directly, since the query already matches InstagramMediaPage.
     """
-    # Verify account ownership
-    account = await instagram_account_crud.get_by_id(db, account_id)
-    if not account or account.user_id != current_user.id:
+    # Get media from database only - no API calls possible. Ownership is
+    # checked in the same query as the page fetch.
+    try:
+        page = await instagram_media_crud.get_owned_page(
+            db, account_id, current_user.id, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    if page is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram account not found"
         )
-    
-    # Get media from database only - no API calls possible
-    media = await instagram_media_crud.get_by_account_id(
-        db, account_id, limit=limit, offset=offset
-    )
+    media, next_cursor = page
     
     logger.info(f"Retrieved {len(media)} historical Instagram media items for account {account_id}")
-    return media
+    return ORJSONResponse({
+        "items": [dict(zip(MEDIA_RESPONSE_FIELDS, row)) for row in media],
+        "next_cursor": next_cursor
+    })
 
 
 @router.get("/accounts/{account_id}/profile", response_model=InstagramUserProfile)
 async def get_instagram_profile(
     account_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db_readonly)
 ):
     """
     Get Instagram user profile (HISTORICAL DATA ONLY).
@@ -218,8 +262,8 @@ async def get_instagram_profile(
     This endpoint returns cached profile data from database only.
     """
     # Verify account ownership
-    account = await instagram_account_crud.get_by_id(db, account_id)
-    if not account or account.user_id != current_user.id:
+    account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+    if not account:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Instagram account not found"
@@ -2,24 +2,180 @@
 Predictions endpoints.
 """
 
-from fastapi import APIRouter
+import logging
+from datetime import datetime
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import response_cache
+from app.core.config import settings
+from app.core.database import get_db_readonly
+from app.core.deps import get_current_active_user
+from app.crud.captions import caption_index_crud
+from app.crud.instagram import instagram_account_crud, instagram_media_crud
+from app.crud.posting_times import posting_time_crud
+from app.models.user import User
+from app.schemas.predictions import ContentRecommendations, EngagementForecast, OptimalPostingTimes, SimilarMedia
+from app.services.forecasting import get_engagement_forecast as compute_engagement_forecast
+from app.services.model_registry import model_registry
+from app.services.posting_times import get_optimal_posting_times as compute_optimal_posting_times
+from app.services.recommendations import get_content_recommendations as compute_content_recommendations
+from app.services.similarity import get_similar_posts as compute_similar_posts, similarity_index
+
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-@router.get("/engagement-forecast")
-async def get_engagement_forecast():
-    """Get engagement forecast predictions."""
-    return {"message": "Engagement forecast endpoint - to be implemented"}
+@router.get("/engagement-forecast", response_model=EngagementForecast)
+async def get_engagement_forecast(
+    account_id: Optional[int] = Query(None, description="Only forecast this Instagram account"),
+    days: int = Query(
+        settings.PREDICTION_WINDOW_DAYS, ge=1, le=90, description="Forecast horizon in days"
+    ),
+    history_days: int = Query(
+        settings.PREDICTION_HISTORY_DAYS, ge=28, le=730, description="Days of history the models are fitted on"
+    ),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
+    """
+    Get daily interactions forecasts with prediction intervals.
+
+    Stored models from the registry are used when fitted on `history_days`;
+    other accounts (or all of them for a custom `history_days`) are fitted
+    in one batch for this request.
+    """
+    if account_id is not None:
+        account = await instagram_account_crud.get_owned(db, account_id, current_user.id)
+        if not account:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Instagram account not found"
+            )
+        accounts = [account]
+    else:
+        accounts = await instagram_account_crud.get_by_user_id(db, current_user.id)
+
+    account_ids = [account.id for account in accounts]
+    models = {}
+    if history_days == settings.PREDICTION_HISTORY_DAYS:
+        models = await model_registry.get_models(db, account_ids)
+
+    async def compute() -> EngagementForecast:
+        forecast = await compute_engagement_forecast(
+            db, accounts, days, history_days, settings.PREDICTION_INTERVAL_LEVEL, models,
+            fitter=model_registry.fit
+        )
+        logger.info(f"Forecast engagement of {len(accounts)} accounts for user {current_user.id}")
+        return forecast
+
+    # Forecasts start today and change with retrained models, so both are part of the key
+    return await response_cache.get_or_compute(
+        "predictions:engagement-forecast", current_user.id,
+        {account.id: account.data_version for account in accounts},
+        {
+            "days": days,
+            "history_days": history_days,
+            "as_of": datetime.utcnow().date(),
+            "models": {account_id: model.version for account_id, model in models.items()},
+        },
+        compute, EngagementForecast
+    )
+
+
+@router.get("/optimal-posting-times", response_model=OptimalPostingTimes)
+async def get_optimal_posting_times(
+    account_id: int = Query(..., description="Instagram account to rank posting times for"),
+    timezone: str = Query("UTC", description="IANA timezone the hours are reported in"),
+    top: int = Query(5, ge=1, le=24, description="Number of best times to return"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
+    """
+    Get the best hours of the week to post, from the account's posting time histogram.
+
+    The histogram is maintained on ingest, so this reads one row and does no
+    per-post work.
+    """
+    try:
+        ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown timezone: {timezone}"
+        )
+
+    owned = await posting_time_crud.get_owned(db, account_id, current_user.id)
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+    account, histogram = owned
+    return compute_optimal_posting_times(account, histogram, timezone, top)
+
+
+@router.get("/content-recommendations", response_model=ContentRecommendations)
+async def get_content_recommendations(
+    account_id: int = Query(..., description="Instagram account to recommend caption terms for"),
+    kind: Optional[str] = Query(None, pattern="^(hashtag|mention|word)$", description="Only this kind of term"),
+    min_posts: int = Query(
+        settings.CONTENT_TERMS_MIN_POSTS, ge=1, description="Minimum posts a term must appear in"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Number of terms to return"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
+    """
+    Get the hashtags, mentions and caption words that lift engagement most.
+
+    Ranked from the caption term index maintained on ingest.
+    """
+    owned = await caption_index_crud.get_owned(db, account_id, current_user.id)
+    if not owned:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram account not found"
+        )
+    account, totals = owned
+
+    return await response_cache.get_or_compute(
+        "predictions:content-recommendations", current_user.id, {account.id: account.data_version},
+        {"kind": kind, "min_posts": min_posts, "limit": limit},
+        lambda: compute_content_recommendations(db, account, totals, kind, min_posts, limit),
+        ContentRecommendations
+    )
+
 
+@router.get("/similar-posts", response_model=SimilarMedia)
+async def get_similar_posts(
+    media_id: int = Query(..., description="Post to find similar posts to"),
+    limit: int = Query(10, ge=1, le=50, description="Number of posts to return"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db_readonly)
+):
+    """
+    Get the account's posts whose captions are most similar to a post, with their engagement.
 
-@router.get("/optimal-posting-times")
-async def get_optimal_posting_times():
-    """Get optimal posting times predictions."""
-    return {"message": "Optimal posting times endpoint - to be implemented"}
+    Ranked by cosine similarity of caption TF-IDF vectors.
+    """
+    account_id = await instagram_media_crud.get_owned_account_id(db, media_id, current_user.id)
+    if account_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Instagram media not found"
+        )
 
+    if not await similarity_index.is_built(account_id):
+        # Not cached, the response says indexing until the background build finishes
+        return await compute_similar_posts(db, account_id, media_id, limit)
 
-@router.get("/content-recommendations")
-async def get_content_recommendations():
-    """Get content recommendations based on predictions."""
-    return {"message": "Content recommendations endpoint - to be implemented"} 
\ No newline at end of file
+    return await response_cache.get_or_compute(
+        "predictions:similar-posts", current_user.id,
+        await instagram_account_crud.get_data_versions(db, [account_id]),
+        {"media_id": media_id, "limit": limit},
+        lambda: compute_similar_posts(db, account_id, media_id, limit),
+        SimilarMedia
+    )
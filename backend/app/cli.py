@@ -0,0 +1,161 @@
+"""
+Command line entry point for maintenance tasks.
+
+Usage:
+    python -m app.cli import-export ACCOUNT_ID PATH
+    python -m app.cli metrics-retention
+    python -m app.cli rebuild-rollups [ACCOUNT_ID]
+    python -m app.cli rebuild-posting-times [ACCOUNT_ID]
+    python -m app.cli rebuild-caption-index [ACCOUNT_ID]
+    python -m app.cli rebuild-similarity-index [ACCOUNT_ID]
+    python -m app.cli retrain-models
+"""
+
+import argparse
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.database import AsyncSessionLocal
+from app.crud.captions import caption_index_crud
+from app.crud.instagram import instagram_account_crud
+from app.crud.posting_times import posting_time_crud
+from app.crud.rollups import account_rollup_crud
+from app.schemas.instagram import InstagramMediaBulkLoadResult
+from app.services.instagram_export import import_instagram_export
+from app.services.metrics_retention import retention_scheduler
+from app.services.model_registry import model_registry
+from app.services.similarity import similarity_index
+
+
+async def import_export(account_id: int, path: str) -> None:
+    """Import an Instagram data export file into an existing account."""
+    def report(progress: InstagramMediaBulkLoadResult) -> None:
+        print(f"  {progress.rows} rows imported ({progress.rows_per_second:.0f} rows/s)")
+
+    async with AsyncSessionLocal() as db:
+        if not await instagram_account_crud.get_by_id(db, account_id):
+            raise SystemExit(f"Instagram account {account_id} not found")
+
+        with open(path, "rb") as source:
+            result = await import_instagram_export(db, account_id, source, path, on_progress=report)
+
+    print(
+        f"Imported {result.imported} of {result.posts} posts "
+        f"({result.skipped} skipped) in {result.seconds:.1f}s"
+    )
+
+
+async def metrics_retention() -> None:
+    """Downsample and expire metrics snapshots."""
+    stats = await retention_scheduler.apply()
+    if stats is None:
+        raise SystemExit("Metrics retention is already running in another process")
+    print(
+        f"Downsampled {stats['hourly']} hourly and {stats['daily']} daily buckets, "
+        f"dropped {stats['dropped_partitions']} partitions"
+    )
+
+
+async def rebuild_rollups(account_id: Optional[int]) -> None:
+    """Rebuild the growth rollups of one account, or all accounts."""
+    async with AsyncSessionLocal() as db:
+        buckets = await account_rollup_crud.rebuild(db, account_id)
+    print(f"Rebuilt {buckets} daily rollup buckets")
+
+
+async def rebuild_posting_times(account_id: Optional[int]) -> None:
+    """Rebuild the posting time histograms of one account, or all accounts."""
+    async with AsyncSessionLocal() as db:
+        histograms = await posting_time_crud.rebuild(db, account_id)
+    print(f"Rebuilt {histograms} posting time histograms")
+
+
+async def rebuild_caption_index(account_id: Optional[int]) -> None:
+    """Rebuild the caption term index of one account, or all accounts."""
+    async with AsyncSessionLocal() as db:
+        posts = await caption_index_crud.rebuild(db, account_id)
+    print(f"Indexed captions of {posts} posts")
+
+
+async def rebuild_similarity_index(account_id: Optional[int]) -> None:
+    """Rebuild the stored caption vectors of one account, or all accounts."""
+    async with AsyncSessionLocal() as db:
+        accounts = await similarity_index.rebuild(db, account_id)
+    print(f"Rebuilt caption vectors of {accounts} accounts")
+
+
+async def retrain_models() -> None:
+    """Refit the forecast models of accounts with missing or stale models."""
+    fitted = await model_registry.retrain_stale()
+    print(f"Retrained {fitted} forecast models")
+
+
+def main() -> None:
+    """Parse arguments and run the requested command."""
+    parser = argparse.ArgumentParser(description="Instagram analytics maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser(
+        "import-export", help="Import an Instagram 'Download Your Information' export"
+    )
+    import_parser.add_argument("account_id", type=int, help="Instagram account ID in this database")
+    import_parser.add_argument("path", help="Path to the export ZIP or posts JSON file")
+
+    subparsers.add_parser(
+        "metrics-retention", help="Apply the metrics snapshot downsampling and retention policy"
+    )
+
+    rollups_parser = subparsers.add_parser(
+        "rebuild-rollups", help="Rebuild the daily and weekly growth rollups from raw data"
+    )
+    rollups_parser.add_argument(
+        "account_id", type=int, nargs="?", help="Only rebuild this Instagram account"
+    )
+
+    posting_times_parser = subparsers.add_parser(
+        "rebuild-posting-times", help="Rebuild the hour-of-week posting time histograms from media"
+    )
+    posting_times_parser.add_argument(
+        "account_id", type=int, nargs="?", help="Only rebuild this Instagram account"
+    )
+
+    captions_parser = subparsers.add_parser(
+        "rebuild-caption-index", help="Rebuild the caption hashtag, mention and word index from media"
+    )
+    captions_parser.add_argument(
+        "account_id", type=int, nargs="?", help="Only rebuild this Instagram account"
+    )
+
+    similarity_parser = subparsers.add_parser(
+        "rebuild-similarity-index", help="Rebuild the stored caption vectors used by similar post search"
+    )
+    similarity_parser.add_argument(
+        "account_id", type=int, nargs="?", help="Only rebuild this Instagram account"
+    )
+
+    subparsers.add_parser(
+        "retrain-models", help="Refit forecast models that are missing or fitted on outdated data"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "import-export":
+        asyncio.run(import_export(args.account_id, args.path))
+    elif args.command == "metrics-retention":
+        asyncio.run(metrics_retention())
+    elif args.command == "rebuild-rollups":
+        asyncio.run(rebuild_rollups(args.account_id))
+    elif args.command == "rebuild-posting-times":
+        asyncio.run(rebuild_posting_times(args.account_id))
+    elif args.command == "rebuild-caption-index":
+        asyncio.run(rebuild_caption_index(args.account_id))
+    elif args.command == "rebuild-similarity-index":
+        asyncio.run(rebuild_similarity_index(args.account_id))
+    elif args.command == "retrain-models":
+        asyncio.run(retrain_models())
+
+
+if __name__ == "__main__":
+    main()
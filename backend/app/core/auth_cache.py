@@ -0,0 +1,56 @@
+"""
+Per-process caches for request authentication.
+
+Every authenticated request decodes its JWT and loads the user, and a single
+dashboard load fires many requests with the same token. Decoded tokens are
+cached by token hash (never past their expiry) and users by id, so hot paths
+skip both the signature verification and the users lookup.
+
+Caches are local to each worker: user_crud invalidates the entry of the
+worker making a change and AUTH_CACHE_TTL_SECONDS bounds how long other
+workers can serve the previous state.
+"""
+
+import hashlib
+import time
+from typing import Any, Dict, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.user import UserInDB
+
+# sha256(token) -> decoded payload
+token_cache: TTLCache[Dict[str, Any]] = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+# user id -> user
+user_cache: TTLCache[UserInDB] = TTLCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def token_key(token: str) -> str:
+    """Cache key of a token, so raw tokens are not kept in memory longer than needed."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def get_cached_token(token: str) -> Optional[Dict[str, Any]]:
+    """Get the cached payload of a previously verified token."""
+    return token_cache.get(token_key(token))
+
+
+def cache_token(token: str, payload: Dict[str, Any]) -> None:
+    """Cache a verified token payload until the token expires at the latest."""
+    expires_at = payload.get("exp")
+    ttl = expires_at - time.time() if isinstance(expires_at, (int, float)) else None
+    token_cache.set(token_key(token), payload, ttl)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the cache after it was changed or deleted."""
+    user_cache.pop(user_id)
+
+
+def get_stats() -> Dict[str, Any]:
+    """Export auth cache counters for monitoring."""
+    return {
+        "tokens": token_cache.get_stats(),
+        "users": user_cache.get_stats(),
+    }
@@ -0,0 +1,348 @@
+"""
+Response cache for heavy analytics and prediction endpoints.
+
+Entries are keyed by namespace, user, account, the account's data version and
+a hash of the request parameters. The data version is the
+instagram_accounts.data_version column, bumped in the transaction of every
+ingest. Callers read it in the session the response is computed from, so an
+entry is never keyed on a version newer than the data it was computed on
+(e.g. on a lagging replica), and entries computed from older data are never
+served again and simply age out through their TTL.
+
+Redis is the shared backend. When it is unreachable the cache degrades to an
+in-process LRU until Redis is retried. Any CacheBackend can be plugged in, e.g.
+ResponseCache(MemoryCacheBackend()) for a fully local in-memory cache.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, Mapping, Optional, Tuple, Type, TypeVar
+
+import redis.asyncio as redis
+from pydantic import BaseModel
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+ValueT = TypeVar("ValueT")
+
+KEY_PREFIX = "cache"
+
+# How often a request waiting for another worker's computation polls for its result
+LOCK_POLL_INTERVAL = 0.05
+
+
+class ComputeCancelledError(Exception):
+    """The request computing a response was cancelled before finishing it."""
+
+
+class TTLCache(Generic[ValueT]):
+    """Size-bounded in-process LRU mapping with per-entry expiry and hit/miss counters."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, ValueT]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[ValueT]:
+        """Get a value, None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: ValueT, ttl: Optional[float] = None) -> None:
+        """Store a value for `ttl` seconds (the cache default when omitted)."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Remove a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+        }
+
+
+class CacheBackend:
+    """Async key/value store interface used by ResponseCache."""
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Get a value, None if missing or expired."""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+        raise NotImplementedError
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store a value only if the key does not exist; returns whether it was stored."""
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """Remove a key."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release backend resources."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Size-bounded in-process LRU backend with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    def _lookup(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._lookup(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._store(key, value, ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        if self._lookup(key) is not None:
+            return False
+        self._store(key, value, ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis backend shared by all workers."""
+
+    def __init__(self, url: str, timeout: float):
+        # Connections are opened lazily on first use
+        self.client = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self.client.set(key, value, px=max(int(ttl * 1000), 1), nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(key)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class ResponseCache:
+    """
+    Versioned response cache with single-flight recomputation.
+
+    On a miss only one computation per key runs: concurrent requests in the
+    same process await it, and other processes wait on a short-lived lock key
+    in the backend for the result instead of recomputing it.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        fallback: Optional[MemoryCacheBackend] = None,
+        ttl: Optional[float] = None,
+        lock_timeout: Optional[float] = None,
+        retry_after: Optional[float] = None
+    ):
+        self.backend = backend
+        self.fallback = fallback or MemoryCacheBackend(settings.CACHE_LOCAL_MAX_ENTRIES)
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL_SECONDS
+        self.lock_timeout = lock_timeout if lock_timeout is not None else settings.CACHE_LOCK_TIMEOUT_SECONDS
+        self.retry_after = retry_after if retry_after is not None else settings.CACHE_REDIS_RETRY_SECONDS
+        self._backend_down_until = 0.0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "computes": 0,
+            "coalesced": 0,
+            "backend_errors": 0,
+            "fallback_operations": 0,
+        }
+
+    async def _call(self, operation: str, *args: Any) -> Any:
+        """Run a backend operation, using the local fallback while the backend is unavailable."""
+        if self.backend is not None and time.monotonic() >= self._backend_down_until:
+            try:
+                return await getattr(self.backend, operation)(*args)
+            except (RedisError, OSError) as e:
+                self.stats["backend_errors"] += 1
+                self._backend_down_until = time.monotonic() + self.retry_after
+                logger.warning(f"Cache backend unavailable, using local cache for {self.retry_after}s: {e}")
+        self.stats["fallback_operations"] += 1
+        return await getattr(self.fallback, operation)(*args)
+
+    @staticmethod
+    def make_key(
+        namespace: str,
+        user_id: int,
+        data_versions: Mapping[int, int],
+        params: Dict[str, Any]
+    ) -> str:
+        """Build the cache key of a response over the accounts in `data_versions`."""
+        account_ids = sorted(data_versions)
+        accounts = "-".join(map(str, account_ids))
+        versions = "-".join(str(data_versions[account_id]) for account_id in account_ids)
+        digest = hashlib.sha1(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{KEY_PREFIX}:{namespace}:u{user_id}:a{accounts}:v{versions}:{digest}"
+
+    async def get_or_compute(
+        self,
+        namespace: str,
+        user_id: int,
+        data_versions: Mapping[int, int],
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[ModelT]],
+        model: Type[ModelT],
+        ttl: Optional[float] = None
+    ) -> ModelT:
+        """
+        Get a cached response, computing and storing it on a miss.
+
+        `data_versions` maps every account the response covers to its data
+        version, read in the session `compute` uses and before it runs (see
+        InstagramAccountCRUD.get_data_versions), so new data in any of them
+        invalidates the entry.
+        """
+        if not settings.CACHE_ENABLED:
+            return await compute()
+
+        key = self.make_key(namespace, user_id, data_versions, params)
+        cached = await self._call("get", key)
+        if cached is not None:
+            self.stats["hits"] += 1
+            return model.model_validate_json(cached)
+        self.stats["misses"] += 1
+
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except ComputeCancelledError:
+                # The leading request went away; the first waiter to get here takes over
+                inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._compute_locked(key, compute, model, ttl if ttl is not None else self.ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # Cancelling the future would cancel the coalesced requests too
+            future.set_exception(ComputeCancelledError(key))
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved, there may be no coalesced waiters
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _compute_locked(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[ModelT]],
+        model: Type[ModelT],
+        ttl: float
+    ) -> ModelT:
+        """Compute a response under the backend lock, or wait for the worker holding it."""
+        lock_key = f"{key}:lock"
+        locked = await self._call("add", lock_key, b"1", self.lock_timeout)
+        if not locked:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                cached = await self._call("get", key)
+                if cached is not None:
+                    self.stats["coalesced"] += 1
+                    return model.model_validate_json(cached)
+            logger.warning(f"Timed out waiting for cache entry {key}, computing it")
+
+        try:
+            self.stats["computes"] += 1
+            value = await compute()
+            await self._call("set", key, value.model_dump_json().encode("utf-8"), ttl)
+            return value
+        finally:
+            if locked:
+                await self._call("delete", lock_key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export cache counters for monitoring."""
+        return {
+            **self.stats,
+            "backend": type(self.backend).__name__ if self.backend is not None else None,
+            "backend_available": time.monotonic() >= self._backend_down_until,
+            "local_entries": len(self.fallback._entries),
+        }
+
+    async def shutdown(self) -> None:
+        """Close the backend connections."""
+        if self.backend is not None:
+            await self.backend.close()
+
+
+# Shared cache instance
+response_cache = ResponseCache(
+    RedisCacheBackend(settings.REDIS_URL, settings.CACHE_REDIS_TIMEOUT_SECONDS)
+    if settings.CACHE_ENABLED else None
+)
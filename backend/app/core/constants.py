@@ -20,8 +20,13 @@ INSTAGRAM_ENDPOINTS = {
     "user_profile": f"{INSTAGRAM_API_BASE_URL}/me",
     "user_media": f"{INSTAGRAM_API_BASE_URL}/me/media",
     "media_details": f"{INSTAGRAM_API_BASE_URL}",  # + media_id
+    "batch": f"{INSTAGRAM_API_BASE_URL}",  # POST with batch=[...]
 }
 
+# Instagram API field selections
+INSTAGRAM_PROFILE_FIELDS = "id,username,account_type,media_count"
+INSTAGRAM_MEDIA_FIELDS = "id,media_type,media_url,permalink,caption,timestamp"
+
 # Instagram Media Types
 INSTAGRAM_MEDIA_TYPES = {
     "IMAGE": "IMAGE",
@@ -32,6 +37,10 @@ INSTAGRAM_MEDIA_TYPES = {
 # Pagination limits
 INSTAGRAM_DEFAULT_LIMIT = 25
 INSTAGRAM_MAX_LIMIT = 100
+INSTAGRAM_MEDIA_PREFETCH_PAGES = 2  # Pages buffered ahead of the consumer when streaming media
+
+# Graph API batch requests
+INSTAGRAM_BATCH_MAX_REQUESTS = 50  # Graph API limit of sub-requests per batch call
 
 # Token refresh settings
 INSTAGRAM_TOKEN_REFRESH_THRESHOLD_DAYS = 7  # Refresh token if expires within 7 days
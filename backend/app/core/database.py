@@ -2,22 +2,89 @@
 Database connection and session management.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import logging
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.query_budget import count_query
+from app.services.resilience import LatencyHistogram
+
+logger = logging.getLogger(__name__)
 
 # Create declarative base for models
 Base = declarative_base()
 
 
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records connection checkout waits and timeouts."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self.timeouts = 0
+        self.wait_seconds = LatencyHistogram()
+
+    def _exhausted(self) -> bool:
+        """Whether a checkout has to wait for a connection to be returned."""
+        return self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+
+    def _do_get(self):
+        # Checkouts that get an idle or new connection don't wait, and their connect time is not a wait
+        if not self._exhausted():
+            return super()._do_get()
+
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+            self.wait_seconds.observe(time.perf_counter() - started)
+
+
+def _connect_args() -> Dict[str, Any]:
+    """asyncpg connection arguments from settings."""
+    server_settings = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        server_settings["statement_timeout"] = str(settings.DB_STATEMENT_TIMEOUT_MS)
+    return {
+        # asyncpg's own statement cache and SQLAlchemy's prepared statement cache
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "server_settings": server_settings,
+    }
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    """Create an async PostgreSQL engine with the configured pool and query counting."""
+    db_engine = create_async_engine(
+        url.replace("postgresql://", "postgresql+asyncpg://"),
+        echo=settings.LOG_LEVEL == "DEBUG",
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args()
+    )
+    event.listen(db_engine.sync_engine, "before_cursor_execute", count_query)
+    return db_engine
+
+
 # Create async engine for PostgreSQL
-engine = create_async_engine(
-    settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://"),
-    echo=settings.LOG_LEVEL == "DEBUG",
-    future=True
-)
+engine = _create_engine(settings.DATABASE_URL)
 
 # Create async session factory
 AsyncSessionLocal = sessionmaker(
@@ -25,6 +92,67 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+class ReplicaRouter:
+    """
+    Picks the engine serving read-only sessions.
+
+    Healthy replicas are selected round-robin or by fewest checked-out
+    connections. A replica that fails to connect is skipped for
+    DB_REPLICA_RETRY_SECONDS; with no healthy replica the primary is used.
+    """
+
+    def __init__(self, primary: AsyncEngine, replicas: List[AsyncEngine], selection: str, retry_after: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.selection = selection
+        self.retry_after = retry_after
+        self._next = 0
+        self._down_until: Dict[AsyncEngine, float] = {}
+        self.sessions: Dict[str, int] = {"primary": 0, "replica": 0, "fallback": 0}
+        self.failures = 0
+
+    def healthy_replicas(self) -> List[AsyncEngine]:
+        """Replicas not currently skipped after a failure."""
+        now = time.monotonic()
+        return [replica for replica in self.replicas if self._down_until.get(replica, 0.0) <= now]
+
+    def candidates(self) -> List[AsyncEngine]:
+        """Healthy replicas in the order they should be tried."""
+        replicas = self.healthy_replicas()
+        if not replicas:
+            return []
+        if self.selection == "least_connections":
+            return sorted(replicas, key=lambda replica: replica.pool.checkedout())
+        start = self._next % len(replicas)
+        self._next += 1
+        return replicas[start:] + replicas[:start]
+
+    def mark_failed(self, replica: AsyncEngine, error: Exception) -> None:
+        """Skip a replica for a while after it failed."""
+        self.failures += 1
+        self._down_until[replica] = time.monotonic() + self.retry_after
+        logger.warning(f"Read replica {replica.url.host} unavailable, skipping it for {self.retry_after}s: {error}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export routing counters for monitoring."""
+        healthy = self.healthy_replicas()
+        return {
+            "replicas": len(self.replicas),
+            "healthy_replicas": len(healthy),
+            "selection": self.selection,
+            "sessions": dict(self.sessions),
+            "failures": self.failures,
+        }
+
+
+replica_router = ReplicaRouter(
+    engine,
+    [_create_engine(url) for url in settings.DATABASE_REPLICA_URLS],
+    settings.DB_REPLICA_SELECTION,
+    settings.DB_REPLICA_RETRY_SECONDS
+)
+
+
 async def get_db() -> AsyncSession:
     """
     Dependency to get database session.
@@ -33,4 +161,60 @@ async def get_db() -> AsyncSession:
         try:
             yield session
         finally:
-            await session.close() 
\ No newline at end of file
+            await session.close()
+
+
+async def get_db_readonly() -> AsyncSession:
+    """
+    Dependency to get a database session for read-only endpoints.
+
+    The session is bound to a read replica when one is configured and
+    reachable, otherwise to the primary. Replicas may lag the primary, so
+    writes and read-your-writes paths must use get_db.
+    """
+    for replica in replica_router.candidates():
+        session = AsyncSessionLocal(bind=replica)
+        try:
+            # Check out the connection now so an unreachable replica falls back
+            await session.connection()
+        except (OSError, DBAPIError, PoolTimeoutError) as e:
+            await session.close()
+            replica_router.mark_failed(replica, e)
+            continue
+        replica_router.sessions["replica"] += 1
+        try:
+            yield session
+        finally:
+            await session.close()
+        return
+
+    replica_router.sessions["fallback" if replica_router.replicas else "primary"] += 1
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def _engine_pool_stats(db_engine: AsyncEngine) -> Dict[str, Any]:
+    """Export connection pool usage of one engine."""
+    pool = db_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "waiting": pool.waiting,
+        "timeouts": pool.timeouts,
+        "wait_seconds": pool.wait_seconds.to_dict(),
+    }
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Export connection pool usage for monitoring."""
+    return {
+        **_engine_pool_stats(engine),
+        "replicas": [_engine_pool_stats(replica) for replica in replica_router.replicas],
+        "replica_routing": replica_router.get_stats(),
+    }
@@ -8,6 +8,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.auth_cache import cache_token, get_cached_token, user_cache
 from app.core.database import get_db
 from app.core.security import verify_token
 from app.models.user import User
@@ -23,6 +24,9 @@ async def get_current_user(
 ) -> UserInDB:
     """
     Dependency to get current authenticated user.
+
+    Decoded tokens and users are served from the per-process auth caches
+    when possible.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -31,14 +35,21 @@ async def get_current_user(
     )
     
     # Verify token
-    payload = verify_token(credentials.credentials)
+    payload = get_cached_token(credentials.credentials)
     if payload is None:
-        raise credentials_exception
+        payload = verify_token(credentials.credentials)
+        if payload is None:
+            raise credentials_exception
+        cache_token(credentials.credentials, payload)
     
     user_id: Optional[int] = payload.get("sub")
     if user_id is None:
         raise credentials_exception
     
+    cached_user = user_cache.get(int(user_id))
+    if cached_user is not None:
+        return cached_user
+    
     # Get user from database
     result = await db.execute(select(User).where(User.id == int(user_id)))
     user = result.scalar_one_or_none()
@@ -46,7 +57,9 @@ async def get_current_user(
     if user is None:
         raise credentials_exception
     
-    return UserInDB.model_validate(user)
+    current_user = UserInDB.model_validate(user)
+    user_cache.set(current_user.id, current_user)
+    return current_user
 
 
 async def get_current_active_user(
@@ -2,11 +2,58 @@
 Custom exception handlers for the application.
 """
 
+from typing import Optional
+
 from fastapi import HTTPException, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
 
 
+class InstagramAPIError(Exception):
+    """Base error for failed Instagram API calls."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, endpoint: Optional[str] = None):
+        super().__init__(f"Instagram API error: {message}")
+        self.status_code = status_code
+        self.endpoint = endpoint
+
+
+class InstagramClientError(InstagramAPIError):
+    """Instagram API rejected the request (4xx other than rate limiting)."""
+
+
+class InstagramAuthError(InstagramClientError):
+    """Access token is invalid, expired or lacks permissions."""
+
+
+class InstagramRateLimitError(InstagramAPIError):
+    """Instagram API rate limit was hit."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, **kwargs):
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class InstagramServerError(InstagramAPIError):
+    """Instagram API failed on its side (5xx) or could not be reached."""
+
+
+class InstagramCircuitOpenError(InstagramAPIError):
+    """Requests to an endpoint are short-circuited while the API is degraded."""
+
+
+class ServiceBusyError(Exception):
+    """A bounded worker pool is saturated, the request should be retried later."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QueryBudgetExceededError(Exception):
+    """A request ran more SQL queries than DB_QUERY_BUDGET allows."""
+
+
 async def integrity_error_handler(request: Request, exc: IntegrityError) -> JSONResponse:
     """Handle SQLAlchemy IntegrityError exceptions."""
     return JSONResponse(
@@ -20,4 +67,24 @@ async def general_exception_handler(request: Request, exc: Exception) -> JSONRes
     return JSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
-    ) 
\ No newline at end of file
+    )
+
+
+async def instagram_api_error_handler(request: Request, exc: InstagramAPIError) -> JSONResponse:
+    """Handle Instagram API errors."""
+    if isinstance(exc, InstagramRateLimitError):
+        headers = {"Retry-After": str(int(exc.retry_after))} if exc.retry_after else None
+        return JSONResponse(status_code=429, content={"detail": str(exc)}, headers=headers)
+    if isinstance(exc, InstagramCircuitOpenError):
+        return JSONResponse(status_code=503, content={"detail": str(exc)})
+    if isinstance(exc, InstagramAuthError):
+        # Instagram rejected the user's token, so the client has to reconnect the account
+        status_code = exc.status_code if exc.status_code in (401, 403) else 401
+        return JSONResponse(status_code=status_code, content={"detail": str(exc)})
+    return JSONResponse(status_code=502, content={"detail": str(exc)})
+
+
+async def service_busy_error_handler(request: Request, exc: ServiceBusyError) -> JSONResponse:
+    """Handle saturated worker pools."""
+    headers = {"Retry-After": str(int(exc.retry_after))} if exc.retry_after else None
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers=headers)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Per-request SQL query counting.
+
+Every statement sent through the database engines is counted against the
+request that issued it. Requests running more than DB_QUERY_BUDGET queries
+are logged, or fail with QueryBudgetExceededError when DB_QUERY_BUDGET_MODE
+is "raise", which makes N+1 patterns visible in tests.
+"""
+
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.exceptions import QueryBudgetExceededError
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+
+
+class RequestQueryCounter:
+    """SQL queries run while handling one request."""
+
+    def __init__(self, method: str, path: str, budget: int):
+        self.method = method
+        self.path = path
+        self.budget = budget
+        self.count = 0
+
+
+_current_counter: ContextVar[Optional[RequestQueryCounter]] = ContextVar("request_query_counter", default=None)
+
+# Process-wide totals for monitoring
+_stats: Dict[str, int] = {"requests": 0, "queries": 0, "over_budget": 0, "max_queries": 0}
+
+
+def count_query(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+    """before_cursor_execute listener counting a query against the current request."""
+    counter = _current_counter.get()
+    if counter is None:
+        return
+    counter.count += 1
+    if (
+        settings.DB_QUERY_BUDGET_MODE == "raise"
+        and counter.budget > 0
+        and counter.count > counter.budget
+    ):
+        raise QueryBudgetExceededError(
+            f"{counter.method} {counter.path} exceeded its budget of {counter.budget} SQL queries"
+        )
+
+
+def set_query_budget(budget: int) -> None:
+    """Override the query budget of the current request, 0 to disable the check."""
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.budget = budget
+
+
+def get_stats() -> Dict[str, Any]:
+    """Export query counting totals for monitoring."""
+    return {
+        **_stats,
+        "budget": settings.DB_QUERY_BUDGET,
+        "mode": settings.DB_QUERY_BUDGET_MODE,
+        "avg_queries": round(_stats["queries"] / _stats["requests"], 3) if _stats["requests"] else 0.0,
+    }
+
+
+class QueryCounterMiddleware:
+    """
+    ASGI middleware tracking the SQL queries of each HTTP request.
+
+    The count is returned in the X-DB-Query-Count response header.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counter = RequestQueryCounter(scope["method"], scope["path"], settings.DB_QUERY_BUDGET)
+        token = _current_counter.set(counter)
+
+        async def send_with_count(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(QUERY_COUNT_HEADER, str(counter.count))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            _current_counter.reset(token)
+            _stats["requests"] += 1
+            _stats["queries"] += counter.count
+            _stats["max_queries"] = max(_stats["max_queries"], counter.count)
+            if counter.budget > 0 and counter.count > counter.budget:
+                _stats["over_budget"] += 1
+                logger.warning(
+                    f"{counter.method} {counter.path} ran {counter.count} SQL queries, "
+                    f"budget is {counter.budget}"
+                )
@@ -0,0 +1,23 @@
+"""
+JSON response classes.
+"""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response serialized with orjson.
+
+    Used as the application's default response class. orjson natively
+    handles datetimes, dates, dataclasses and NumPy values, so endpoints can
+    return rows fetched as tuples without building Pydantic models first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
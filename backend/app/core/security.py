@@ -2,17 +2,81 @@
 Security utilities for JWT tokens and password hashing.
 """
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.exceptions import ServiceBusyError
+
+T = TypeVar("T")
 
 # Password hashing context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded thread pool so hashing never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so threads are enough to keep the
+    loop responsive. At most PASSWORD_HASH_WORKERS hashes run at once and at
+    most PASSWORD_HASH_MAX_PENDING calls may be queued; beyond that calls fail
+    fast with ServiceBusyError instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a hashing function in the pool."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ServiceBusyError("Too many concurrent authentication requests", retry_after=1)
+        loop = asyncio.get_running_loop()
+        future = self.executor.submit(func, *args)
+        self.pending += 1
+        # Release the slot when the hash finishes, not when the caller stops waiting for it:
+        # a cancelled request leaves bcrypt running in the pool
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self) -> None:
+        self.pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the pool threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export pool counters for monitoring."""
+        return {
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_PENDING)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     return pwd_context.verify(plain_password, hashed_password)
@@ -23,6 +87,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop."""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop."""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -0,0 +1,376 @@
+"""
+CRUD operations for the caption inverted index.
+
+Captions are tokenized once, at ingest time, into hashtags, mentions and
+words. Each account's terms keep a posting list of the posts using them with
+the posts' interactions, plus running totals so terms can be ranked without
+touching the postings. Postings are replaced per post on every upsert; the
+media row locks taken by the upsert serialize concurrent updates of a post.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Row, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.rollups import InstagramCaptionPosting, InstagramCaptionTerm
+
+logger = logging.getLogger(__name__)
+
+TERMS_TABLE = InstagramCaptionTerm.__tablename__
+POSTINGS_TABLE = InstagramCaptionPosting.__tablename__
+
+# Term kinds
+KIND_HASHTAG = "hashtag"
+KIND_MENTION = "mention"
+KIND_WORD = "word"
+KIND_POSTS = "posts"
+
+# Reserved term every indexed post is posted under, holding the account totals
+POSTS_TERM = ""
+
+MAX_TERM_LENGTH = 100
+MIN_WORD_LENGTH = 3
+
+# Not preceded by a word character, so e-mail addresses and anchors are not matched
+HASHTAG_PATTERN = re.compile(r"(?<!\w)#(\w+)")
+MENTION_PATTERN = re.compile(r"(?<!\w)@([\w.]*\w)")
+WORD_PATTERN = re.compile(rf"[^\W\d_]{{{MIN_WORD_LENGTH},}}")
+
+STOP_WORDS = frozenset("""
+    about after again all also and any are because been before being but can could did does
+    doing down for from had has have having her here hers him his how into its just more most
+    not now off once only other our ours out over own same she should some such than that the
+    their them then there these they this those through too under until very was were what
+    when where which while who whom why will with would you your yours
+""".split())
+
+# Media batches indexed per round trip by rebuild()
+REBUILD_BATCH_SIZE = 5000
+
+# (media_id, account_id, caption, likes + comments) of one post
+MediaCaption = Tuple[int, int, Optional[str], int]
+
+MEDIA_CAPTION_COLUMNS = (
+    InstagramMedia.id,
+    InstagramMedia.account_id,
+    InstagramMedia.caption,
+    func.coalesce(InstagramMedia.like_count, 0) + func.coalesce(InstagramMedia.comments_count, 0),
+)
+
+# Removes the postings of the given media, returning what they contributed
+DELETE_POSTINGS_SQL = f"""
+DELETE FROM {POSTINGS_TABLE} AS postings
+USING {TERMS_TABLE} AS terms
+WHERE postings.media_id = ANY(CAST(:media_ids AS integer[]))
+  AND terms.id = postings.term_id
+RETURNING terms.account_id, terms.term, postings.interactions
+"""
+
+# Applies per-term deltas in key order, so concurrent ingests cannot deadlock
+UPSERT_TERMS_SQL = f"""
+INSERT INTO {TERMS_TABLE} AS terms (account_id, term, kind, posts, interactions, updated_at)
+SELECT account_id, term, kind, posts, interactions, timezone('utc', now())
+FROM unnest(
+    CAST(:account_ids AS integer[]),
+    CAST(:terms AS varchar[]),
+    CAST(:kinds AS varchar[]),
+    CAST(:posts AS integer[]),
+    CAST(:interactions AS bigint[])
+) AS deltas (account_id, term, kind, posts, interactions)
+ORDER BY account_id, term
+ON CONFLICT (account_id, term) DO UPDATE SET
+    posts = terms.posts + EXCLUDED.posts,
+    interactions = terms.interactions + EXCLUDED.interactions,
+    updated_at = EXCLUDED.updated_at
+RETURNING id, account_id, term
+"""
+
+INSERT_POSTINGS_SQL = f"""
+INSERT INTO {POSTINGS_TABLE} (term_id, media_id, interactions)
+SELECT * FROM unnest(
+    CAST(:term_ids AS integer[]),
+    CAST(:media_ids AS integer[]),
+    CAST(:interactions AS integer[])
+)
+"""
+
+DELETE_EMPTY_TERMS_SQL = f"""
+DELETE FROM {TERMS_TABLE}
+WHERE id = ANY(CAST(:term_ids AS integer[])) AND posts <= 0
+"""
+
+# Terms ranked by mean interactions per post, shrunk towards the account mean
+# by :prior posts' worth of it; reads the totals only, never the postings
+TOP_TERMS_SQL = f"""
+SELECT terms.term, terms.kind, terms.posts, terms.interactions
+FROM {TERMS_TABLE} AS terms
+WHERE terms.account_id = :account_id
+  AND terms.kind <> '{KIND_POSTS}'
+  AND terms.posts >= :min_posts
+  AND (CAST(:kind AS varchar) IS NULL OR terms.kind = :kind)
+ORDER BY (terms.interactions + CAST(:prior AS float8) * CAST(:mean AS float8))
+    / (terms.posts + CAST(:prior AS float8)) DESC, terms.posts DESC, terms.term
+LIMIT :limit
+"""
+
+# Term postings of all of an account's posts as column arrays, with the
+# number of posts each term appears in and the account's indexed posts. The
+# first column is the start of the snapshot's transaction, in UTC.
+ACCOUNT_TERM_VECTORS_SQL = f"""
+SELECT
+    timezone('utc', transaction_timestamp()),
+    (SELECT posts FROM {TERMS_TABLE} WHERE account_id = :account_id AND term = '{POSTS_TERM}'),
+    COALESCE(array_agg(postings.media_id), '{{}}'),
+    COALESCE(array_agg(postings.term_id), '{{}}'),
+    COALESCE(array_agg(terms.posts), '{{}}')
+FROM {TERMS_TABLE} AS terms
+JOIN {POSTINGS_TABLE} AS postings ON postings.term_id = terms.id
+WHERE terms.account_id = :account_id AND terms.kind <> '{KIND_POSTS}'
+"""
+
+# Same for the posts updated after :since, also listing those posts
+CHANGED_TERM_VECTORS_SQL = f"""
+WITH changed AS (
+    SELECT id FROM instagram_media WHERE account_id = :account_id AND updated_at > :since
+)
+SELECT
+    (SELECT COALESCE(array_agg(id), '{{}}') FROM changed),
+    (SELECT posts FROM {TERMS_TABLE} WHERE account_id = :account_id AND term = '{POSTS_TERM}'),
+    COALESCE(array_agg(postings.media_id), '{{}}'),
+    COALESCE(array_agg(postings.term_id), '{{}}'),
+    COALESCE(array_agg(terms.posts), '{{}}')
+FROM changed
+JOIN {POSTINGS_TABLE} AS postings ON postings.media_id = changed.id
+JOIN {TERMS_TABLE} AS terms ON terms.id = postings.term_id
+WHERE terms.kind <> '{KIND_POSTS}'
+"""
+
+
+def tokenize_caption(caption: Optional[str]) -> List[str]:
+    """
+    Split a caption into terms, in order and with repeats.
+
+    Hashtags and mentions keep their prefix (#tag, @user); the remaining text
+    yields lowercased words of MIN_WORD_LENGTH or more letters that are not
+    stop words.
+    """
+    if not caption:
+        return []
+    lowered = caption.lower()
+    terms = [f"#{tag}" for tag in HASHTAG_PATTERN.findall(lowered)]
+    terms += [f"@{user}" for user in MENTION_PATTERN.findall(lowered)]
+    remainder = MENTION_PATTERN.sub(" ", HASHTAG_PATTERN.sub(" ", lowered))
+    terms += [word for word in WORD_PATTERN.findall(remainder) if word not in STOP_WORDS]
+    return [term[:MAX_TERM_LENGTH] for term in terms]
+
+
+def caption_terms(caption: Optional[str]) -> Set[str]:
+    """Get the distinct terms of a caption."""
+    return set(tokenize_caption(caption))
+
+
+def term_kind(term: str) -> str:
+    """Get the kind of an index term."""
+    if term == POSTS_TERM:
+        return KIND_POSTS
+    if term.startswith("#"):
+        return KIND_HASHTAG
+    if term.startswith("@"):
+        return KIND_MENTION
+    return KIND_WORD
+
+
+def media_caption(media: InstagramMedia) -> MediaCaption:
+    """Get the index entry of a media entity."""
+    return media.id, media.account_id, media.caption, (media.like_count or 0) + (media.comments_count or 0)
+
+
+class CaptionIndexCRUD:
+    """CRUD operations for the per-account caption term index."""
+
+    @staticmethod
+    async def index_media(db: AsyncSession, media: Iterable[MediaCaption]) -> int:
+        """
+        Replace the postings of the given media with ones from their current
+        captions and interactions, updating the term totals by the difference.
+
+        Must run after the media rows were written in the same transaction,
+        so their row locks are held. Runs in the caller's transaction; the
+        caller commits. Returns the number of postings written.
+        """
+        media = list(media)
+        if not media:
+            return 0
+
+        # (account_id, term) -> [posts, interactions]
+        deltas: Dict[Tuple[int, str], List[int]] = defaultdict(lambda: [0, 0])
+        removed = await db.execute(text(DELETE_POSTINGS_SQL), {"media_ids": [entry[0] for entry in media]})
+        for account_id, term, interactions in removed.all():
+            delta = deltas[(account_id, term)]
+            delta[0] -= 1
+            delta[1] -= interactions
+
+        postings: List[Tuple[Tuple[int, str], int, int]] = []
+        for media_id, account_id, caption, interactions in media:
+            for term in caption_terms(caption) | {POSTS_TERM}:
+                key = (account_id, term)
+                delta = deltas[key]
+                delta[0] += 1
+                delta[1] += interactions
+                postings.append((key, media_id, interactions))
+
+        keys = list(deltas)
+        result = await db.execute(
+            text(UPSERT_TERMS_SQL),
+            {
+                "account_ids": [account_id for account_id, _ in keys],
+                "terms": [term for _, term in keys],
+                "kinds": [term_kind(term) for _, term in keys],
+                "posts": [deltas[key][0] for key in keys],
+                "interactions": [deltas[key][1] for key in keys],
+            }
+        )
+        term_ids = {(account_id, term): term_id for term_id, account_id, term in result.all()}
+
+        await db.execute(
+            text(INSERT_POSTINGS_SQL),
+            {
+                "term_ids": [term_ids[key] for key, _, _ in postings],
+                "media_ids": [media_id for _, media_id, _ in postings],
+                "interactions": [interactions for _, _, interactions in postings],
+            }
+        )
+
+        # Terms whose last post just lost them
+        emptied = [term_ids[key] for key, delta in deltas.items() if delta[0] < 0]
+        if emptied:
+            await db.execute(text(DELETE_EMPTY_TERMS_SQL), {"term_ids": emptied})
+        return len(postings)
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, account_id: Optional[int] = None) -> int:
+        """
+        Rebuild the caption index of one account, or all accounts, from media.
+
+        Used to backfill the index for media ingested before it existed.
+        Returns the number of posts indexed.
+        """
+        terms_delete = delete(InstagramCaptionTerm)
+        media_query = select(*MEDIA_CAPTION_COLUMNS).order_by(InstagramMedia.id).limit(REBUILD_BATCH_SIZE)
+        if account_id is not None:
+            terms_delete = terms_delete.where(InstagramCaptionTerm.account_id == account_id)
+            media_query = media_query.where(InstagramMedia.account_id == account_id)
+
+        indexed = 0
+        try:
+            await db.execute(terms_delete)
+            last_id = 0
+            while True:
+                result = await db.execute(media_query.where(InstagramMedia.id > last_id))
+                batch = list(result.all())
+                if not batch:
+                    break
+                await CaptionIndexCRUD.index_media(db, batch)
+                indexed += len(batch)
+                last_id = batch[-1][0]
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        logger.info(f"Indexed captions of {indexed} posts")
+        return indexed
+
+    @staticmethod
+    async def get_owned(
+        db: AsyncSession, account_id: int, user_id: int
+    ) -> Optional[Tuple[InstagramAccount, Optional[InstagramCaptionTerm]]]:
+        """
+        Get an account owned by a user with its index totals, in one query.
+
+        Returns None if the account does not exist or belongs to another user;
+        the totals are None until the account has indexed posts.
+        """
+        result = await db.execute(
+            select(InstagramAccount, InstagramCaptionTerm)
+            .outerjoin(
+                InstagramCaptionTerm,
+                (InstagramCaptionTerm.account_id == InstagramAccount.id)
+                & (InstagramCaptionTerm.term == POSTS_TERM)
+            )
+            .where(InstagramAccount.id == account_id, InstagramAccount.user_id == user_id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+    @staticmethod
+    async def get_top_terms(
+        db: AsyncSession,
+        account_id: int,
+        mean: float,
+        prior: float,
+        min_posts: int,
+        limit: int,
+        kind: Optional[str] = None
+    ) -> List[Row]:
+        """
+        Get an account's terms with the highest smoothed mean interactions.
+
+        Each term's mean is blended with `prior` posts' worth of `mean`, the
+        account mean. Rows are (term, kind, posts, interactions).
+        """
+        result = await db.execute(
+            text(TOP_TERMS_SQL),
+            {
+                "account_id": account_id,
+                "mean": mean,
+                "prior": prior,
+                "min_posts": min_posts,
+                "limit": limit,
+                "kind": kind,
+            }
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def get_indexed_account_ids(db: AsyncSession) -> List[int]:
+        """Get the ids of accounts with indexed posts."""
+        result = await db.scalars(
+            select(InstagramCaptionTerm.account_id)
+            .where(InstagramCaptionTerm.term == POSTS_TERM)
+            .order_by(InstagramCaptionTerm.account_id)
+        )
+        return list(result.all())
+
+    @staticmethod
+    async def get_term_vectors(db: AsyncSession, account_id: int) -> Row:
+        """
+        Get the term postings of all of an account's posts in one query.
+
+        Returns (snapshot_started, posts, media_ids, term_ids, term_posts):
+        when the snapshot's transaction started, the account's indexed posts, and one array element per posting with the
+        number of posts using its term.
+        """
+        result = await db.execute(text(ACCOUNT_TERM_VECTORS_SQL), {"account_id": account_id})
+        return result.one()
+
+    @staticmethod
+    async def get_changed_term_vectors(db: AsyncSession, account_id: int, since: datetime) -> Row:
+        """
+        Get the term postings of an account's posts updated after `since`.
+
+        Returns (changed_media_ids, posts, media_ids, term_ids, term_posts);
+        changed posts without terms are only listed in changed_media_ids.
+        """
+        result = await db.execute(text(CHANGED_TERM_VECTORS_SQL), {"account_id": account_id, "since": since})
+        return result.one()
+
+
+# Create instance to use in endpoints
+caption_index_crud = CaptionIndexCRUD()
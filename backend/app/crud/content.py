@@ -0,0 +1,202 @@
+"""
+CRUD operations for content performance rankings and percentile tables.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Float, cast, delete, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.instagram import InstagramMedia
+from app.models.rollups import InstagramContentPercentiles
+
+logger = logging.getLogger(__name__)
+
+# Metrics whose distribution is stored in the percentile table. Engagement per
+# follower ranks exactly like engagement, so it reuses that distribution.
+PERCENTILE_METRICS = ["likes", "comments", "engagement", "velocity"]
+
+# Ranking metric -> metric of the percentile table it is looked up in
+CONTENT_METRICS = {
+    "likes": "likes",
+    "comments": "comments",
+    "engagement": "engagement",
+    "engagement_rate": "engagement",
+    "velocity": "velocity",
+}
+
+# Percentile table resolution: the metric value at 0, 1, ..., 100 percent
+PERCENTILE_FRACTIONS = [step / 100 for step in range(101)]
+
+SECONDS_PER_DAY = 86400
+
+
+def metric_expression(metric: str, now: datetime) -> ColumnElement:
+    """
+    SQL expression of a base metric for a media row.
+
+    Velocity is interactions per day since publication, counting posts
+    younger than a day as one day old. The others match the expressions of
+    the ix_instagram_media_account_<metric> indexes, so the 0 is inlined
+    rather than bound for the planner to use them.
+    """
+    likes = func.coalesce(InstagramMedia.like_count, literal_column("0"))
+    comments = func.coalesce(InstagramMedia.comments_count, literal_column("0"))
+    if metric == "likes":
+        return likes
+    if metric == "comments":
+        return comments
+    if metric == "engagement":
+        return likes + comments
+    if metric == "velocity":
+        # Kept in float8 throughout, numeric division is several times slower
+        age_days = func.date_part("epoch", literal(now) - InstagramMedia.timestamp, type_=Float) / float(SECONDS_PER_DAY)
+        return cast(likes + comments, Float) / func.greatest(age_days, 1.0, type_=Float)
+    raise ValueError(f"Unknown content metric: {metric}")
+
+
+def percentile_rank(breakpoints: List[float], value: float) -> Optional[float]:
+    """
+    Percentile rank (0-100) of `value` in a percentile table.
+
+    A binary search over the 101 breakpoints, so constant time regardless of
+    the account size. Values tied with several breakpoints get their midpoint.
+    """
+    if not breakpoints:
+        return None
+    low = bisect_left(breakpoints, value)
+    high = bisect_right(breakpoints, value)
+    return min(max((low + high - 1) / 2, 0.0), 100.0)
+
+
+class ContentPerformanceCRUD:
+    """Ranking queries and cached percentile tables for content performance."""
+
+    @staticmethod
+    async def get_ranked(
+        db: AsyncSession,
+        account_id: int,
+        metric: str,
+        limit: int = 10,
+        descending: bool = True,
+        media_type: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        now: Optional[datetime] = None
+    ) -> List[Tuple[InstagramMedia, float]]:
+        """
+        Get the top (or bottom) `limit` media of an account by a base metric.
+
+        Likes, comments and engagement are read in order from the
+        (account_id, <metric>, id) expression indexes, scanned backwards for
+        the top, so the scan stops after `limit` rows matching the filters.
+        Velocity depends on the current time and can't be indexed; it runs as
+        a bounded top-N heap sort over the rows the account, media type and
+        date range indexes select.
+        """
+        value = metric_expression(metric, now or datetime.utcnow()).label("value")
+        query = select(InstagramMedia, value).where(InstagramMedia.account_id == account_id)
+        if media_type:
+            query = query.where(InstagramMedia.media_type == media_type)
+        if start:
+            query = query.where(InstagramMedia.timestamp >= start)
+        if end:
+            query = query.where(InstagramMedia.timestamp < end + timedelta(days=1))
+        if metric == "velocity":
+            query = query.where(InstagramMedia.timestamp.is_not(None))
+
+        order = value.desc() if descending else value.asc()
+        tiebreak = InstagramMedia.id.desc() if descending else InstagramMedia.id.asc()
+        result = await db.execute(query.order_by(order, tiebreak).limit(limit))
+        return [(media, float(metric_value)) for media, metric_value in result.all()]
+
+    @staticmethod
+    async def get_percentiles(db: AsyncSession, account_id: int) -> Dict[str, List[float]]:
+        """
+        Get an account's percentile tables, recomputing them when missing or stale.
+
+        Tables are invalidated by media ingest and expire after
+        CONTENT_PERCENTILES_TTL_SECONDS (velocity drifts as posts age).
+        Recomputed tables are stored in the caller's transaction; the caller
+        commits.
+        """
+        result = await db.execute(
+            select(InstagramContentPercentiles).where(InstagramContentPercentiles.account_id == account_id)
+        )
+        rows = {row.metric: row for row in result.scalars().all()}
+        expires_before = datetime.utcnow() - timedelta(seconds=settings.CONTENT_PERCENTILES_TTL_SECONDS)
+        if set(rows) >= set(PERCENTILE_METRICS) and all(
+            row.computed_at >= expires_before for row in rows.values()
+        ):
+            return {metric: list(row.breakpoints) for metric, row in rows.items()}
+        return await ContentPerformanceCRUD.refresh_percentiles(db, account_id)
+
+    @staticmethod
+    async def refresh_percentiles(db: AsyncSession, account_id: int) -> Dict[str, List[float]]:
+        """
+        Recompute and store an account's percentile tables with one aggregate query.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        now = datetime.utcnow()
+        fractions = literal(PERCENTILE_FRACTIONS, ARRAY(Float))
+        columns = []
+        for metric in PERCENTILE_METRICS:
+            aggregate = func.percentile_cont(fractions).within_group(metric_expression(metric, now))
+            if metric == "velocity":
+                aggregate = aggregate.filter(InstagramMedia.timestamp.is_not(None))
+            columns.append(aggregate)
+        result = await db.execute(
+            select(func.count(), *columns).where(InstagramMedia.account_id == account_id)
+        )
+        posts, *distributions = result.one()
+
+        tables = {
+            metric: [float(value) for value in breakpoints or []]
+            for metric, breakpoints in zip(PERCENTILE_METRICS, distributions)
+        }
+        stmt = insert(InstagramContentPercentiles)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InstagramContentPercentiles.account_id, InstagramContentPercentiles.metric],
+            set_={
+                "breakpoints": stmt.excluded.breakpoints,
+                "posts": stmt.excluded.posts,
+                "computed_at": stmt.excluded.computed_at
+            }
+        )
+        await db.execute(stmt, [
+            {
+                "account_id": account_id,
+                "metric": metric,
+                "breakpoints": breakpoints,
+                "posts": posts,
+                "computed_at": now
+            }
+            for metric, breakpoints in tables.items()
+        ])
+
+        logger.info(f"Recomputed content percentile tables over {posts} posts for account {account_id}")
+        return tables
+
+    @staticmethod
+    async def invalidate(db: AsyncSession, account_ids: Iterable[int]) -> None:
+        """
+        Drop the percentile tables of the given accounts.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        account_ids = set(account_ids)
+        if account_ids:
+            await db.execute(
+                delete(InstagramContentPercentiles).where(InstagramContentPercentiles.account_id.in_(account_ids))
+            )
+
+
+# Create instance to use in endpoints
+content_performance_crud = ContentPerformanceCRUD()
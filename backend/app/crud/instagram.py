@@ -2,19 +2,192 @@
 CRUD operations for Instagram models.
 """
 
-from typing import Optional, List
+import base64
+import json
+import logging
+import time
+from typing import Dict, Iterable, Optional, List, AsyncIterator, Callable, Tuple, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import (
+    ARRAY, Integer, Row, Select, String, cast, column, delete, func, select, and_, table, text, true, tuple_,
+    union_all
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from datetime import datetime
 
+from app.core.config import settings
+from app.crud.captions import MEDIA_CAPTION_COLUMNS, caption_index_crud, media_caption
+from app.crud.content import content_performance_crud
+from app.crud.metrics import MEDIA_SNAPSHOTS_TABLE, metrics_snapshot_crud
+from app.crud.posting_times import media_contribution, posting_time_crud
+from app.crud.rollups import account_rollup_crud
 from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.metrics import GRANULARITY_RAW, InstagramAccountMetricsSnapshot, InstagramMediaMetricsSnapshot
+from app.models.rollups import InstagramAccountDailyRollup, InstagramAccountWeeklyRollup
 from app.schemas.instagram import (
     InstagramAccountCreate, 
     InstagramAccountUpdate,
     InstagramMediaCreate,
-    InstagramMediaUpdate
+    InstagramMediaUpdate,
+    InstagramMediaBulkLoadResult,
+    InstagramMediaResponse
+)
+
+logger = logging.getLogger(__name__)
+
+
+def encode_media_cursor(media: Union[InstagramMedia, Row]) -> str:
+    """Encode the keyset position after `media` (an entity or a row) as an opaque cursor token."""
+    payload = {
+        "t": media.timestamp.isoformat() if media.timestamp else None,
+        "i": media.id
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_media_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Decode a cursor token into its (timestamp, id) position; raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        timestamp = datetime.fromisoformat(payload["t"]) if payload["t"] else None
+        return timestamp, int(payload["i"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+# Columns selected for media API responses, in InstagramMediaResponse field order.
+# Counts are coalesced so every row satisfies the schema without validating it.
+MEDIA_RESPONSE_FIELDS = list(InstagramMediaResponse.model_fields)
+MEDIA_RESPONSE_COLUMNS = [
+    func.coalesce(getattr(InstagramMedia, name), 0).label(name)
+    if name in ("like_count", "comments_count") else getattr(InstagramMedia, name)
+    for name in MEDIA_RESPONSE_FIELDS
+]
+
+# Columns loaded through the COPY staging table, in COPY order
+MEDIA_COPY_COLUMNS = [
+    "seq",
+    "account_id",
+    "instagram_media_id",
+    "media_type",
+    "media_url",
+    "permalink",
+    "caption",
+    "like_count",
+    "comments_count",
+    "timestamp",
+]
+
+MEDIA_STAGING_TABLE = "instagram_media_staging"
+
+# Account fields whose updates are recorded as metrics snapshots
+ACCOUNT_METRIC_FIELDS = {"followers_count", "following_count", "media_count"}
+
+# Bumps the data version of the given accounts, locking their rows in id order
+# so concurrent ingests cannot deadlock. The new version is only visible once
+# the ingest commits, so a reader never sees a version ahead of its data.
+BUMP_DATA_VERSIONS_SQL = """
+UPDATE instagram_accounts AS accounts
+SET data_version = accounts.data_version + 1
+FROM (
+    SELECT id FROM instagram_accounts
+    WHERE id = ANY(CAST(:account_ids AS integer[]))
+    ORDER BY id
+    FOR UPDATE
+) AS locked
+WHERE accounts.id = locked.id
+"""
+
+CREATE_MEDIA_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS {MEDIA_STAGING_TABLE} (
+    seq BIGINT NOT NULL,
+    account_id INTEGER NOT NULL,
+    instagram_media_id VARCHAR(100) NOT NULL,
+    media_type VARCHAR(50) NOT NULL,
+    media_url TEXT,
+    permalink TEXT,
+    caption TEXT,
+    like_count INTEGER,
+    comments_count INTEGER,
+    timestamp TIMESTAMP WITHOUT TIME ZONE
+) ON COMMIT DELETE ROWS
+"""
+
+# DISTINCT ON keeps the last occurrence of each media id within the chunk;
+# merged rows also get a metrics snapshot in the same statement. Media ids
+# already taken by another account are left untouched.
+MERGE_MEDIA_STAGING_SQL = f"""
+WITH merged AS (
+    INSERT INTO instagram_media (
+        account_id, instagram_media_id, media_type, media_url, permalink, caption,
+        like_count, comments_count, timestamp, created_at, updated_at
+    )
+    SELECT DISTINCT ON (instagram_media_id)
+        account_id, instagram_media_id, media_type, media_url, permalink, caption,
+        like_count, comments_count, timestamp,
+        timezone('utc', now()), timezone('utc', now())
+    FROM {MEDIA_STAGING_TABLE}
+    ORDER BY instagram_media_id, seq DESC
+    ON CONFLICT (instagram_media_id) DO UPDATE SET
+        like_count = EXCLUDED.like_count,
+        comments_count = EXCLUDED.comments_count,
+        caption = EXCLUDED.caption,
+        updated_at = EXCLUDED.updated_at
+    WHERE instagram_media.account_id = EXCLUDED.account_id
+    RETURNING id, account_id, like_count, comments_count
 )
+INSERT INTO {MEDIA_SNAPSHOTS_TABLE}
+    (media_id, captured_at, account_id, like_count, comments_count, granularity)
+SELECT id, :captured_at, account_id, COALESCE(like_count, 0), COALESCE(comments_count, 0), '{GRANULARITY_RAW}'
+FROM merged
+ON CONFLICT DO NOTHING
+"""
+
+# Accounts and rollup days touched by the rows in the staging table, skipping
+# rows whose media id belongs to another account
+STAGED_MEDIA_DAYS_SQL = f"""
+SELECT DISTINCT staging.account_id, CAST(staging.timestamp AS date)
+FROM {MEDIA_STAGING_TABLE} AS staging
+JOIN instagram_media AS media
+    ON media.instagram_media_id = staging.instagram_media_id
+   AND media.account_id = staging.account_id
+"""
+
+
+def _media_page_query(
+    account_id: int,
+    position: Optional[Tuple[Optional[datetime], int]],
+    columns: tuple = (InstagramMedia,)
+) -> Select:
+    """
+    Select an account's media after a keyset position, newest first.
+
+    A position with a timestamp only covers older timestamped media; the
+    media without a timestamp that follow them are fetched by
+    _null_timestamp_media_query, since the row comparison skips NULLs.
+    """
+    query = select(*columns).where(InstagramMedia.account_id == account_id)
+    if position is None:
+        return query.order_by(InstagramMedia.timestamp.desc().nulls_last(), InstagramMedia.id.desc())
+    if position[0] is not None:
+        return query.where(
+            tuple_(InstagramMedia.timestamp, InstagramMedia.id) < tuple_(position[0], position[1])
+        ).order_by(InstagramMedia.timestamp.desc().nulls_last(), InstagramMedia.id.desc())
+    return query.where(
+        and_(InstagramMedia.timestamp.is_(None), InstagramMedia.id < position[1])
+    ).order_by(InstagramMedia.id.desc())
+
+
+def _null_timestamp_media_query(account_id: int, columns: tuple = (InstagramMedia,)) -> Select:
+    """Select an account's media without a timestamp, in page order."""
+    return (
+        select(*columns)
+        .where(InstagramMedia.account_id == account_id, InstagramMedia.timestamp.is_(None))
+        .order_by(InstagramMedia.id.desc())
+    )
 
 
 class InstagramAccountCRUD:
@@ -26,6 +199,44 @@ class InstagramAccountCRUD:
         result = await db.execute(select(InstagramAccount).where(InstagramAccount.id == account_id))
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_owned(db: AsyncSession, account_id: int, user_id: int) -> Optional[InstagramAccount]:
+        """Get an Instagram account by ID if it belongs to the user, in a single query."""
+        result = await db.execute(
+            select(InstagramAccount).where(
+                InstagramAccount.id == account_id,
+                InstagramAccount.user_id == user_id
+            )
+        )
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_data_versions(db: AsyncSession, account_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Get the data version of each account, for keying cached responses.
+
+        Read it in the session the response is computed on, so a lagging
+        replica yields the version matching its data.
+        """
+        account_ids = set(account_ids)
+        result = await db.execute(
+            select(InstagramAccount.id, InstagramAccount.data_version).where(InstagramAccount.id.in_(account_ids))
+        )
+        versions = dict(result.all())
+        return {account_id: versions.get(account_id, 0) for account_id in account_ids}
+
+    @staticmethod
+    async def bump_data_versions(db: AsyncSession, account_ids: Iterable[int]) -> None:
+        """
+        Mark new data for the given accounts, invalidating their cached
+        responses and forecast models once committed.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        account_ids = sorted(set(account_ids))
+        if account_ids:
+            await db.execute(text(BUMP_DATA_VERSIONS_SQL), {"account_ids": account_ids})
+
     @staticmethod
     async def get_by_user_id(db: AsyncSession, user_id: int) -> List[InstagramAccount]:
         """Get all Instagram accounts for a user."""
@@ -93,6 +304,10 @@ class InstagramAccountCRUD:
         db_account.updated_at = datetime.utcnow()
         
         try:
+            metrics_changed = bool(update_data.keys() & ACCOUNT_METRIC_FIELDS)
+            if metrics_changed:
+                await metrics_snapshot_crud.record_account_snapshot(db, db_account, db_account.updated_at)
+                await InstagramAccountCRUD.bump_data_versions(db, [account_id])
             await db.commit()
             await db.refresh(db_account)
             return db_account
@@ -118,15 +333,45 @@ class InstagramAccountCRUD:
         return db_account
 
     @staticmethod
-    async def delete(db: AsyncSession, account_id: int) -> bool:
-        """Delete Instagram account."""
-        result = await db.execute(select(InstagramAccount).where(InstagramAccount.id == account_id))
-        db_account = result.scalar_one_or_none()
-        
-        if not db_account:
+    async def delete_dependents(db: AsyncSession, account_ids: Select) -> None:
+        """
+        Bulk delete the media, metrics snapshots and rollups of the accounts
+        selected by `account_ids`, ahead of deleting the accounts themselves.
+
+        Snapshot tables have no foreign keys, so nothing would cascade to
+        them. Other derived tables cascade from the account rows. Runs in the
+        caller's transaction; the caller commits.
+        """
+        for model in (
+            InstagramMediaMetricsSnapshot,
+            InstagramAccountMetricsSnapshot,
+            InstagramAccountDailyRollup,
+            InstagramAccountWeeklyRollup,
+            InstagramMedia,
+        ):
+            await db.execute(delete(model).where(model.account_id.in_(account_ids)))
+
+    @staticmethod
+    async def delete(db: AsyncSession, account_id: int, user_id: Optional[int] = None) -> bool:
+        """
+        Delete Instagram account with its media, snapshots and rollups.
+
+        Uses bulk DELETE statements instead of loading the media collection
+        for the ORM cascade. When `user_id` is given, only an account owned
+        by that user is deleted.
+        """
+        conditions = [InstagramAccount.id == account_id]
+        if user_id is not None:
+            conditions.append(InstagramAccount.user_id == user_id)
+
+        await InstagramAccountCRUD.delete_dependents(db, select(InstagramAccount.id).where(*conditions))
+        result = await db.execute(
+            delete(InstagramAccount).where(*conditions).returning(InstagramAccount.id)
+        )
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
             return False
-        
-        await db.delete(db_account)
+
         await db.commit()
         return True
 
@@ -141,16 +386,66 @@ class InstagramMediaCRUD:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_by_account_id(db: AsyncSession, account_id: int, limit: int = 25, offset: int = 0) -> List[InstagramMedia]:
-        """Get Instagram media for an account."""
+    async def get_owned_account_id(db: AsyncSession, media_id: int, user_id: int) -> Optional[int]:
+        """Get the account of a media entity if it belongs to the user, in a single query."""
         result = await db.execute(
-            select(InstagramMedia)
-            .where(InstagramMedia.account_id == account_id)
-            .order_by(InstagramMedia.published_at.desc())
-            .limit(limit)
-            .offset(offset)
+            select(InstagramMedia.account_id)
+            .join(InstagramAccount, InstagramAccount.id == InstagramMedia.account_id)
+            .where(InstagramMedia.id == media_id, InstagramAccount.user_id == user_id)
         )
-        return result.scalars().all()
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_owned_page(
+        db: AsyncSession,
+        account_id: int,
+        user_id: int,
+        limit: int = 25,
+        cursor: Optional[str] = None
+    ) -> Optional[Tuple[List[Row], Optional[str]]]:
+        """
+        Get a page of media rows for an account owned by the user, newest first.
+
+        Checks ownership and fetches the page in one query by LEFT JOINing the
+        keyset page LATERAL to the owned account row. A page running past the
+        last timestamped media continues into the media without a timestamp
+        through a UNION ALL in the same query. Rows hold
+        MEDIA_RESPONSE_COLUMNS rather than ORM objects, so they can be
+        serialized without loading entities or validating them. Returns None
+        when the account does not exist or belongs to someone else.
+        """
+        position = decode_media_cursor(cursor) if cursor else None
+        fetch = limit + 1
+
+        page_query = _media_page_query(account_id, position, MEDIA_RESPONSE_COLUMNS).limit(fetch)
+        if position is not None and position[0] is not None:
+            pages = union_all(
+                page_query,
+                _null_timestamp_media_query(account_id, MEDIA_RESPONSE_COLUMNS).limit(fetch)
+            ).subquery()
+            page_query = (
+                select(pages)
+                .order_by(pages.c.timestamp.desc().nulls_last(), pages.c.id.desc())
+                .limit(fetch)
+            )
+        page = page_query.subquery().lateral()
+        result = await db.execute(
+            # The owner column comes last so rows zip onto MEDIA_RESPONSE_FIELDS
+            select(*page.c, InstagramAccount.id.label("owner_id"))
+            .select_from(InstagramAccount)
+            .outerjoin(page, true())
+            .where(InstagramAccount.id == account_id, InstagramAccount.user_id == user_id)
+            .order_by(page.c.timestamp.desc().nulls_last(), page.c.id.desc())
+        )
+        rows = result.all()
+        if not rows:
+            return None
+
+        items = [row for row in rows if row.id is not None]
+        if len(items) > limit:
+            items = items[:limit]
+            return items, encode_media_cursor(items[-1])
+        return items, None
 
     @staticmethod
     async def get_by_instagram_media_id(db: AsyncSession, instagram_media_id: str) -> Optional[InstagramMedia]:
@@ -166,7 +461,15 @@ class InstagramMediaCRUD:
         db_media = InstagramMedia(**media_data.model_dump())
         
         try:
+            histograms = await posting_time_crud.lock(db, [db_media.account_id])
             db.add(db_media)
+            await db.flush()
+            await account_rollup_crud.refresh_for_media(db, [db_media])
+            posting_time_crud.apply(histograms, [media_contribution(db_media)])
+            await caption_index_crud.index_media(db, [media_caption(db_media)])
+            await content_performance_crud.invalidate(db, [db_media.account_id])
+            await metrics_snapshot_crud.record_media_snapshots(db, [db_media], db_media.updated_at)
+            await InstagramAccountCRUD.bump_data_versions(db, [db_media.account_id])
             await db.commit()
             await db.refresh(db_media)
             return db_media
@@ -183,6 +486,11 @@ class InstagramMediaCRUD:
         if not db_media:
             return None
         
+        # Re-read once the histogram is locked, so the replaced values are current
+        histograms = await posting_time_crud.lock(db, [db_media.account_id])
+        await db.refresh(db_media)
+        previous = media_contribution(db_media)
+        
         update_data = media_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_media, field, value)
@@ -190,6 +498,13 @@ class InstagramMediaCRUD:
         db_media.updated_at = datetime.utcnow()
         
         try:
+            await db.flush()
+            await account_rollup_crud.refresh_for_media(db, [db_media])
+            posting_time_crud.apply(histograms, [media_contribution(db_media)], [previous])
+            await caption_index_crud.index_media(db, [media_caption(db_media)])
+            await content_performance_crud.invalidate(db, [db_media.account_id])
+            await metrics_snapshot_crud.record_media_snapshots(db, [db_media], db_media.updated_at)
+            await InstagramAccountCRUD.bump_data_versions(db, [db_media.account_id])
             await db.commit()
             await db.refresh(db_media)
             return db_media
@@ -198,33 +513,189 @@ class InstagramMediaCRUD:
             raise
 
     @staticmethod
-    async def bulk_create_or_update(db: AsyncSession, media_items: List[InstagramMediaCreate]) -> List[InstagramMedia]:
-        """Bulk create or update Instagram media items."""
-        created_items = []
-        
+    async def bulk_create_or_update(
+        db: AsyncSession,
+        media_items: List[InstagramMediaCreate],
+        batch_size: Optional[int] = None
+    ) -> List[InstagramMedia]:
+        """
+        Bulk create or update Instagram media items.
+
+        Uses INSERT ... ON CONFLICT (instagram_media_id) DO UPDATE in chunks of
+        `batch_size` rows, all in a single transaction. Existing rows get their
+        metrics and caption refreshed, every affected row gets a metrics
+        snapshot, the touched growth rollups are refreshed, the posting time
+        histograms and caption index updated and the content percentile tables
+        and cached responses invalidated; the affected rows are returned.
+        """
+        batch_size = batch_size or settings.DB_UPSERT_BATCH_SIZE
+        now = datetime.utcnow()
+
+        # A row can only be touched once per statement, so keep the last occurrence
+        rows_by_media_id = {}
         for media_data in media_items:
-            # Check if media already exists
-            existing_media = await InstagramMediaCRUD.get_by_instagram_media_id(
-                db, media_data.instagram_media_id
+            rows_by_media_id[media_data.instagram_media_id] = {
+                **media_data.model_dump(),
+                "created_at": now,
+                "updated_at": now
+            }
+        rows = list(rows_by_media_id.values())
+
+        stmt = insert(InstagramMedia)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InstagramMedia.instagram_media_id],
+            set_={
+                "like_count": stmt.excluded.like_count,
+                "comments_count": stmt.excluded.comments_count,
+                "caption": stmt.excluded.caption,
+                "updated_at": stmt.excluded.updated_at
+            },
+            # Media ids already taken by another account are left untouched
+            where=InstagramMedia.account_id == stmt.excluded.account_id
+        ).returning(InstagramMedia)
+
+        upserted_items: List[InstagramMedia] = []
+        try:
+            upserted_keys = func.unnest(
+                cast([row["instagram_media_id"] for row in rows], ARRAY(String)),
+                cast([row["account_id"] for row in rows], ARRAY(Integer))
+            ).table_valued("instagram_media_id", "account_id").render_derived()
+            histograms, replaced = await posting_time_crud.lock_for_media(
+                db,
+                (row["account_id"] for row in rows),
+                tuple_(InstagramMedia.instagram_media_id, InstagramMedia.account_id).in_(
+                    select(upserted_keys.c.instagram_media_id, upserted_keys.c.account_id)
+                )
             )
-            
-            if existing_media:
-                # Update existing media
-                update_data = InstagramMediaUpdate(
-                    like_count=media_data.like_count,
-                    comments_count=media_data.comments_count,
-                    caption=media_data.caption
+            for start in range(0, len(rows), batch_size):
+                result = await db.scalars(
+                    stmt,
+                    rows[start:start + batch_size],
+                    execution_options={"populate_existing": True}
                 )
-                updated_media = await InstagramMediaCRUD.update(db, existing_media.id, update_data)
-                if updated_media:
-                    created_items.append(updated_media)
-            else:
-                # Create new media
-                new_media = await InstagramMediaCRUD.create(db, media_data)
-                created_items.append(new_media)
-        
-        return created_items
+                upserted_items.extend(result.all())
+            await metrics_snapshot_crud.record_media_snapshots(db, upserted_items, now)
+            await account_rollup_crud.refresh_for_media(db, upserted_items)
+            posting_time_crud.apply(histograms, map(media_contribution, upserted_items), replaced)
+            await caption_index_crud.index_media(db, map(media_caption, upserted_items))
+            await content_performance_crud.invalidate(db, (media.account_id for media in upserted_items))
+            await InstagramAccountCRUD.bump_data_versions(db, (media.account_id for media in upserted_items))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            raise
+
+        return upserted_items
+
+
+    @staticmethod
+    async def copy_load(
+        db: AsyncSession,
+        media_stream: AsyncIterator[InstagramMediaCreate],
+        chunk_size: Optional[int] = None,
+        start_chunk: int = 0,
+        on_chunk: Optional[Callable[[InstagramMediaBulkLoadResult], None]] = None
+    ) -> InstagramMediaBulkLoadResult:
+        """
+        Bulk load Instagram media from a stream using binary COPY.
+
+        Each chunk of `chunk_size` items is COPYed into a temporary staging
+        table and merged into instagram_media with ON CONFLICT upsert semantics,
+        snapshotting the merged metrics, refreshing the touched growth rollups,
+        posting time histograms and caption index and invalidating content
+        percentile tables, then committed on its own and cached responses of the touched accounts
+        invalidated. Chunks are idempotent, so an interrupted load can be
+        resumed by passing `start_chunk=result.last_chunk + 1` with the same
+        stream; earlier chunks are skipped without touching the database.
+        Requires the asyncpg driver.
+        """
+        chunk_size = chunk_size or settings.DB_COPY_CHUNK_SIZE
+        result = InstagramMediaBulkLoadResult(last_chunk=start_chunk - 1)
+        staged_media = tuple_(InstagramMedia.instagram_media_id, InstagramMedia.account_id).in_(
+            select(column("instagram_media_id"), column("account_id")).select_from(table(MEDIA_STAGING_TABLE))
+        )
+        started = time.perf_counter()
+
+        async def flush(chunk_index: int, records: List[tuple]) -> None:
+            connection = await db.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = raw_connection.driver_connection
+
+            try:
+                captured_at = datetime.utcnow()
+                await metrics_snapshot_crud.ensure_partitions(db, captured_at)
+                await connection.execute(text(CREATE_MEDIA_STAGING_SQL))
+                await driver_connection.copy_records_to_table(
+                    MEDIA_STAGING_TABLE, records=records, columns=MEDIA_COPY_COLUMNS
+                )
+                histograms, replaced = await posting_time_crud.lock_for_media(
+                    db, (record[1] for record in records), staged_media
+                )
+                await connection.execute(text(MERGE_MEDIA_STAGING_SQL), {"captured_at": captured_at})
+                touched = (await connection.execute(text(STAGED_MEDIA_DAYS_SQL))).all()
+                await account_rollup_crud.refresh(db, [(account_id, day) for account_id, day in touched if day])
+                merged = (await db.execute(
+                    select(InstagramMedia.timestamp, *MEDIA_CAPTION_COLUMNS).where(staged_media)
+                )).all()
+                posting_time_crud.apply(
+                    histograms,
+                    ((account_id, timestamp, interactions) for timestamp, _, account_id, _, interactions in merged),
+                    replaced
+                )
+                await caption_index_crud.index_media(db, (row[1:] for row in merged))
+                await content_performance_crud.invalidate(db, (account_id for account_id, _ in touched))
+                await InstagramAccountCRUD.bump_data_versions(db, (account_id for account_id, _ in touched))
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                raise
+
+            result.rows += len(records)
+            result.chunks += 1
+            result.last_chunk = chunk_index
+            result.seconds = time.perf_counter() - started
+            result.rows_per_second = result.rows / result.seconds if result.seconds else 0.0
+            logger.info(
+                f"Loaded media chunk {chunk_index}: {result.rows} rows "
+                f"at {result.rows_per_second:.0f} rows/s"
+            )
+            if on_chunk:
+                on_chunk(result)
+
+        chunk_index = 0
+        skipped = 0
+        records: List[tuple] = []
+        async for media_data in media_stream:
+            if chunk_index < start_chunk:
+                skipped += 1
+                if skipped == chunk_size:
+                    skipped = 0
+                    chunk_index += 1
+                continue
+
+            records.append((
+                len(records),
+                media_data.account_id,
+                media_data.instagram_media_id,
+                media_data.media_type,
+                media_data.media_url,
+                media_data.permalink,
+                media_data.caption,
+                media_data.like_count,
+                media_data.comments_count,
+                media_data.timestamp
+            ))
+            if len(records) >= chunk_size:
+                await flush(chunk_index, records)
+                records = []
+                chunk_index += 1
+
+        if records:
+            await flush(chunk_index, records)
 
+        result.seconds = time.perf_counter() - started
+        result.rows_per_second = result.rows / result.seconds if result.seconds else 0.0
+        return result
 
 # Create instances to use in endpoints
 instagram_account_crud = InstagramAccountCRUD()
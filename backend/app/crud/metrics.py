@@ -0,0 +1,245 @@
+"""
+CRUD operations for time-series metrics snapshots.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.rollups import account_rollup_crud
+from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.metrics import (
+    GRANULARITY_DAILY,
+    GRANULARITY_HOURLY,
+    GRANULARITY_RAW,
+    InstagramAccountMetricsSnapshot,
+    InstagramMediaMetricsSnapshot
+)
+
+logger = logging.getLogger(__name__)
+
+MEDIA_SNAPSHOTS_TABLE = InstagramMediaMetricsSnapshot.__tablename__
+ACCOUNT_SNAPSHOTS_TABLE = InstagramAccountMetricsSnapshot.__tablename__
+SNAPSHOT_TABLES = [MEDIA_SNAPSHOTS_TABLE, ACCOUNT_SNAPSHOTS_TABLE]
+
+# pg_advisory_xact_lock key held while a transaction creates snapshot partitions
+PARTITION_LOCK_KEY = 0x5A9F7E1
+
+# Keeps the latest value per key and bucket, since all metrics are running totals
+DOWNSAMPLE_MEDIA_SQL = f"""
+WITH expired AS (
+    DELETE FROM {MEDIA_SNAPSHOTS_TABLE}
+    WHERE granularity = :source AND captured_at < :cutoff
+    RETURNING media_id, account_id, captured_at, like_count, comments_count
+)
+INSERT INTO {MEDIA_SNAPSHOTS_TABLE}
+    (media_id, captured_at, account_id, like_count, comments_count, granularity)
+SELECT DISTINCT ON (media_id, date_trunc(:bucket, captured_at))
+    media_id, date_trunc(:bucket, captured_at), account_id, like_count, comments_count, :target
+FROM expired
+ORDER BY media_id, date_trunc(:bucket, captured_at), captured_at DESC
+ON CONFLICT (media_id, captured_at) DO UPDATE SET
+    like_count = EXCLUDED.like_count,
+    comments_count = EXCLUDED.comments_count,
+    granularity = EXCLUDED.granularity
+"""
+
+DOWNSAMPLE_ACCOUNTS_SQL = f"""
+WITH expired AS (
+    DELETE FROM {ACCOUNT_SNAPSHOTS_TABLE}
+    WHERE granularity = :source AND captured_at < :cutoff
+    RETURNING account_id, captured_at, followers_count, following_count, media_count
+)
+INSERT INTO {ACCOUNT_SNAPSHOTS_TABLE}
+    (account_id, captured_at, followers_count, following_count, media_count, granularity)
+SELECT DISTINCT ON (account_id, date_trunc(:bucket, captured_at))
+    account_id, date_trunc(:bucket, captured_at), followers_count, following_count, media_count, :target
+FROM expired
+ORDER BY account_id, date_trunc(:bucket, captured_at), captured_at DESC
+ON CONFLICT (account_id, captured_at) DO UPDATE SET
+    followers_count = EXCLUDED.followers_count,
+    following_count = EXCLUDED.following_count,
+    media_count = EXCLUDED.media_count,
+    granularity = EXCLUDED.granularity
+"""
+
+LIST_PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE parent.relname = :table
+"""
+
+
+def month_start(moment: datetime) -> datetime:
+    """Get the first instant of the month containing `moment`."""
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(moment: datetime) -> datetime:
+    """Get the first instant of the month after `moment`."""
+    start = month_start(moment)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(table: str, moment: datetime) -> str:
+    """Name of the monthly partition of `table` containing `moment`."""
+    return f"{table}_{moment.year:04d}_{moment.month:02d}"
+
+
+class MetricsSnapshotCRUD:
+    """CRUD operations for media and account metrics snapshots."""
+
+    # Partitions known to exist, so ingest only checks the catalog once per month
+    _known_partitions: Set[str] = set()
+
+    @staticmethod
+    async def ensure_partitions(db: AsyncSession, moment: datetime) -> None:
+        """
+        Create the monthly partitions containing `moment` if they do not exist yet.
+
+        Concurrent CREATE TABLE IF NOT EXISTS ... PARTITION OF can still fail
+        on the catalog's unique index, so creators serialize on an advisory
+        lock held until the caller's transaction ends, and check again once
+        they hold it.
+        """
+        locked = False
+        for table in SNAPSHOT_TABLES:
+            name = partition_name(table, moment)
+            if name in MetricsSnapshotCRUD._known_partitions:
+                continue
+            exists = await db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+            if not exists and not locked:
+                await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+                locked = True
+                exists = await db.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})
+            if exists:
+                # Only cache committed partitions, DDL rolls back with the transaction
+                MetricsSnapshotCRUD._known_partitions.add(name)
+                continue
+            start, end = month_start(moment), next_month(moment)
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
+
+    @staticmethod
+    async def record_media_snapshots(
+        db: AsyncSession,
+        media_items: List[InstagramMedia],
+        captured_at: Optional[datetime] = None
+    ) -> int:
+        """
+        Append a metrics snapshot for each media item.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        if not media_items:
+            return 0
+        captured_at = captured_at or datetime.utcnow()
+        await MetricsSnapshotCRUD.ensure_partitions(db, captured_at)
+
+        rows = [
+            {
+                "media_id": media.id,
+                "captured_at": captured_at,
+                "account_id": media.account_id,
+                "like_count": media.like_count or 0,
+                "comments_count": media.comments_count or 0,
+                "granularity": GRANULARITY_RAW
+            }
+            for media in media_items
+        ]
+        stmt = insert(InstagramMediaMetricsSnapshot).on_conflict_do_nothing()
+        await db.execute(stmt, rows)
+        return len(rows)
+
+    @staticmethod
+    async def record_account_snapshot(
+        db: AsyncSession,
+        account: InstagramAccount,
+        captured_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Append a metrics snapshot for an account and refresh its daily rollup.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        captured_at = captured_at or datetime.utcnow()
+        await MetricsSnapshotCRUD.ensure_partitions(db, captured_at)
+
+        stmt = insert(InstagramAccountMetricsSnapshot).values(
+            account_id=account.id,
+            captured_at=captured_at,
+            followers_count=account.followers_count or 0,
+            following_count=account.following_count or 0,
+            media_count=account.media_count or 0,
+            granularity=GRANULARITY_RAW
+        ).on_conflict_do_nothing()
+        await db.execute(stmt)
+        await account_rollup_crud.refresh(db, [(account.id, captured_at.date())])
+
+    @staticmethod
+    async def apply_retention(db: AsyncSession, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Apply the snapshot retention policy.
+
+        Raw snapshots older than METRICS_RAW_RETENTION_DAYS are collapsed to
+        hourly, hourly ones older than METRICS_HOURLY_RETENTION_DAYS to daily,
+        and monthly partitions entirely older than METRICS_DAILY_RETENTION_DAYS
+        are dropped. Cutoffs are aligned to bucket boundaries so a bucket is
+        only ever downsampled once it is complete.
+        """
+        now = now or datetime.utcnow()
+        raw_cutoff = (now - timedelta(days=settings.METRICS_RAW_RETENTION_DAYS)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        hourly_cutoff = (now - timedelta(days=settings.METRICS_HOURLY_RETENTION_DAYS)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        drop_before = month_start(now - timedelta(days=settings.METRICS_DAILY_RETENTION_DAYS))
+
+        stats = {"hourly": 0, "daily": 0, "dropped_partitions": 0}
+        steps: List[Tuple[str, str, str, datetime, str]] = [
+            (GRANULARITY_RAW, GRANULARITY_HOURLY, "hour", raw_cutoff, "hourly"),
+            (GRANULARITY_HOURLY, GRANULARITY_DAILY, "day", hourly_cutoff, "daily"),
+        ]
+        try:
+            for source, target, bucket, cutoff, stat in steps:
+                for sql in (DOWNSAMPLE_MEDIA_SQL, DOWNSAMPLE_ACCOUNTS_SQL):
+                    result = await db.execute(
+                        text(sql),
+                        {"source": source, "target": target, "bucket": bucket, "cutoff": cutoff}
+                    )
+                    stats[stat] += result.rowcount or 0
+
+            for table in SNAPSHOT_TABLES:
+                result = await db.execute(text(LIST_PARTITIONS_SQL), {"table": table})
+                for (name,) in result.all():
+                    suffix = name[len(table) + 1:]
+                    try:
+                        partition_month = datetime.strptime(suffix, "%Y_%m")
+                    except ValueError:
+                        continue
+                    if next_month(partition_month) <= drop_before:
+                        await db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                        MetricsSnapshotCRUD._known_partitions.discard(name)
+                        stats["dropped_partitions"] += 1
+
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        logger.info(f"Applied metrics snapshot retention: {stats}")
+        return stats
+
+
+# Create instance to use in endpoints
+metrics_snapshot_crud = MetricsSnapshotCRUD()
@@ -0,0 +1,284 @@
+"""
+CRUD operations for hour-of-week posting time histograms.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Row, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.config import settings
+from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.rollups import InstagramPostingTimeHistogram
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_WEEK = 168
+SECONDS_PER_DAY = 86400
+
+# The Unix epoch is a Thursday, three days after the Monday bins start from
+EPOCH_WEEKDAY = 3
+
+# Bins are rebased onto a newer anchor once a post is this many half-lives
+# after it, keeping weights far from float overflow. Whole half-lives scale by
+# a power of two, which is exact, so later removals still cancel.
+REBASE_HALF_LIVES = 64
+
+# Accounts whose histograms are rebuilt per statement by rebuild()
+REBUILD_BATCH_SIZE = 500
+
+HISTOGRAMS_TABLE = InstagramPostingTimeHistogram.__tablename__
+
+# Creates empty histograms for accounts that have none, returning their ids
+CREATE_HISTOGRAMS_SQL = f"""
+INSERT INTO {HISTOGRAMS_TABLE} (
+    account_id, weights, interactions, posts, decay_anchor, half_life_days, updated_at
+)
+SELECT
+    account_id,
+    array_fill(CAST(0 AS float8), ARRAY[{HOURS_PER_WEEK}]),
+    array_fill(CAST(0 AS float8), ARRAY[{HOURS_PER_WEEK}]),
+    array_fill(0, ARRAY[{HOURS_PER_WEEK}]),
+    :anchor, :half_life_days, timezone('utc', now())
+FROM unnest(CAST(:account_ids AS integer[])) AS account_id
+ORDER BY account_id
+ON CONFLICT (account_id) DO NOTHING
+RETURNING account_id
+"""
+
+# (account_id, timestamp, likes + comments) of one post
+MediaContribution = Tuple[int, Optional[datetime], int]
+
+MEDIA_CONTRIBUTION_COLUMNS = (
+    InstagramMedia.account_id,
+    InstagramMedia.timestamp,
+    func.coalesce(InstagramMedia.like_count, 0) + func.coalesce(InstagramMedia.comments_count, 0),
+)
+
+
+def hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    """UTC hour-of-week bins (Monday 00:00 is 0) of datetime64 timestamps."""
+    hours = timestamps.astype("datetime64[h]").astype(np.int64)
+    return (hours + EPOCH_WEEKDAY * 24) % HOURS_PER_WEEK
+
+
+def media_contribution(media: InstagramMedia) -> MediaContribution:
+    """Get the histogram contribution of a media entity."""
+    return media.account_id, media.timestamp, (media.like_count or 0) + (media.comments_count or 0)
+
+
+def _reset(histogram: InstagramPostingTimeHistogram, anchor: datetime) -> None:
+    """Empty a histogram, anchored at `anchor` with the configured half-life."""
+    histogram.weights = [0.0] * HOURS_PER_WEEK
+    histogram.interactions = [0.0] * HOURS_PER_WEEK
+    histogram.posts = [0] * HOURS_PER_WEEK
+    histogram.decay_anchor = anchor
+    histogram.half_life_days = settings.POSTING_TIMES_HALF_LIFE_DAYS
+
+
+def _add(
+    histogram: InstagramPostingTimeHistogram,
+    timestamps: np.ndarray,
+    interactions: np.ndarray,
+    signs: np.ndarray
+) -> None:
+    """Add (sign 1) or remove (sign -1) posts from a histogram's bins."""
+    weights = np.asarray(histogram.weights, dtype=np.float64)
+    weighted_interactions = np.asarray(histogram.interactions, dtype=np.float64)
+    posts = np.asarray(histogram.posts, dtype=np.int64)
+
+    half_life_seconds = histogram.half_life_days * SECONDS_PER_DAY
+    anchor = np.datetime64(histogram.decay_anchor, "s")
+    exponents = (timestamps - anchor).astype(np.float64) / half_life_seconds
+    shift = int(exponents.max())
+    if shift > REBASE_HALF_LIVES:
+        scale = 2.0 ** -shift
+        weights *= scale
+        weighted_interactions *= scale
+        exponents -= shift
+        histogram.decay_anchor += timedelta(seconds=shift * half_life_seconds)
+
+    post_weights = signs * np.exp2(exponents)
+    bins = hour_of_week(timestamps)
+    weights += np.bincount(bins, post_weights, minlength=HOURS_PER_WEEK)
+    weighted_interactions += np.bincount(bins, post_weights * interactions, minlength=HOURS_PER_WEEK)
+    posts += np.rint(np.bincount(bins, signs, minlength=HOURS_PER_WEEK)).astype(np.int64)
+
+    # Drop rounding residue of removed posts from bins left empty
+    empty = posts <= 0
+    weights[empty] = 0.0
+    weighted_interactions[empty] = 0.0
+    posts[empty] = 0
+
+    histogram.weights = weights.tolist()
+    histogram.interactions = weighted_interactions.tolist()
+    histogram.posts = posts.tolist()
+
+
+class PostingTimeHistogramCRUD:
+    """CRUD operations for per-account posting time histograms."""
+
+    @staticmethod
+    async def lock(db: AsyncSession, account_ids: Iterable[int]) -> Dict[int, InstagramPostingTimeHistogram]:
+        """
+        Lock the histograms of the given accounts for an ingest.
+
+        Must be called before the ingest reads the media it replaces, so
+        concurrent ingests into an account apply their deltas one after the
+        other. Missing histograms, and ones kept with another half-life, are
+        rebuilt from the account's media. Runs in the caller's transaction;
+        the caller commits.
+        """
+        ids = sorted(set(account_ids))
+        if not ids:
+            return {}
+
+        # Rows are created and locked in account order, so concurrent ingests cannot deadlock
+        created = await db.execute(
+            text(CREATE_HISTOGRAMS_SQL),
+            {
+                "account_ids": ids,
+                "anchor": datetime.utcnow().replace(microsecond=0),
+                "half_life_days": settings.POSTING_TIMES_HALF_LIFE_DAYS,
+            }
+        )
+        created_ids = set(created.scalars().all())
+
+        result = await db.scalars(
+            select(InstagramPostingTimeHistogram)
+            .where(InstagramPostingTimeHistogram.account_id.in_(ids))
+            .order_by(InstagramPostingTimeHistogram.account_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        histograms = {histogram.account_id: histogram for histogram in result.all()}
+
+        stale = [
+            histogram for histogram in histograms.values()
+            if histogram.account_id in created_ids
+            or histogram.half_life_days != settings.POSTING_TIMES_HALF_LIFE_DAYS
+        ]
+        if stale:
+            await PostingTimeHistogramCRUD._recompute(db, stale)
+        return histograms
+
+    @staticmethod
+    async def lock_for_media(
+        db: AsyncSession, account_ids: Iterable[int], media_filter: ColumnElement
+    ) -> Tuple[Dict[int, InstagramPostingTimeHistogram], List[Row]]:
+        """
+        Lock the histograms an upsert touches and read the contributions of
+        the existing media it will replace, selected by `media_filter`.
+
+        Existing media keep their account on upsert, which may differ from the
+        one being ingested, so their accounts are locked as well.
+        """
+        histograms = await PostingTimeHistogramCRUD.lock(db, account_ids)
+        while True:
+            result = await db.execute(select(*MEDIA_CONTRIBUTION_COLUMNS).where(media_filter))
+            replaced = list(result.all())
+            missing = {account_id for account_id, _, _ in replaced} - histograms.keys()
+            if not missing:
+                return histograms, replaced
+            histograms.update(await PostingTimeHistogramCRUD.lock(db, missing))
+
+    @staticmethod
+    def apply(
+        histograms: Dict[int, InstagramPostingTimeHistogram],
+        added: Iterable[MediaContribution],
+        removed: Iterable[MediaContribution] = ()
+    ) -> int:
+        """
+        Apply the posts an ingest added and the previous versions it replaced.
+
+        `histograms` must come from lock() and cover every account of the
+        contributions; posts without a timestamp are skipped. Changes are
+        written when the caller commits. Returns the number of posts applied.
+        """
+        by_account: Dict[int, List[Tuple[datetime, int, int]]] = defaultdict(list)
+        for sign, contributions in ((1, added), (-1, removed)):
+            for account_id, timestamp, interactions in contributions:
+                if timestamp is not None:
+                    by_account[account_id].append((timestamp, interactions, sign))
+
+        for account_id, rows in by_account.items():
+            timestamps, interactions, signs = zip(*rows)
+            _add(
+                histograms[account_id],
+                np.array(timestamps, dtype="datetime64[s]"),
+                np.array(interactions, dtype=np.float64),
+                np.array(signs, dtype=np.float64)
+            )
+        return sum(len(rows) for rows in by_account.values())
+
+    @staticmethod
+    async def _recompute(db: AsyncSession, histograms: Sequence[InstagramPostingTimeHistogram]) -> None:
+        """Rebuild histograms from all of their accounts' media."""
+        anchor = datetime.utcnow().replace(microsecond=0)
+        by_account = {histogram.account_id: histogram for histogram in histograms}
+        for histogram in histograms:
+            _reset(histogram, anchor)
+
+        result = await db.execute(
+            select(*MEDIA_CONTRIBUTION_COLUMNS).where(
+                InstagramMedia.account_id.in_(list(by_account)),
+                InstagramMedia.timestamp.is_not(None)
+            )
+        )
+        PostingTimeHistogramCRUD.apply(by_account, result.all())
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, account_id: Optional[int] = None) -> int:
+        """
+        Rebuild the histograms of one account, or all accounts, from their media.
+
+        Used after changing POSTING_TIMES_HALF_LIFE_DAYS or to repair drift.
+        Returns the number of histograms rebuilt.
+        """
+        query = select(InstagramAccount.id).order_by(InstagramAccount.id)
+        if account_id is not None:
+            query = query.where(InstagramAccount.id == account_id)
+
+        try:
+            account_ids = list((await db.scalars(query)).all())
+            for start in range(0, len(account_ids), REBUILD_BATCH_SIZE):
+                histograms = await PostingTimeHistogramCRUD.lock(db, account_ids[start:start + REBUILD_BATCH_SIZE])
+                await PostingTimeHistogramCRUD._recompute(db, list(histograms.values()))
+                await db.flush()
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        logger.info(f"Rebuilt {len(account_ids)} posting time histograms")
+        return len(account_ids)
+
+    @staticmethod
+    async def get_owned(
+        db: AsyncSession, account_id: int, user_id: int
+    ) -> Optional[Tuple[InstagramAccount, Optional[InstagramPostingTimeHistogram]]]:
+        """
+        Get an account owned by a user with its histogram, in one query.
+
+        Returns None if the account does not exist or belongs to another user;
+        the histogram is None until the account's first ingest.
+        """
+        result = await db.execute(
+            select(InstagramAccount, InstagramPostingTimeHistogram)
+            .outerjoin(
+                InstagramPostingTimeHistogram,
+                InstagramPostingTimeHistogram.account_id == InstagramAccount.id
+            )
+            .where(InstagramAccount.id == account_id, InstagramAccount.user_id == user_id)
+        )
+        row = result.first()
+        return tuple(row) if row else None
+
+
+# Create instance to use in endpoints
+posting_time_crud = PostingTimeHistogramCRUD()
@@ -0,0 +1,130 @@
+"""
+CRUD operations for the forecast model registry.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.predictions import InstagramForecastModel
+
+MODELS_TABLE = InstagramForecastModel.__tablename__
+
+# Accounts without a model, or whose data version moved since their latest
+# model was fitted, with their current data version
+RETRAIN_CANDIDATES_SQL = f"""
+SELECT accounts.id, accounts.data_version
+FROM instagram_accounts AS accounts
+LEFT JOIN LATERAL (
+    SELECT fitted_at, data_version
+    FROM {MODELS_TABLE}
+    WHERE account_id = accounts.id
+    ORDER BY version DESC
+    LIMIT 1
+) AS latest ON true
+WHERE latest.data_version IS DISTINCT FROM accounts.data_version
+ORDER BY latest.fitted_at NULLS FIRST, accounts.id
+LIMIT :limit
+"""
+
+# Versions are contiguous per account, so this keeps the newest :keep ones
+PRUNE_MODELS_SQL = f"""
+DELETE FROM {MODELS_TABLE} AS models
+USING unnest(CAST(:account_ids AS integer[]), CAST(:versions AS integer[])) AS latest (account_id, version)
+WHERE models.account_id = latest.account_id
+  AND models.version <= latest.version - :keep
+"""
+
+
+class ForecastModelCRUD:
+    """CRUD operations for versioned forecast models."""
+
+    @staticmethod
+    async def get_latest(db: AsyncSession, account_ids: Sequence[int]) -> List[InstagramForecastModel]:
+        """Get the latest model version of each account that has one."""
+        if not account_ids:
+            return []
+        result = await db.execute(
+            select(InstagramForecastModel)
+            .where(InstagramForecastModel.account_id.in_(account_ids))
+            .order_by(InstagramForecastModel.account_id, InstagramForecastModel.version.desc())
+            .distinct(InstagramForecastModel.account_id)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_retrain_candidates(db: AsyncSession, limit: int) -> Dict[int, int]:
+        """
+        Get accounts whose model is missing or fitted on outdated data, as
+        {account_id: current data version}.
+        """
+        result = await db.execute(text(RETRAIN_CANDIDATES_SQL), {"limit": limit})
+        return dict(result.all())
+
+    @staticmethod
+    async def save(
+        db: AsyncSession,
+        account_ids: Sequence[int],
+        data_versions: Sequence[int],
+        models: Sequence[str],
+        params: np.ndarray,
+        observations: np.ndarray,
+        params_format: int,
+        history_days: int,
+        fitted_through: date,
+        fitted_at: datetime
+    ) -> Dict[int, int]:
+        """
+        Store a new model version per account and prune old versions.
+
+        Runs in the caller's transaction; the caller commits. Returns the new
+        version of each account.
+        """
+        if not account_ids:
+            return {}
+        result = await db.execute(
+            select(InstagramForecastModel.account_id, func.max(InstagramForecastModel.version))
+            .where(InstagramForecastModel.account_id.in_(account_ids))
+            .group_by(InstagramForecastModel.account_id)
+        )
+        current = dict(result.all())
+        versions = {account_id: current.get(account_id, 0) + 1 for account_id in account_ids}
+
+        await db.execute(
+            InstagramForecastModel.__table__.insert(),
+            [
+                {
+                    "account_id": account_id,
+                    "version": versions[account_id],
+                    "model": model,
+                    "params": row.tobytes(),
+                    "params_format": params_format,
+                    "history_days": history_days,
+                    "observations": int(count),
+                    "fitted_through": fitted_through,
+                    "fitted_at": fitted_at,
+                    "data_version": data_version,
+                }
+                for account_id, data_version, model, row, count in zip(
+                    account_ids, data_versions, models, params, observations
+                )
+            ]
+        )
+
+        await db.execute(
+            text(PRUNE_MODELS_SQL),
+            {
+                "account_ids": list(versions),
+                "versions": list(versions.values()),
+                "keep": max(settings.MODEL_REGISTRY_KEEP_VERSIONS, 1),
+            }
+        )
+        return versions
+
+
+# Create instance to use in endpoints
+forecast_model_crud = ForecastModelCRUD()
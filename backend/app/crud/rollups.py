@@ -0,0 +1,225 @@
+"""
+CRUD operations for pre-aggregated growth rollups.
+"""
+
+import logging
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Date, cast, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.instagram import InstagramMedia
+from app.models.metrics import InstagramAccountMetricsSnapshot
+from app.models.rollups import InstagramAccountDailyRollup, InstagramAccountWeeklyRollup
+
+logger = logging.getLogger(__name__)
+
+DAILY_ROLLUPS_TABLE = InstagramAccountDailyRollup.__tablename__
+WEEKLY_ROLLUPS_TABLE = InstagramAccountWeeklyRollup.__tablename__
+
+# Buckets refreshed per statement by rebuild()
+REBUILD_BATCH_SIZE = 5000
+
+# Recomputes the given (account_id, day) buckets from source rows. Post
+# aggregates use ix_instagram_media_account_timestamp_id and the account
+# metrics lookup the snapshot primary key, so the cost is per bucket, not per
+# account. Follower metrics are kept when the day has no snapshot left (e.g.
+# after partitions expired).
+REFRESH_DAILY_ROLLUPS_SQL = f"""
+INSERT INTO {DAILY_ROLLUPS_TABLE} (
+    account_id, day, posts, likes, comments,
+    followers_count, following_count, media_count, updated_at
+)
+SELECT
+    buckets.account_id, buckets.day,
+    COALESCE(media.posts, 0), COALESCE(media.likes, 0), COALESCE(media.comments, 0),
+    snapshot.followers_count, snapshot.following_count, snapshot.media_count,
+    timezone('utc', now())
+FROM (
+    SELECT DISTINCT account_id, day
+    FROM unnest(CAST(:account_ids AS integer[]), CAST(:days AS date[])) AS b (account_id, day)
+) AS buckets
+LEFT JOIN LATERAL (
+    SELECT
+        count(*) AS posts,
+        sum(COALESCE(like_count, 0)) AS likes,
+        sum(COALESCE(comments_count, 0)) AS comments
+    FROM instagram_media
+    WHERE account_id = buckets.account_id
+      AND timestamp >= buckets.day
+      AND timestamp < buckets.day + 1
+) AS media ON true
+LEFT JOIN LATERAL (
+    SELECT followers_count, following_count, media_count
+    FROM {InstagramAccountMetricsSnapshot.__tablename__}
+    WHERE account_id = buckets.account_id
+      AND captured_at >= buckets.day
+      AND captured_at < buckets.day + 1
+    ORDER BY captured_at DESC
+    LIMIT 1
+) AS snapshot ON true
+ON CONFLICT (account_id, day) DO UPDATE SET
+    posts = EXCLUDED.posts,
+    likes = EXCLUDED.likes,
+    comments = EXCLUDED.comments,
+    followers_count = COALESCE(EXCLUDED.followers_count, {DAILY_ROLLUPS_TABLE}.followers_count),
+    following_count = COALESCE(EXCLUDED.following_count, {DAILY_ROLLUPS_TABLE}.following_count),
+    media_count = COALESCE(EXCLUDED.media_count, {DAILY_ROLLUPS_TABLE}.media_count),
+    updated_at = EXCLUDED.updated_at
+"""
+
+# Recomputes the ISO weeks containing the given days from the daily rollups
+REFRESH_WEEKLY_ROLLUPS_SQL = f"""
+INSERT INTO {WEEKLY_ROLLUPS_TABLE} (
+    account_id, week_start, posts, likes, comments,
+    followers_count, following_count, media_count, updated_at
+)
+SELECT
+    weeks.account_id, weeks.week_start,
+    sum(daily.posts), sum(daily.likes), sum(daily.comments),
+    (array_agg(daily.followers_count ORDER BY daily.day DESC)
+        FILTER (WHERE daily.followers_count IS NOT NULL))[1],
+    (array_agg(daily.following_count ORDER BY daily.day DESC)
+        FILTER (WHERE daily.following_count IS NOT NULL))[1],
+    (array_agg(daily.media_count ORDER BY daily.day DESC)
+        FILTER (WHERE daily.media_count IS NOT NULL))[1],
+    timezone('utc', now())
+FROM (
+    SELECT DISTINCT account_id, CAST(date_trunc('week', day) AS date) AS week_start
+    FROM unnest(CAST(:account_ids AS integer[]), CAST(:days AS date[])) AS b (account_id, day)
+) AS weeks
+JOIN {DAILY_ROLLUPS_TABLE} AS daily
+    ON daily.account_id = weeks.account_id
+   AND daily.day >= weeks.week_start
+   AND daily.day < weeks.week_start + 7
+GROUP BY weeks.account_id, weeks.week_start
+ON CONFLICT (account_id, week_start) DO UPDATE SET
+    posts = EXCLUDED.posts,
+    likes = EXCLUDED.likes,
+    comments = EXCLUDED.comments,
+    followers_count = EXCLUDED.followers_count,
+    following_count = EXCLUDED.following_count,
+    media_count = EXCLUDED.media_count,
+    updated_at = EXCLUDED.updated_at
+"""
+
+
+def week_start(day: date) -> date:
+    """Get the Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+class AccountRollupCRUD:
+    """CRUD operations for daily and weekly account growth rollups."""
+
+    @staticmethod
+    async def refresh(db: AsyncSession, buckets: Iterable[Tuple[int, date]]) -> int:
+        """
+        Recompute the daily rollups of the given (account_id, day) buckets and
+        the weekly rollups containing them.
+
+        Only touched buckets are recomputed. Runs in the caller's transaction;
+        the caller commits. Returns the number of daily buckets refreshed.
+        """
+        unique_buckets: Set[Tuple[int, date]] = set(buckets)
+        if not unique_buckets:
+            return 0
+        params = {
+            "account_ids": [account_id for account_id, _ in unique_buckets],
+            "days": [day for _, day in unique_buckets]
+        }
+        await db.execute(text(REFRESH_DAILY_ROLLUPS_SQL), params)
+        await db.execute(text(REFRESH_WEEKLY_ROLLUPS_SQL), params)
+        return len(unique_buckets)
+
+    @staticmethod
+    async def refresh_for_media(db: AsyncSession, media_items: Iterable[InstagramMedia]) -> int:
+        """Refresh the rollup buckets of the days the given media were published."""
+        return await AccountRollupCRUD.refresh(db, (
+            (media.account_id, media.timestamp.date())
+            for media in media_items
+            if media.timestamp is not None
+        ))
+
+    @staticmethod
+    async def rebuild(db: AsyncSession, account_id: Optional[int] = None) -> int:
+        """
+        Rebuild rollups from scratch for one account, or all accounts.
+
+        Used to backfill rollups for data ingested before they existed.
+        Returns the number of daily buckets written.
+        """
+        media_days = select(
+            InstagramMedia.account_id, cast(InstagramMedia.timestamp, Date)
+        ).where(InstagramMedia.timestamp.is_not(None))
+        snapshot_days = select(
+            InstagramAccountMetricsSnapshot.account_id, cast(InstagramAccountMetricsSnapshot.captured_at, Date)
+        )
+        if account_id is not None:
+            media_days = media_days.where(InstagramMedia.account_id == account_id)
+            snapshot_days = snapshot_days.where(InstagramAccountMetricsSnapshot.account_id == account_id)
+
+        try:
+            daily_delete = delete(InstagramAccountDailyRollup)
+            weekly_delete = delete(InstagramAccountWeeklyRollup)
+            if account_id is not None:
+                daily_delete = daily_delete.where(InstagramAccountDailyRollup.account_id == account_id)
+                weekly_delete = weekly_delete.where(InstagramAccountWeeklyRollup.account_id == account_id)
+            await db.execute(daily_delete)
+            await db.execute(weekly_delete)
+
+            result = await db.execute(media_days.union(snapshot_days))
+            buckets: List[Tuple[int, date]] = [tuple(row) for row in result.all()]
+            for start in range(0, len(buckets), REBUILD_BATCH_SIZE):
+                await AccountRollupCRUD.refresh(db, buckets[start:start + REBUILD_BATCH_SIZE])
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        logger.info(f"Rebuilt {len(buckets)} daily rollup buckets")
+        return len(buckets)
+
+    @staticmethod
+    async def get_daily(
+        db: AsyncSession, account_id: int, start: date, end: date
+    ) -> List[InstagramAccountDailyRollup]:
+        """Get an account's daily rollups between `start` and `end` inclusive."""
+        result = await db.execute(
+            select(InstagramAccountDailyRollup).where(
+                InstagramAccountDailyRollup.account_id == account_id,
+                InstagramAccountDailyRollup.day >= start,
+                InstagramAccountDailyRollup.day <= end
+            ).order_by(InstagramAccountDailyRollup.day)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_weekly(
+        db: AsyncSession, account_id: int, start: date, end: date
+    ) -> List[InstagramAccountWeeklyRollup]:
+        """Get an account's weekly rollups for the weeks overlapping `start` to `end`."""
+        result = await db.execute(
+            select(InstagramAccountWeeklyRollup).where(
+                InstagramAccountWeeklyRollup.account_id == account_id,
+                InstagramAccountWeeklyRollup.week_start >= week_start(start),
+                InstagramAccountWeeklyRollup.week_start <= end
+            ).order_by(InstagramAccountWeeklyRollup.week_start)
+        )
+        return list(result.scalars().all())
+
+    @staticmethod
+    async def get_followers_before(db: AsyncSession, account_id: int, day: date) -> Optional[int]:
+        """Get the last known followers count of an account before `day`."""
+        return await db.scalar(
+            select(InstagramAccountDailyRollup.followers_count).where(
+                InstagramAccountDailyRollup.account_id == account_id,
+                InstagramAccountDailyRollup.day < day,
+                InstagramAccountDailyRollup.followers_count.is_not(None)
+            ).order_by(InstagramAccountDailyRollup.day.desc()).limit(1)
+        )
+
+
+# Create instance to use in endpoints
+account_rollup_crud = AccountRollupCRUD()
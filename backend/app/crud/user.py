@@ -4,12 +4,15 @@ CRUD operations for User model.
 
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.exc import IntegrityError
 
+from app.crud.instagram import instagram_account_crud
+from app.models.instagram import InstagramAccount
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash
+from app.core.auth_cache import invalidate_user
+from app.core.security import get_password_hash_async
 
 
 class UserCRUD:
@@ -46,7 +49,7 @@ class UserCRUD:
     @staticmethod
     async def create(db: AsyncSession, user_data: UserCreate) -> User:
         """Create new user."""
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         
         db_user = User(
             email=user_data.email,
@@ -81,6 +84,7 @@ class UserCRUD:
         try:
             await db.commit()
             await db.refresh(db_user)
+            invalidate_user(user_id)
             return db_user
         except IntegrityError:
             await db.rollback()
@@ -88,15 +92,22 @@ class UserCRUD:
 
     @staticmethod
     async def delete(db: AsyncSession, user_id: int) -> bool:
-        """Delete user."""
-        result = await db.execute(select(User).where(User.id == user_id))
-        db_user = result.scalar_one_or_none()
-        
-        if not db_user:
+        """
+        Delete user with their Instagram accounts and everything ingested for them.
+
+        Uses bulk DELETE statements, the same as InstagramAccountCRUD.delete,
+        instead of loading the accounts' media for the ORM cascade.
+        """
+        account_ids = select(InstagramAccount.id).where(InstagramAccount.user_id == user_id)
+        await instagram_account_crud.delete_dependents(db, account_ids)
+        await db.execute(delete(InstagramAccount).where(InstagramAccount.user_id == user_id))
+        result = await db.execute(delete(User).where(User.id == user_id).returning(User.id))
+        if result.scalar_one_or_none() is None:
+            await db.rollback()
             return False
-        
-        await db.delete(db_user)
+
         await db.commit()
+        invalidate_user(user_id)
         return True
 
     @staticmethod
@@ -111,6 +122,7 @@ class UserCRUD:
         db_user.is_active = True
         await db.commit()
         await db.refresh(db_user)
+        invalidate_user(user_id)
         return db_user
 
     @staticmethod
@@ -125,6 +137,7 @@ class UserCRUD:
         db_user.is_active = False
         await db.commit()
         await db.refresh(db_user)
+        invalidate_user(user_id)
         return db_user
 
 
@@ -2,21 +2,59 @@
 Main FastAPI application entry point for Instagram Predictive Analytics Dashboard.
 """
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.exc import IntegrityError
 
 from app.core.config import settings
+from app.core.database import get_pool_stats as get_db_pool_stats
 from app.api.routes import api_router
-from app.core.exceptions import integrity_error_handler, general_exception_handler
+from app.core import auth_cache, query_budget
+from app.core.cache import response_cache
+from app.core.exceptions import (
+    InstagramAPIError,
+    ServiceBusyError,
+    integrity_error_handler,
+    general_exception_handler,
+    instagram_api_error_handler,
+    service_busy_error_handler
+)
+from app.core.responses import ORJSONResponse
+from app.core.security import password_hasher
+from app.services.instagram import instagram_service
+from app.services.metrics_retention import retention_scheduler
+from app.services.model_registry import model_registry
+from app.services.similarity import similarity_index
 # Import models to register them with SQLAlchemy
 from app.models import User, InstagramAccount, InstagramMedia  # noqa: F401
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open shared resources on startup and release them on shutdown."""
+    await instagram_service.startup()
+    await model_registry.startup()
+    await retention_scheduler.startup()
+    try:
+        yield
+    finally:
+        await retention_scheduler.shutdown()
+        await model_registry.shutdown()
+        await similarity_index.shutdown()
+        await instagram_service.shutdown()
+        await response_cache.shutdown()
+        password_hasher.shutdown()
+
+
 app = FastAPI(
     title="Instagram Predictive Analytics Dashboard API",
     description="Backend API for Instagram analytics and predictions",
     version="0.1.0",
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Set up CORS middleware
@@ -28,8 +66,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count SQL queries per request against DB_QUERY_BUDGET
+app.add_middleware(query_budget.QueryCounterMiddleware)
+
 # Add exception handlers
 app.add_exception_handler(IntegrityError, integrity_error_handler)
+app.add_exception_handler(InstagramAPIError, instagram_api_error_handler)
+app.add_exception_handler(ServiceBusyError, service_busy_error_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
 # Include API routes
@@ -45,4 +88,64 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/db-pool")
+async def db_pool_stats():
+    """Database connection pool usage, waiters and checkout wait times."""
+    return get_db_pool_stats()
+
+
+@app.get("/health/db-queries")
+async def db_query_stats():
+    """SQL queries per request and query budget overruns."""
+    return query_budget.get_stats()
+
+
+@app.get("/health/instagram-http")
+async def instagram_http_pool_stats():
+    """Instagram HTTP client connection pool stats."""
+    return instagram_service.get_pool_stats()
+
+
+@app.get("/health/instagram-api")
+async def instagram_api_resilience_stats():
+    """Instagram API retry, circuit breaker and latency stats."""
+    return instagram_service.get_resilience_stats()
+
+
+@app.get("/health/cache")
+async def response_cache_stats():
+    """Response cache hit, miss and backend stats."""
+    return response_cache.get_stats()
+
+
+@app.get("/health/auth-cache")
+async def auth_cache_stats():
+    """Token and user cache hit/miss stats."""
+    return auth_cache.get_stats()
+
+
+@app.get("/health/models")
+async def model_registry_stats():
+    """Forecast model cache and background retraining stats."""
+    return model_registry.get_stats()
+
+
+@app.get("/health/metrics-retention")
+async def metrics_retention_stats():
+    """Scheduled metrics snapshot retention runs."""
+    return retention_scheduler.get_stats()
+
+
+@app.get("/health/similarity")
+async def similarity_index_stats():
+    """Similar post search queries, matrix builds and mapping cache stats."""
+    return similarity_index.get_stats()
+
+
+@app.get("/health/password-hashing")
+async def password_hashing_stats():
+    """Password hashing pool stats."""
+    return password_hasher.get_stats()
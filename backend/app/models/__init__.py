@@ -5,5 +5,28 @@ Import all models here to ensure they are registered with SQLAlchemy.
 
 from app.models.user import User
 from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.metrics import InstagramMediaMetricsSnapshot, InstagramAccountMetricsSnapshot
+from app.models.rollups import (
+    InstagramAccountDailyRollup,
+    InstagramAccountWeeklyRollup,
+    InstagramContentPercentiles,
+    InstagramPostingTimeHistogram,
+    InstagramCaptionTerm,
+    InstagramCaptionPosting
+)
+from app.models.predictions import InstagramForecastModel
 
-__all__ = ["User", "InstagramAccount", "InstagramMedia"] 
\ No newline at end of file
+__all__ = [
+    "User",
+    "InstagramAccount",
+    "InstagramMedia",
+    "InstagramMediaMetricsSnapshot",
+    "InstagramAccountMetricsSnapshot",
+    "InstagramAccountDailyRollup",
+    "InstagramAccountWeeklyRollup",
+    "InstagramContentPercentiles",
+    "InstagramPostingTimeHistogram",
+    "InstagramCaptionTerm",
+    "InstagramCaptionPosting",
+    "InstagramForecastModel"
+] 
\ No newline at end of file
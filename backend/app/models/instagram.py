@@ -3,7 +3,7 @@ Instagram integration models.
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, BigInteger
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, BigInteger, Index, func, literal_column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -31,14 +31,19 @@ class InstagramAccount(Base):
     is_active = Column(Boolean, default=True)
     is_connected = Column(Boolean, default=True)
     last_sync_at = Column(DateTime, nullable=True)
+
+    # Bumped by every ingest, only moves on commit. Keys cached responses and forecast model staleness
+    data_version = Column(BigInteger, nullable=False, default=0, server_default="0")
     
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
-    user = relationship("User", back_populates="instagram_accounts")
-    media_items = relationship("InstagramMedia", back_populates="account", cascade="all, delete-orphan")
+    # Relationships, never lazy loaded: use selectinload or joins explicitly
+    user = relationship("User", back_populates="instagram_accounts", lazy="raise_on_sql")
+    media_items = relationship(
+        "InstagramMedia", back_populates="account", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
 
 
 class InstagramMedia(Base):
@@ -64,5 +69,28 @@ class InstagramMedia(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
-    account = relationship("InstagramAccount", back_populates="media_items") 
\ No newline at end of file
+    # Relationships, never lazy loaded: use selectinload or joins explicitly
+    account = relationship("InstagramAccount", back_populates="media_items", lazy="raise_on_sql")
+
+    __table_args__ = (
+        # Keyset pagination over an account's media, newest first
+        Index(
+            "ix_instagram_media_account_timestamp_id",
+            account_id,
+            timestamp.desc().nulls_last(),
+            id.desc()
+        ),
+        # Content performance filters by media type within a date range
+        Index("ix_instagram_media_account_type_timestamp", account_id, media_type, timestamp),
+        # Similar post search reads the posts changed since its vectors were built
+        Index("ix_instagram_media_account_updated_at", account_id, updated_at),
+        # Content performance reads the top and bottom posts by metric in index order
+        Index("ix_instagram_media_account_likes", account_id, func.coalesce(like_count, literal_column("0")), id),
+        Index("ix_instagram_media_account_comments", account_id, func.coalesce(comments_count, literal_column("0")), id),
+        Index(
+            "ix_instagram_media_account_engagement",
+            account_id,
+            func.coalesce(like_count, literal_column("0")) + func.coalesce(comments_count, literal_column("0")),
+            id
+        ),
+    ) 
\ No newline at end of file
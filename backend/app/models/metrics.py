@@ -0,0 +1,50 @@
+"""
+Time-series metrics snapshot models.
+
+Snapshot tables are append-only and range-partitioned by month on
+captured_at. Partitions are created on demand by MetricsSnapshotCRUD and
+dropped wholesale by the retention policy.
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from app.core.database import Base
+
+# Snapshot resolutions, raw rows are downsampled to hourly and then daily
+GRANULARITY_RAW = "raw"
+GRANULARITY_HOURLY = "hourly"
+GRANULARITY_DAILY = "daily"
+
+
+class InstagramMediaMetricsSnapshot(Base):
+    """Point-in-time metrics of an Instagram media post."""
+    __tablename__ = "instagram_media_metrics_snapshots"
+
+    media_id = Column(Integer, primary_key=True)
+    captured_at = Column(DateTime, primary_key=True)
+    account_id = Column(Integer, nullable=False)
+    like_count = Column(Integer, nullable=False, default=0)
+    comments_count = Column(Integer, nullable=False, default=0)
+    granularity = Column(String(10), nullable=False, default=GRANULARITY_RAW)
+
+    __table_args__ = (
+        Index("ix_instagram_media_metrics_snapshots_captured_at", captured_at, postgresql_using="brin"),
+        Index("ix_instagram_media_metrics_snapshots_account_captured", account_id, captured_at),
+        {"postgresql_partition_by": "RANGE (captured_at)"},
+    )
+
+
+class InstagramAccountMetricsSnapshot(Base):
+    """Point-in-time metrics of an Instagram account."""
+    __tablename__ = "instagram_account_metrics_snapshots"
+
+    account_id = Column(Integer, primary_key=True)
+    captured_at = Column(DateTime, primary_key=True)
+    followers_count = Column(Integer, nullable=False, default=0)
+    following_count = Column(Integer, nullable=False, default=0)
+    media_count = Column(Integer, nullable=False, default=0)
+    granularity = Column(String(10), nullable=False, default=GRANULARITY_RAW)
+
+    __table_args__ = (
+        Index("ix_instagram_account_metrics_snapshots_captured_at", captured_at, postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (captured_at)"},
+    )
@@ -0,0 +1,31 @@
+"""
+Prediction model registry.
+
+Fitted forecasting models are stored per account as compact packed parameter
+rows, versioned so a retrain never overwrites the model being served.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, Date, DateTime, ForeignKey, LargeBinary, String
+from app.core.database import Base
+
+
+class InstagramForecastModel(Base):
+    """One fitted version of an Instagram account's engagement forecasting model."""
+    __tablename__ = "instagram_forecast_models"
+
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, primary_key=True)
+
+    model = Column(String(30), nullable=False)  # holt_winters or mean
+    params = Column(LargeBinary, nullable=False)  # Packed float64 row, see app.services.forecasting
+    params_format = Column(SmallInteger, nullable=False)
+
+    # Fitted series: history_days ending on fitted_through, observations of them non-padding
+    history_days = Column(Integer, nullable=False)
+    observations = Column(Integer, nullable=False)
+    fitted_through = Column(Date, nullable=False)
+    fitted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Account data_version read before loading the fitted series
+    data_version = Column(BigInteger, nullable=True)
@@ -0,0 +1,119 @@
+"""
+Pre-aggregated analytics models.
+
+Growth rollups hold one row per account and day (or ISO week) and are
+refreshed incrementally by AccountRollupCRUD whenever media or account metrics
+are ingested, so growth analytics read O(days) rows instead of scanning posts.
+Content percentile tables hold per-account metric distributions so a post's
+percentile rank is a constant-time lookup. Posting time histograms hold
+one decay-weighted hour-of-week engagement distribution per account, updated
+with per-post deltas on ingest. The caption index maps each account's
+hashtags, mentions and words to posting lists with per-post engagement, plus
+per-term totals for ranking.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, BigInteger, Date, DateTime, Float, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.core.database import Base
+
+
+class InstagramAccountDailyRollup(Base):
+    """Per-day growth aggregates of an Instagram account."""
+    __tablename__ = "instagram_account_daily_rollups"
+
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Posts published that day and their current interaction totals
+    posts = Column(Integer, nullable=False, default=0)
+    likes = Column(BigInteger, nullable=False, default=0)
+    comments = Column(BigInteger, nullable=False, default=0)
+
+    # Last account metrics captured that day, NULL when none were captured
+    followers_count = Column(Integer, nullable=True)
+    following_count = Column(Integer, nullable=True)
+    media_count = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class InstagramAccountWeeklyRollup(Base):
+    """Per-ISO-week growth aggregates of an Instagram account, built from daily rollups."""
+    __tablename__ = "instagram_account_weekly_rollups"
+
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), primary_key=True)
+    week_start = Column(Date, primary_key=True)  # Monday
+
+    posts = Column(Integer, nullable=False, default=0)
+    likes = Column(BigInteger, nullable=False, default=0)
+    comments = Column(BigInteger, nullable=False, default=0)
+
+    followers_count = Column(Integer, nullable=True)
+    following_count = Column(Integer, nullable=True)
+    media_count = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class InstagramContentPercentiles(Base):
+    """Cached distribution of a content metric over an account's media."""
+    __tablename__ = "instagram_content_percentiles"
+
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String(30), primary_key=True)
+
+    # Metric value at percentiles 0, 1, ..., 100
+    breakpoints = Column(ARRAY(Float), nullable=False)
+    posts = Column(Integer, nullable=False, default=0)
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class InstagramPostingTimeHistogram(Base):
+    """Decay-weighted hour-of-week engagement histogram of an Instagram account's posts."""
+    __tablename__ = "instagram_posting_time_histograms"
+
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), primary_key=True)
+
+    # 168 UTC hour-of-week bins, Monday 00:00 first. A post's weight halves every
+    # half_life_days and is stored relative to decay_anchor, so adding or
+    # removing a post never rescales the other bins.
+    weights = Column(ARRAY(Float), nullable=False)
+    interactions = Column(ARRAY(Float), nullable=False)  # Weighted likes + comments
+    posts = Column(ARRAY(Integer), nullable=False)  # Unweighted post counts
+    decay_anchor = Column(DateTime, nullable=False)
+    half_life_days = Column(Float, nullable=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class InstagramCaptionTerm(Base):
+    """A caption term of an Instagram account with totals over the posts using it."""
+    __tablename__ = "instagram_caption_terms"
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("instagram_accounts.id", ondelete="CASCADE"), nullable=False)
+    term = Column(String(100), nullable=False)  # #hashtag, @mention or lowercased word
+    kind = Column(String(10), nullable=False)  # hashtag, mention, word, or posts for the account totals
+
+    posts = Column(Integer, nullable=False, default=0)
+    interactions = Column(BigInteger, nullable=False, default=0)  # Likes + comments of those posts
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_instagram_caption_terms_account_term", account_id, term, unique=True),
+    )
+
+
+class InstagramCaptionPosting(Base):
+    """One post using a caption term, with the post's interactions."""
+    __tablename__ = "instagram_caption_postings"
+
+    term_id = Column(Integer, ForeignKey("instagram_caption_terms.id", ondelete="CASCADE"), primary_key=True)
+    media_id = Column(Integer, ForeignKey("instagram_media.id", ondelete="CASCADE"), primary_key=True)
+    interactions = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_instagram_caption_postings_media_id", media_id),
+    )
@@ -24,8 +24,10 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-    # Relationships
-    instagram_accounts = relationship("InstagramAccount", back_populates="user", cascade="all, delete-orphan")
+    # Relationships, never lazy loaded: use selectinload or joins explicitly
+    instagram_accounts = relationship(
+        "InstagramAccount", back_populates="user", cascade="all, delete-orphan", lazy="raise_on_sql"
+    )
 
     def __repr__(self):
         return f"<User(id={self.id}, username='{self.username}', email='{self.email}')>" 
\ No newline at end of file
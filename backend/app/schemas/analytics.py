@@ -0,0 +1,105 @@
+"""
+Pydantic schemas for analytics endpoints.
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class EngagementTotals(BaseModel):
+    """Schema for account-wide engagement totals."""
+    posts: int
+    likes: int
+    comments: int
+    avg_likes: float
+    avg_comments: float
+    avg_interactions: float
+    engagement_rate: Optional[float] = None  # Avg interactions per post as % of followers
+
+
+class MediaTypeEngagement(BaseModel):
+    """Schema for engagement of one media type."""
+    media_type: str
+    posts: int
+    avg_likes: float
+    avg_comments: float
+    avg_interactions: float
+    engagement_rate: Optional[float] = None
+
+
+class RollingEngagementPoint(BaseModel):
+    """Schema for one day of the rolling engagement series."""
+    date: date
+    posts: int
+    interactions: int
+    rolling_avg_interactions: float
+
+
+class EngagementAnalytics(BaseModel):
+    """Schema for the engagement analytics response."""
+    account_id: int
+    followers_count: int
+    totals: EngagementTotals
+    by_media_type: List[MediaTypeEngagement]
+    by_day_of_week: List[float]  # Avg interactions per post, Monday first
+    by_hour: List[float]  # Avg interactions per post by UTC hour
+    percentiles: Dict[str, float]  # Interactions per post percentiles
+    rolling: List[RollingEngagementPoint]
+
+
+class GrowthPoint(BaseModel):
+    """Schema for one day or week of the growth series."""
+    period_start: date
+    posts: int
+    likes: int
+    comments: int
+    interactions: int
+    followers_count: Optional[int] = None  # Last known value, carried forward
+    followers_change: Optional[int] = None  # Change from the previous period
+
+
+class GrowthSummary(BaseModel):
+    """Schema for growth totals over the requested range."""
+    posts: int
+    likes: int
+    comments: int
+    followers_start: Optional[int] = None
+    followers_end: Optional[int] = None
+    followers_change: Optional[int] = None
+    followers_growth_rate: Optional[float] = None  # Percent of followers_start
+
+
+class GrowthAnalytics(BaseModel):
+    """Schema for the growth analytics response."""
+    account_id: int
+    granularity: str  # day or week
+    start: date
+    end: date
+    summary: GrowthSummary
+    points: List[GrowthPoint]
+
+
+class ContentPerformanceItem(BaseModel):
+    """Schema for one ranked post."""
+    id: int
+    instagram_media_id: str
+    media_type: str
+    permalink: Optional[str] = None
+    caption: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    like_count: int
+    comments_count: int
+    value: Optional[float] = None  # Value of the ranking metric
+    percentile: Optional[float] = None  # Percentile rank among all the account's posts
+
+
+class ContentPerformance(BaseModel):
+    """Schema for the content performance response."""
+    account_id: int
+    metric: str
+    media_type: Optional[str] = None
+    start: Optional[date] = None
+    end: Optional[date] = None
+    top: List[ContentPerformanceItem]
+    bottom: List[ContentPerformanceItem]
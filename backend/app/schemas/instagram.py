@@ -74,6 +74,24 @@ class InstagramMediaUpdate(BaseModel):
     caption: Optional[str] = None
 
 
+class InstagramMediaBulkLoadResult(BaseModel):
+    """Schema for the outcome of a COPY-based bulk media load."""
+    rows: int = 0
+    chunks: int = 0
+    last_chunk: int = -1  # Index of the last committed chunk, resume from last_chunk + 1
+    seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+
+class InstagramExportImportResult(BaseModel):
+    """Schema for the outcome of a data export import."""
+    posts: int
+    imported: int
+    skipped: int
+    seconds: float
+    rows_per_second: float
+
+
 class InstagramMediaResponse(InstagramMediaBase):
     """Schema for Instagram media in API responses."""
     id: int
@@ -87,6 +105,12 @@ class InstagramMediaResponse(InstagramMediaBase):
         from_attributes = True
 
 
+class InstagramMediaPage(BaseModel):
+    """Schema for a keyset-paginated page of Instagram media."""
+    items: List[InstagramMediaResponse]
+    next_cursor: Optional[str] = None
+
+
 # Instagram API Response Schemas
 class InstagramUserProfile(BaseModel):
     """Schema for Instagram user profile from API."""
@@ -106,6 +130,13 @@ class InstagramMediaItem(BaseModel):
     timestamp: Optional[str] = None
 
 
+class InstagramMediaDetailsResult(BaseModel):
+    """Schema for one entry of a batch media details fetch."""
+    media_id: str
+    item: Optional[InstagramMediaItem] = None
+    error: Optional[str] = None
+
+
 class InstagramMediaList(BaseModel):
     """Schema for Instagram media list from API."""
     data: List[InstagramMediaItem]
@@ -0,0 +1,93 @@
+"""
+Pydantic schemas for prediction endpoints.
+"""
+
+from datetime import date
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.schemas.instagram import InstagramMediaResponse
+
+
+class ForecastPoint(BaseModel):
+    """Schema for one forecast day."""
+    date: date
+    value: float
+    lower: float  # Lower bound of the prediction interval
+    upper: float  # Upper bound of the prediction interval
+
+
+class AccountEngagementForecast(BaseModel):
+    """Schema for the daily interactions forecast of one account."""
+    account_id: int
+    username: str
+    model: str  # holt_winters, or mean for accounts with under two weeks of history
+    model_version: Optional[int] = None  # Registry version, None when fitted for this request
+    observed_days: int
+    alpha: float
+    beta: float
+    gamma: float
+    residual_std: float  # Standard deviation of one-step-ahead errors
+    points: List[ForecastPoint]
+
+
+class EngagementForecast(BaseModel):
+    """Schema for the engagement forecast response."""
+    start: date  # First forecast day (UTC)
+    horizon_days: int
+    history_days: int
+    interval_level: float
+    accounts: List[AccountEngagementForecast]
+
+
+class PostingTimeSlot(BaseModel):
+    """Schema for one local hour of the week."""
+    day_of_week: int  # 0 is Monday
+    hour: int  # Local hour, 0-23
+    expected_interactions: float  # Smoothed, decay-weighted likes + comments per post
+    effective_posts: float  # Decay-weighted posts published in this hour
+
+
+class OptimalPostingTimes(BaseModel):
+    """Schema for the optimal posting times response."""
+    account_id: int
+    username: str
+    timezone: str
+    utc_offset_hours: float  # Current offset the UTC histogram was shifted by
+    half_life_days: float
+    posts: int  # Timestamped posts in the histogram
+    best_times: List[PostingTimeSlot]  # Local peaks, best first
+    heatmap: List[List[float]]  # Expected interactions per post, [day_of_week][hour]
+
+
+class ContentTermRecommendation(BaseModel):
+    """Schema for one recommended caption term."""
+    term: str  # #hashtag, @mention or word
+    kind: str  # hashtag, mention or word
+    posts: int
+    mean_interactions: float  # Likes + comments per post using the term
+    lift: float  # Smoothed mean relative to the account mean, 1.0 is average
+
+
+class ContentRecommendations(BaseModel):
+    """Schema for the content recommendations response."""
+    account_id: int
+    username: str
+    posts: int  # Indexed posts
+    mean_interactions: float
+    min_posts: int
+    terms: List[ContentTermRecommendation]  # Highest lift first
+
+
+class SimilarMediaItem(InstagramMediaResponse):
+    """Schema for one post similar to the queried one."""
+    similarity: float  # Cosine similarity of caption TF-IDF vectors, 0 to 1
+    interactions: int  # Likes + comments
+
+
+class SimilarMedia(BaseModel):
+    """Schema for the similar posts response."""
+    account_id: int
+    media_id: int
+    items: List[SimilarMediaItem]  # Most similar first
+    indexing: bool = False  # Caption vectors are still being built, retry shortly
@@ -0,0 +1,353 @@
+"""
+Analytics engines.
+
+Engagement analytics fetch an account's media as one row of column arrays
+(array_agg per column) and compute every aggregate with NumPy, so the cost per
+request is one query plus a handful of O(n) array passes regardless of post
+count. Growth analytics only read the pre-aggregated daily/weekly rollups, so
+their cost is O(days) in the requested range. Content performance ranks posts
+with bounded top-k queries and looks percentiles up in cached per-account
+tables.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, NamedTuple, Optional, Union
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.constants import INSTAGRAM_MEDIA_TYPES
+from app.crud.content import CONTENT_METRICS, content_performance_crud, percentile_rank
+from app.crud.rollups import account_rollup_crud, week_start
+from app.models.instagram import InstagramMedia
+from app.models.rollups import InstagramAccountDailyRollup, InstagramAccountWeeklyRollup
+from app.schemas.analytics import (
+    ContentPerformance,
+    ContentPerformanceItem,
+    EngagementAnalytics,
+    EngagementTotals,
+    GrowthAnalytics,
+    GrowthPoint,
+    GrowthSummary,
+    MediaTypeEngagement,
+    RollingEngagementPoint
+)
+
+SECONDS_PER_DAY = 86400
+SECONDS_PER_HOUR = 3600
+EPOCH = date(1970, 1, 1)
+
+# Interactions-per-post percentiles reported by the engine
+PERCENTILES = [25, 50, 75, 90, 99]
+
+# Growth series granularities
+GRANULARITY_DAY = "day"
+GRANULARITY_WEEK = "week"
+
+# Media types are loaded as small integer codes, 0 for unknown types
+MEDIA_TYPE_LABELS = ["OTHER"] + list(INSTAGRAM_MEDIA_TYPES.values())
+
+
+class MediaColumns(NamedTuple):
+    """Column arrays for an account's media, one element per post."""
+    media_type: np.ndarray  # int8 index into MEDIA_TYPE_LABELS
+    timestamp: np.ndarray  # float64 seconds since epoch (UTC), NaN when unknown
+    likes: np.ndarray  # int64
+    comments: np.ndarray  # int64
+
+    @property
+    def interactions(self) -> np.ndarray:
+        return self.likes + self.comments
+
+
+async def load_media_columns(db: AsyncSession, account_id: int) -> MediaColumns:
+    """Load an account's media as column arrays with a single aggregate query."""
+    known_types = array(MEDIA_TYPE_LABELS[1:])
+    result = await db.execute(
+        select(
+            func.array_agg(func.coalesce(func.array_position(known_types, InstagramMedia.media_type), 0)),
+            func.array_agg(func.date_part("epoch", InstagramMedia.timestamp)),
+            func.array_agg(func.coalesce(InstagramMedia.like_count, 0)),
+            func.array_agg(func.coalesce(InstagramMedia.comments_count, 0))
+        ).where(InstagramMedia.account_id == account_id)
+    )
+    media_types, timestamps, likes, comments = result.one()
+    return MediaColumns(
+        media_type=np.asarray(media_types or [], dtype=np.int8),
+        timestamp=np.asarray(timestamps or [], dtype=np.float64),  # None -> NaN
+        likes=np.asarray(likes or [], dtype=np.int64),
+        comments=np.asarray(comments or [], dtype=np.int64)
+    )
+
+
+def _safe_mean(totals: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Element-wise totals / counts, 0 where counts is 0."""
+    return np.divide(totals, counts, out=np.zeros(len(totals), dtype=np.float64), where=counts > 0)
+
+
+def _rate(avg_interactions: float, followers_count: int) -> Optional[float]:
+    """Engagement rate in percent of followers, None without followers."""
+    if followers_count <= 0:
+        return None
+    return round(avg_interactions / followers_count * 100, 4)
+
+
+def compute_engagement(
+    account_id: int,
+    columns: MediaColumns,
+    followers_count: int,
+    days: int = 90,
+    window: int = 7
+) -> EngagementAnalytics:
+    """
+    Compute engagement analytics from media column arrays.
+
+    The rolling series covers the `days` days up to the latest post, with a
+    trailing `window`-day average of interactions per post.
+    """
+    interactions = columns.interactions
+    posts = len(interactions)
+
+    avg_likes = float(columns.likes.mean()) if posts else 0.0
+    avg_comments = float(columns.comments.mean()) if posts else 0.0
+    avg_interactions = avg_likes + avg_comments
+    totals = EngagementTotals(
+        posts=posts,
+        likes=int(columns.likes.sum()),
+        comments=int(columns.comments.sum()),
+        avg_likes=round(avg_likes, 4),
+        avg_comments=round(avg_comments, 4),
+        avg_interactions=round(avg_interactions, 4),
+        engagement_rate=_rate(avg_interactions, followers_count)
+    )
+
+    # Per media type breakdown
+    by_media_type = []
+    if posts:
+        codes = columns.media_type
+        labels = len(MEDIA_TYPE_LABELS)
+        type_counts = np.bincount(codes, minlength=labels)
+        type_likes = _safe_mean(np.bincount(codes, weights=columns.likes, minlength=labels), type_counts)
+        type_comments = _safe_mean(np.bincount(codes, weights=columns.comments, minlength=labels), type_counts)
+        for index in np.flatnonzero(type_counts):
+            type_avg = float(type_likes[index] + type_comments[index])
+            by_media_type.append(MediaTypeEngagement(
+                media_type=MEDIA_TYPE_LABELS[index],
+                posts=int(type_counts[index]),
+                avg_likes=round(float(type_likes[index]), 4),
+                avg_comments=round(float(type_comments[index]), 4),
+                avg_interactions=round(type_avg, 4),
+                engagement_rate=_rate(type_avg, followers_count)
+            ))
+
+    # Time-based aggregates only use posts with a known timestamp
+    dated = ~np.isnan(columns.timestamp)
+    seconds = columns.timestamp[dated].astype(np.int64)
+    dated_interactions = interactions[dated]
+    day_index = seconds // SECONDS_PER_DAY
+
+    # 1970-01-01 was a Thursday, shift so Monday is 0
+    weekday = (day_index + 3) % 7
+    hour = (seconds % SECONDS_PER_DAY) // SECONDS_PER_HOUR
+    by_day_of_week = _safe_mean(
+        np.bincount(weekday, weights=dated_interactions, minlength=7),
+        np.bincount(weekday, minlength=7)
+    )
+    by_hour = _safe_mean(
+        np.bincount(hour, weights=dated_interactions, minlength=24),
+        np.bincount(hour, minlength=24)
+    )
+
+    percentiles = {}
+    if posts:
+        values = np.percentile(interactions, PERCENTILES)
+        percentiles = {f"p{p}": round(float(v), 4) for p, v in zip(PERCENTILES, values)}
+
+    rolling = []
+    if len(day_index):
+        last_day = int(day_index.max())
+        first_day = last_day - days + 1
+        # Include `window - 1` extra leading days so the first point has a full window
+        span_start = first_day - window + 1
+        in_span = day_index >= span_start
+        offsets = day_index[in_span] - span_start
+        span = last_day - span_start + 1
+        daily_posts = np.bincount(offsets, minlength=span)
+        daily_interactions = np.bincount(offsets, weights=dated_interactions[in_span], minlength=span)
+
+        posts_cum = np.concatenate(([0], np.cumsum(daily_posts)))
+        interactions_cum = np.concatenate(([0.0], np.cumsum(daily_interactions)))
+        window_posts = posts_cum[window:] - posts_cum[:-window]
+        window_interactions = interactions_cum[window:] - interactions_cum[:-window]
+        rolling_avg = _safe_mean(window_interactions, window_posts)
+
+        first_date = EPOCH + timedelta(days=first_day)
+        for offset in range(days):
+            rolling.append(RollingEngagementPoint(
+                date=first_date + timedelta(days=offset),
+                posts=int(daily_posts[offset + window - 1]),
+                interactions=int(daily_interactions[offset + window - 1]),
+                rolling_avg_interactions=round(float(rolling_avg[offset]), 4)
+            ))
+
+    return EngagementAnalytics(
+        account_id=account_id,
+        followers_count=followers_count,
+        totals=totals,
+        by_media_type=by_media_type,
+        by_day_of_week=np.round(by_day_of_week, 4).tolist(),
+        by_hour=np.round(by_hour, 4).tolist(),
+        percentiles=percentiles,
+        rolling=rolling
+    )
+
+
+async def get_engagement_analytics(
+    db: AsyncSession,
+    account_id: int,
+    followers_count: int,
+    days: int = 90,
+    window: int = 7
+) -> EngagementAnalytics:
+    """Load an account's media columns and compute its engagement analytics."""
+    columns = await load_media_columns(db, account_id)
+    return compute_engagement(account_id, columns, followers_count, days=days, window=window)
+
+
+async def get_growth_analytics(
+    db: AsyncSession,
+    account_id: int,
+    start: date,
+    end: date,
+    granularity: str = GRANULARITY_DAY
+) -> GrowthAnalytics:
+    """
+    Build the growth series of an account from its rollups.
+
+    Periods without a rollup row are filled with zero activity, and the
+    followers count is carried forward from the last period that captured one.
+    Weekly periods start on the Monday of the week containing `start`.
+    """
+    rollups: List[Union[InstagramAccountDailyRollup, InstagramAccountWeeklyRollup]]
+    if granularity == GRANULARITY_WEEK:
+        first_period, step = week_start(start), timedelta(days=7)
+        rollups = await account_rollup_crud.get_weekly(db, account_id, start, end)
+        by_period = {rollup.week_start: rollup for rollup in rollups}
+    else:
+        first_period, step = start, timedelta(days=1)
+        rollups = await account_rollup_crud.get_daily(db, account_id, start, end)
+        by_period = {rollup.day: rollup for rollup in rollups}
+
+    followers = await account_rollup_crud.get_followers_before(db, account_id, first_period)
+    followers_start = followers
+    points = []
+    period = first_period
+    while period <= end:
+        rollup = by_period.get(period)
+        previous = followers
+        if rollup is not None and rollup.followers_count is not None:
+            followers = rollup.followers_count
+        posts = rollup.posts if rollup else 0
+        likes = int(rollup.likes) if rollup else 0
+        comments = int(rollup.comments) if rollup else 0
+        points.append(GrowthPoint(
+            period_start=period,
+            posts=posts,
+            likes=likes,
+            comments=comments,
+            interactions=likes + comments,
+            followers_count=followers,
+            followers_change=followers - previous if followers is not None and previous is not None else None
+        ))
+        period += step
+
+    if followers_start is None:
+        # No history before the range, measure growth from its first known value
+        followers_start = next((point.followers_count for point in points if point.followers_count is not None), None)
+    followers_end = followers
+    followers_change = (
+        followers_end - followers_start
+        if followers_start is not None and followers_end is not None else None
+    )
+    summary = GrowthSummary(
+        posts=sum(point.posts for point in points),
+        likes=sum(point.likes for point in points),
+        comments=sum(point.comments for point in points),
+        followers_start=followers_start,
+        followers_end=followers_end,
+        followers_change=followers_change,
+        followers_growth_rate=(
+            round(followers_change / followers_start * 100, 4)
+            if followers_change is not None and followers_start else None
+        )
+    )
+    return GrowthAnalytics(
+        account_id=account_id,
+        granularity=granularity,
+        start=start,
+        end=end,
+        summary=summary,
+        points=points
+    )
+
+
+async def get_content_performance(
+    db: AsyncSession,
+    account_id: int,
+    followers_count: int,
+    metric: str = "engagement",
+    limit: int = 10,
+    media_type: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None
+) -> ContentPerformance:
+    """
+    Rank an account's posts by a content metric.
+
+    Returns the `limit` best and worst posts matching the filters. Percentiles
+    are relative to all of the account's posts, regardless of the filters.
+    """
+    base_metric = CONTENT_METRICS[metric]
+    now = datetime.utcnow()
+    breakpoints = (await content_performance_crud.get_percentiles(db, account_id)).get(base_metric, [])
+
+    def to_items(ranked) -> List[ContentPerformanceItem]:
+        items = []
+        for media, value in ranked:
+            if metric == "engagement_rate":
+                # Same ordering as engagement, scaled by the current followers
+                metric_value = _rate(value, followers_count)
+            else:
+                metric_value = round(value, 4)
+            items.append(ContentPerformanceItem(
+                id=media.id,
+                instagram_media_id=media.instagram_media_id,
+                media_type=media.media_type,
+                permalink=media.permalink,
+                caption=media.caption,
+                timestamp=media.timestamp,
+                like_count=media.like_count or 0,
+                comments_count=media.comments_count or 0,
+                value=metric_value,
+                percentile=percentile_rank(breakpoints, value)
+            ))
+        return items
+
+    filters = {"media_type": media_type, "start": start, "end": end, "now": now}
+    top = await content_performance_crud.get_ranked(
+        db, account_id, base_metric, limit, descending=True, **filters
+    )
+    bottom = await content_performance_crud.get_ranked(
+        db, account_id, base_metric, limit, descending=False, **filters
+    )
+    return ContentPerformance(
+        account_id=account_id,
+        metric=metric,
+        media_type=media_type,
+        start=start,
+        end=end,
+        top=to_items(top),
+        bottom=to_items(bottom)
+    )
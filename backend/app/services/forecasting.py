@@ -0,0 +1,371 @@
+"""
+Engagement forecasting engine.
+
+Daily interactions (likes + comments of the posts published that day) are
+forecast with additive Holt-Winters, i.e. ETS(A,A,A) with weekly
+seasonality, implemented in NumPy. All series are fitted in one batch: they
+are right-aligned on a shared calendar in a padded 2-D array (NaN before each
+series starts), and smoothing parameters are picked per series by a grid
+search over one-step-ahead errors. The recursion loops over days only; each
+step updates every series and every parameter combination at once, so adding
+accounts grows the arrays, not the Python-level work.
+"""
+
+import asyncio
+from datetime import date, datetime, timedelta
+from statistics import NormalDist
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy import func, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.instagram import InstagramAccount
+from app.models.rollups import InstagramAccountDailyRollup
+from app.schemas.predictions import AccountEngagementForecast, EngagementForecast, ForecastPoint
+
+SEASON_LENGTH = 7
+
+# Series with fewer observed days are forecast by their mean
+MIN_SEASONAL_OBSERVATIONS = 2 * SEASON_LENGTH
+
+# Smoothing parameter grid, beta is given as a fraction of alpha
+ALPHA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5, 0.8)
+BETA_FRACTIONS = (0.0, 0.05, 0.2)
+GAMMA_GRID = (0.0, 0.05, 0.15, 0.3)
+
+# Series fitted per batch, keeps the (series, grid) state arrays cache-sized
+FIT_BATCH_SIZE = 512
+
+MODEL_HOLT_WINTERS = "holt_winters"
+MODEL_MEAN = "mean"
+
+# Stored parameter rows: alpha, beta, gamma, level, trend, sigma, then the
+# season, as little-endian float64 (13 values, 104 bytes per model)
+PARAMS_FORMAT = 1
+PARAMS_DTYPE = np.dtype("<f8")
+PARAMS_COLUMNS = 6 + SEASON_LENGTH
+
+
+def _parameter_grid() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """All admissible (alpha, beta, gamma) combinations as three flat arrays."""
+    alpha, beta_fraction, gamma = np.meshgrid(ALPHA_GRID, BETA_FRACTIONS, GAMMA_GRID, indexing="ij")
+    alpha, gamma = alpha.ravel(), gamma.ravel()
+    beta = alpha * beta_fraction.ravel()
+    valid = gamma <= 1 - alpha
+    return alpha[valid], beta[valid], gamma[valid]
+
+
+PARAMETER_GRID = _parameter_grid()
+
+
+class HoltWintersFit(NamedTuple):
+    """Fitted parameters and final state, one element (or row) per series."""
+    alpha: np.ndarray
+    beta: np.ndarray
+    gamma: np.ndarray
+    level: np.ndarray
+    trend: np.ndarray
+    season: np.ndarray  # (series, SEASON_LENGTH), column 0 applies to the first forecast day
+    sigma: np.ndarray  # Standard deviation of one-step-ahead errors
+    observations: np.ndarray  # Observed days
+    seasonal: np.ndarray  # False for series forecast by their mean
+
+
+def fit_holt_winters(series: np.ndarray) -> HoltWintersFit:
+    """
+    Fit every row of a (series, days) array.
+
+    Rows are NaN before the series starts and fully observed afterwards
+    (days without posts are 0). The last column is the last observed day
+    of every series.
+    """
+    series = np.asarray(series, dtype=np.float64)
+    if series.ndim != 2:
+        raise ValueError("series must be a 2-D array")
+    if len(series) <= FIT_BATCH_SIZE:
+        return _fit_batch(series)
+    batches = [_fit_batch(series[i:i + FIT_BATCH_SIZE]) for i in range(0, len(series), FIT_BATCH_SIZE)]
+    return HoltWintersFit(*(np.concatenate(parts) for parts in zip(*batches)))
+
+
+def _fit_batch(series: np.ndarray) -> HoltWintersFit:
+    """Fit one batch of series with a grid search over PARAMETER_GRID."""
+    n, days = series.shape
+    m = SEASON_LENGTH
+    rows = np.arange(n)
+    alpha, beta, gamma = PARAMETER_GRID
+
+    observed = ~np.isnan(series)
+    observations = observed.sum(axis=1)
+    start = np.where(observations > 0, observed.argmax(axis=1), days)
+    values = np.nan_to_num(series)
+    seasonal = observations >= MIN_SEASONAL_OBSERVATIONS
+
+    # Initial state from the first two seasons; season slots follow the
+    # shared calendar (day index % m), so all series use the same slot per step
+    window = np.minimum(start[:, None] + np.arange(2 * m), days - 1)
+    first, second = values[rows[:, None], window[:, :m]], values[rows[:, None], window[:, m:]]
+    level0 = first.mean(axis=1)
+    trend0 = np.where(seasonal, (second.mean(axis=1) - level0) / m, 0.0)
+    season0 = np.zeros((n, m))
+    season0[rows[:, None], window[:, :m] % m] = first - level0[:, None]
+
+    # State per (series, parameter combination), updated in place; the season
+    # is stored slot-major so each step touches one contiguous (series, grid) block
+    grid = len(alpha)
+    level = np.repeat(level0[:, None], grid, axis=1)
+    trend = np.repeat(trend0[:, None], grid, axis=1)
+    season = np.repeat(season0.T[:, :, None], grid, axis=2)
+    sse = np.zeros((n, grid))
+    error = np.empty((n, grid))
+    scratch = np.empty((n, grid))
+
+    fit_from = np.where(seasonal, start + m, days)
+    all_active_from = int(fit_from.max())
+    for t in range(int(fit_from.min()), days):
+        seasonal_t = season[t % m]
+        np.subtract(values[:, t, None], level, out=error)
+        error -= trend
+        error -= seasonal_t
+        if t < all_active_from:
+            active = (t >= fit_from).astype(np.float64)[:, None]
+            error *= active
+            np.multiply(trend, active, out=scratch)
+            level += scratch
+        else:
+            level += trend
+        level += np.multiply(alpha, error, out=scratch)
+        trend += np.multiply(beta, error, out=scratch)
+        seasonal_t += np.multiply(gamma, error, out=scratch)
+        sse += np.multiply(error, error, out=scratch)
+
+    best = sse.argmin(axis=1)
+    fitted_errors = np.maximum(observations - m, 1)
+    sigma = np.sqrt(sse[rows, best] / fitted_errors)
+    # Rotate the seasonal slots so column 0 is the day after the series ends
+    next_slots = (days + np.arange(m)) % m
+    season_best = season[:, rows, best].T[:, next_slots]
+
+    # Short series: mean and standard deviation of the observed days
+    in_series = np.arange(days)[None, :] >= start[:, None]
+    counts = np.maximum(observations, 1)
+    mean = (values * in_series).sum(axis=1) / counts
+    std = np.sqrt((((values - mean[:, None]) * in_series) ** 2).sum(axis=1) / counts)
+
+    return HoltWintersFit(
+        alpha=np.where(seasonal, alpha[best], 0.0),
+        beta=np.where(seasonal, beta[best], 0.0),
+        gamma=np.where(seasonal, gamma[best], 0.0),
+        level=np.where(seasonal, level[rows, best], mean),
+        trend=np.where(seasonal, trend[rows, best], 0.0),
+        season=np.where(seasonal[:, None], season_best, 0.0),
+        sigma=np.where(seasonal, sigma, std),
+        observations=observations,
+        seasonal=seasonal
+    )
+
+
+def pack_fit(fit: HoltWintersFit) -> np.ndarray:
+    """Pack fitted models into (series, PARAMS_COLUMNS) parameter rows."""
+    return np.column_stack(
+        [fit.alpha, fit.beta, fit.gamma, fit.level, fit.trend, fit.sigma, fit.season]
+    ).astype(PARAMS_DTYPE)
+
+
+def unpack_fit(params: np.ndarray, observations: np.ndarray) -> HoltWintersFit:
+    """Rebuild fitted models from packed parameter rows."""
+    params = np.asarray(params, dtype=np.float64).reshape(-1, PARAMS_COLUMNS)
+    observations = np.asarray(observations, dtype=np.int64)
+    return HoltWintersFit(
+        alpha=params[:, 0],
+        beta=params[:, 1],
+        gamma=params[:, 2],
+        level=params[:, 3],
+        trend=params[:, 4],
+        sigma=params[:, 5],
+        season=params[:, 6:],
+        observations=observations,
+        seasonal=observations >= MIN_SEASONAL_OBSERVATIONS
+    )
+
+
+def fit_packed(series: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit series and return (packed parameter rows, observations); runs in worker processes."""
+    fit = fit_holt_winters(series)
+    return pack_fit(fit), fit.observations
+
+
+class StoredModel(NamedTuple):
+    """A model loaded from the registry."""
+    version: int
+    fitted_through: date
+    history_days: int
+    observations: int
+    params: np.ndarray  # One packed parameter row
+
+
+def forecast_holt_winters(
+    fit: HoltWintersFit,
+    horizon: int,
+    interval_level: float = 0.95,
+    offset: Union[int, np.ndarray] = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Forecast `horizon` days starting `offset` days after the fitted data.
+
+    `offset` is per series when models were fitted through different days.
+    Returns (point, lower, upper) arrays of shape (series, horizon). Interval
+    widths use the ETS(A,A,A) h-step error variance
+    sigma^2 * (1 + sum_{j<h} (alpha + j * beta + gamma * [j % m == 0])^2).
+    Forecasts and bounds are clipped at 0 since interactions are counts.
+    """
+    m = SEASON_LENGTH
+    offset = np.broadcast_to(np.asarray(offset, dtype=np.int64), fit.level.shape)
+    steps = offset[:, None] + np.arange(1, horizon + 1)[None, :]
+    point = (
+        fit.level[:, None]
+        + steps * fit.trend[:, None]
+        + np.take_along_axis(fit.season, (steps - 1) % m, axis=1)
+    )
+
+    max_step = int(steps.max()) if steps.size else 0
+    lags = np.arange(1, max_step)
+    coefficients = (
+        fit.alpha[:, None]
+        + lags[None, :] * fit.beta[:, None]
+        + fit.gamma[:, None] * (lags % m == 0)[None, :]
+    )
+    accumulated = np.concatenate(
+        [np.zeros((len(point), 1)), np.cumsum(coefficients ** 2, axis=1)], axis=1
+    )
+    accumulated = np.take_along_axis(accumulated, steps - 1, axis=1)
+    z = NormalDist().inv_cdf(0.5 + interval_level / 2)
+    half_width = z * fit.sigma[:, None] * np.sqrt(1.0 + accumulated)
+
+    lower = np.maximum(point - half_width, 0.0)
+    upper = np.maximum(point + half_width, 0.0)
+    return np.maximum(point, 0.0), lower, upper
+
+
+async def load_daily_interactions(
+    db: AsyncSession, account_ids: Sequence[int], start: date, end: date
+) -> np.ndarray:
+    """
+    Load daily interactions from the daily rollups as a (accounts, days) array.
+
+    Rows follow `account_ids`, columns run from `start` to `end`. Days before
+    an account's first rollup are NaN and later days without a rollup are 0.
+    """
+    days = (end - start).days + 1
+    series = np.full((len(account_ids), days), np.nan)
+    if not account_ids:
+        return series
+
+    rollup = InstagramAccountDailyRollup
+    result = await db.execute(
+        select(
+            func.array_agg(rollup.account_id),
+            func.array_agg(rollup.day - literal(start)),
+            func.array_agg(rollup.likes + rollup.comments)
+        ).where(
+            rollup.account_id.in_(account_ids),
+            rollup.day >= start,
+            rollup.day <= end
+        )
+    )
+    ids, offsets, interactions = result.one()
+    if not ids:
+        return series
+
+    # Map account ids to row indexes without a Python loop over rows
+    order = np.argsort(account_ids)
+    sorted_ids = np.asarray(account_ids)[order]
+    row_index = order[np.searchsorted(sorted_ids, np.asarray(ids))]
+    offsets = np.asarray(offsets, dtype=np.int64)
+
+    first_day = np.full(len(account_ids), days)
+    np.minimum.at(first_day, row_index, offsets)
+    series[np.arange(days)[None, :] >= first_day[:, None]] = 0.0
+    series[row_index, offsets] = np.asarray(interactions, dtype=np.float64)
+    return series
+
+
+async def get_engagement_forecast(
+    db: AsyncSession,
+    accounts: Sequence[InstagramAccount],
+    horizon: int,
+    history_days: int,
+    interval_level: float,
+    models: Optional[Dict[int, StoredModel]] = None,
+    fitter: Optional[Callable[[np.ndarray], Awaitable[Tuple[np.ndarray, np.ndarray]]]] = None
+) -> EngagementForecast:
+    """
+    Forecast daily interactions of several accounts in one batch.
+
+    Accounts with a stored model fitted on `history_days` use it, extended
+    to today when it was fitted through an earlier day. The others are
+    fitted now, all in one batch, by `fitter` (fit_packed in a thread when
+    omitted) so the event loop is not blocked.
+    """
+    models = models or {}
+    today = datetime.utcnow().date()
+    # Today is still in progress, so the history ends yesterday
+    end = today - timedelta(days=1)
+    start = end - timedelta(days=history_days - 1)
+
+    params = np.empty((len(accounts), PARAMS_COLUMNS))
+    observations = np.zeros(len(accounts), dtype=np.int64)
+    offset = np.zeros(len(accounts), dtype=np.int64)
+    used: List[Optional[StoredModel]] = [None] * len(accounts)
+    unfitted: List[int] = []
+    for index, account in enumerate(accounts):
+        stored = models.get(account.id)
+        if stored is None or stored.history_days != history_days:
+            unfitted.append(index)
+            continue
+        used[index] = stored
+        params[index] = stored.params
+        observations[index] = stored.observations
+        offset[index] = max((end - stored.fitted_through).days, 0)
+
+    if unfitted:
+        series = await load_daily_interactions(db, [accounts[index].id for index in unfitted], start, end)
+        if fitter is None:
+            params[unfitted], observations[unfitted] = await asyncio.get_running_loop().run_in_executor(
+                None, fit_packed, series
+            )
+        else:
+            params[unfitted], observations[unfitted] = await fitter(series)
+
+    fit = unpack_fit(params, observations)
+    point, lower, upper = forecast_holt_winters(fit, horizon, interval_level, offset)
+
+    dates = [today + timedelta(days=step) for step in range(horizon)]
+    forecasts: List[AccountEngagementForecast] = []
+    for index, account in enumerate(accounts):
+        forecasts.append(AccountEngagementForecast(
+            account_id=account.id,
+            username=account.username,
+            model=MODEL_HOLT_WINTERS if fit.seasonal[index] else MODEL_MEAN,
+            model_version=used[index].version if used[index] is not None else None,
+            observed_days=int(fit.observations[index]),
+            alpha=round(float(fit.alpha[index]), 6),
+            beta=round(float(fit.beta[index]), 6),
+            gamma=round(float(fit.gamma[index]), 6),
+            residual_std=float(fit.sigma[index]),
+            points=[
+                ForecastPoint(date=day, value=value, lower=low, upper=high)
+                for day, value, low, high in zip(
+                    dates, point[index].tolist(), lower[index].tolist(), upper[index].tolist()
+                )
+            ]
+        ))
+
+    return EngagementForecast(
+        start=today,
+        horizon_days=horizon,
+        history_days=history_days,
+        interval_level=interval_level,
+        accounts=forecasts
+    )
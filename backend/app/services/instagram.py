@@ -2,29 +2,64 @@
 Instagram Basic Display API service.
 """
 
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import time
+from typing import Optional, Dict, Any, List, AsyncIterator, Callable, Tuple
+from datetime import datetime, timedelta, timezone
 import httpx
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlparse
 
 from app.core.config import get_settings
+from app.core.exceptions import (
+    InstagramAPIError,
+    InstagramAuthError,
+    InstagramCircuitOpenError,
+    InstagramClientError,
+    InstagramRateLimitError,
+    InstagramServerError
+)
 from app.core.constants import (
     INSTAGRAM_ENDPOINTS,
     INSTAGRAM_BASIC_SCOPES,
+    INSTAGRAM_BATCH_MAX_REQUESTS,
+    INSTAGRAM_MEDIA_FIELDS,
+    INSTAGRAM_PROFILE_FIELDS,
     INSTAGRAM_DEFAULT_LIMIT,
+    INSTAGRAM_MEDIA_PREFETCH_PAGES,
     INSTAGRAM_TOKEN_EXPIRY_DAYS
 )
 from app.schemas.instagram import (
     InstagramUserProfile,
     InstagramMediaList,
     InstagramMediaItem,
+    InstagramMediaDetailsResult,
     InstagramTokenResponse
 )
+from app.services.rate_limit import KeyedRateLimiter
+from app.services.resilience import (
+    CircuitBreaker,
+    EndpointStats,
+    backoff_delay,
+    parse_retry_after,
+    parse_usage_percent
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Sentinel put on the prefetch queue once the last page has been fetched
+_END_OF_PAGES = object()
+
+
+def parse_instagram_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse a Graph API timestamp (e.g. 2024-01-31T12:00:00+0000) to naive UTC."""
+    if not value:
+        return None
+    parsed = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
 
 class InstagramAPIService:
     """Service for Instagram Basic Display API integration."""
@@ -33,6 +68,224 @@ class InstagramAPIService:
         self.app_id = settings.INSTAGRAM_APP_ID
         self.app_secret = settings.INSTAGRAM_APP_SECRET
         self.redirect_uri = settings.INSTAGRAM_REDIRECT_URI
+        self.batch_url = INSTAGRAM_ENDPOINTS["batch"]
+        self._client: Optional[httpx.AsyncClient] = None
+        self._requests_total = 0
+        self._requests_in_flight = 0
+        self._requests_in_flight_peak = 0
+        self.rate_limiter = KeyedRateLimiter(
+            rate=settings.INSTAGRAM_RATE_LIMIT_PER_SECOND,
+            capacity=settings.INSTAGRAM_RATE_LIMIT_BURST
+        )
+        self._endpoint_stats: Dict[str, EndpointStats] = {}
+
+    def _build_client(self) -> httpx.AsyncClient:
+        """Create the shared HTTP client with the configured connection pool."""
+        http2 = settings.INSTAGRAM_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("INSTAGRAM_HTTP2 is enabled but 'h2' is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=settings.INSTAGRAM_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.INSTAGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.INSTAGRAM_HTTP_KEEPALIVE_EXPIRY
+        )
+        timeout = httpx.Timeout(
+            settings.INSTAGRAM_HTTP_TIMEOUT,
+            connect=settings.INSTAGRAM_HTTP_CONNECT_TIMEOUT,
+            pool=settings.INSTAGRAM_HTTP_POOL_TIMEOUT
+        )
+        return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def startup(self) -> None:
+        """Open the shared HTTP client (called from the app lifespan)."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        logger.info("Instagram HTTP client started")
+
+    async def shutdown(self) -> None:
+        """Close the shared HTTP client and release pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+            logger.info("Instagram HTTP client closed")
+        self._client = None
+
+    def _get_endpoint_stats(self, endpoint: str) -> EndpointStats:
+        """Get resilience stats (and circuit breaker) for an endpoint."""
+        stats = self._endpoint_stats.get(endpoint)
+        if stats is None:
+            stats = EndpointStats(CircuitBreaker(
+                failure_threshold=settings.INSTAGRAM_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.INSTAGRAM_CIRCUIT_RESET_TIMEOUT
+            ))
+            self._endpoint_stats[endpoint] = stats
+        return stats
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        endpoint: Optional[str] = None,
+        retry: bool = True,
+        rate_limit_key: Optional[str] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Send a request through the shared client with retries and circuit breaking.
+
+        Transport errors, 429 and 5xx responses are retried with jittered
+        exponential backoff, honoring Retry-After and Graph API usage headers.
+        When `rate_limit_key` is given every attempt, retries included, takes
+        a token from that key's bucket. Failures are raised as typed
+        InstagramAPIError subclasses.
+        """
+        endpoint = endpoint or urlparse(url).path or "/"
+        stats = self._get_endpoint_stats(endpoint)
+        max_attempts = settings.INSTAGRAM_RETRY_MAX_ATTEMPTS if retry else 1
+
+        for attempt in range(1, max_attempts + 1):
+            if rate_limit_key is not None:
+                await self.rate_limiter.acquire(rate_limit_key)
+            if not stats.breaker.allow_request():
+                stats.rejected += 1
+                raise InstagramCircuitOpenError(
+                    f"circuit open for {endpoint}, Instagram API is degraded",
+                    endpoint=endpoint
+                )
+
+            probe = stats.breaker.state == CircuitBreaker.HALF_OPEN
+            error = await self._send_once(method, url, endpoint, stats, probe, **kwargs)
+            if isinstance(error, httpx.Response):
+                return error
+
+            retryable = not isinstance(error, InstagramClientError)
+            if not retryable or attempt == max_attempts:
+                stats.failures += 1
+                raise error
+
+            delay = backoff_delay(attempt, settings.INSTAGRAM_RETRY_BASE_DELAY, settings.INSTAGRAM_RETRY_MAX_DELAY)
+            if isinstance(error, InstagramRateLimitError) and error.retry_after is not None:
+                if error.retry_after > settings.INSTAGRAM_RETRY_MAX_DELAY:
+                    stats.failures += 1
+                    raise error
+                delay = max(delay, error.retry_after)
+
+            stats.retries += 1
+            logger.warning(
+                f"Retrying Instagram {endpoint} in {delay:.2f}s "
+                f"(attempt {attempt}/{max_attempts}): {str(error)}"
+            )
+            await asyncio.sleep(delay)
+
+        raise InstagramAPIError("retries exhausted", endpoint=endpoint)
+
+    async def _send_once(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        stats: EndpointStats,
+        probe: bool = False,
+        **kwargs: Any
+    ) -> Any:
+        """Send one attempt, returning the response on success or the typed error on failure."""
+        try:
+            return await self._send_attempt(method, url, endpoint, stats, **kwargs)
+        finally:
+            if probe:
+                # A cancelled probe records no outcome and would otherwise block every later one
+                stats.breaker.release_probe()
+
+    async def _send_attempt(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        stats: EndpointStats,
+        **kwargs: Any
+    ) -> Any:
+        """Send the HTTP request and record its outcome on the endpoint's breaker."""
+        stats.requests += 1
+        self._requests_total += 1
+        self._requests_in_flight += 1
+        self._requests_in_flight_peak = max(self._requests_in_flight_peak, self._requests_in_flight)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            stats.breaker.record_failure()
+            return InstagramServerError(f"{type(e).__name__}: {str(e)}", endpoint=endpoint)
+        finally:
+            self._requests_in_flight -= 1
+            stats.latency.observe(time.perf_counter() - started)
+
+        status_code = response.status_code
+        if status_code < 400:
+            stats.breaker.record_success()
+            usage = parse_usage_percent(response)
+            if usage is not None and usage >= settings.INSTAGRAM_USAGE_THROTTLE_PERCENT:
+                # Slow down before Graph API starts rejecting calls outright
+                logger.warning(f"Instagram API usage at {usage:.0f}% for {endpoint}, throttling")
+                await asyncio.sleep(settings.INSTAGRAM_RETRY_BASE_DELAY)
+            return response
+
+        message = f"{status_code} {response.reason_phrase} for {endpoint}"
+        if status_code == 429:
+            # Quotas are per token, so throttling says nothing about API health
+            stats.breaker.record_success()
+            return InstagramRateLimitError(
+                message, retry_after=parse_retry_after(response),
+                status_code=status_code, endpoint=endpoint
+            )
+        if status_code >= 500:
+            stats.breaker.record_failure()
+            return InstagramServerError(message, status_code=status_code, endpoint=endpoint)
+
+        stats.breaker.record_success()
+        if status_code in (401, 403):
+            return InstagramAuthError(message, status_code=status_code, endpoint=endpoint)
+        return InstagramClientError(message, status_code=status_code, endpoint=endpoint)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool utilisation stats for monitoring."""
+        stats: Dict[str, Any] = {
+            "client_open": self._client is not None and not self._client.is_closed,
+            "http2": settings.INSTAGRAM_HTTP2,
+            "max_connections": settings.INSTAGRAM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.INSTAGRAM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "requests_total": self._requests_total,
+            "requests_in_flight": self._requests_in_flight,
+            "requests_in_flight_peak": self._requests_in_flight_peak,
+            "connections": 0,
+            "connections_idle": 0,
+            "connections_active": 0,
+        }
+        if not stats["client_open"]:
+            return stats
+
+        # httpx does not expose pool state publicly, so read it from httpcore
+        pool = getattr(getattr(self._client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        stats["connections"] = len(connections)
+        stats["connections_idle"] = idle
+        stats["connections_active"] = len(connections) - idle
+        return stats
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """Get per-endpoint retry, circuit breaker and latency stats for monitoring."""
+        return {endpoint: stats.to_dict() for endpoint, stats in self._endpoint_stats.items()}
 
     def get_authorization_url(self, state: Optional[str] = None) -> str:
         """Generate Instagram OAuth authorization URL."""
@@ -61,21 +314,22 @@ class InstagramAPIService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    INSTAGRAM_ENDPOINTS["token"],
-                    data=data,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-                response.raise_for_status()
-                token_data = response.json()
-                
-                logger.info(f"Successfully exchanged code for token for user: {token_data.get('user_id')}")
-                return InstagramTokenResponse(**token_data)
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "POST",
+                INSTAGRAM_ENDPOINTS["token"],
+                endpoint="token",
+                retry=False,
+                data=data,
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+            token_data = response.json()
+            
+            logger.info(f"Successfully exchanged code for token for user: {token_data.get('user_id')}")
+            return InstagramTokenResponse(**token_data)
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to exchange code for token: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
 
     async def get_long_lived_token(self, short_lived_token: str) -> Dict[str, Any]:
         """Exchange short-lived token for long-lived token."""
@@ -86,20 +340,20 @@ class InstagramAPIService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{INSTAGRAM_ENDPOINTS['user_profile']}/access_token",
-                    params=params
-                )
-                response.raise_for_status()
-                token_data = response.json()
-                
-                logger.info("Successfully exchanged for long-lived token")
-                return token_data
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "GET",
+                f"{INSTAGRAM_ENDPOINTS['user_profile']}/access_token",
+                endpoint="access_token",
+                params=params
+            )
+            token_data = response.json()
+            
+            logger.info("Successfully exchanged for long-lived token")
+            return token_data
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to get long-lived token: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
 
     async def refresh_token(self, access_token: str) -> Dict[str, Any]:
         """Refresh long-lived access token."""
@@ -109,43 +363,43 @@ class InstagramAPIService:
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{INSTAGRAM_ENDPOINTS['user_profile']}/refresh_access_token",
-                    params=params
-                )
-                response.raise_for_status()
-                token_data = response.json()
-                
-                logger.info("Successfully refreshed access token")
-                return token_data
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "GET",
+                f"{INSTAGRAM_ENDPOINTS['user_profile']}/refresh_access_token",
+                endpoint="refresh_access_token",
+                params=params
+            )
+            token_data = response.json()
+            
+            logger.info("Successfully refreshed access token")
+            return token_data
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to refresh token: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
 
     async def get_user_profile(self, access_token: str) -> InstagramUserProfile:
         """Get Instagram user profile information."""
         params = {
-            "fields": "id,username,account_type,media_count",
+            "fields": INSTAGRAM_PROFILE_FIELDS,
             "access_token": access_token
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    INSTAGRAM_ENDPOINTS["user_profile"],
-                    params=params
-                )
-                response.raise_for_status()
-                profile_data = response.json()
-                
-                logger.info(f"Successfully retrieved profile for user: {profile_data.get('username')}")
-                return InstagramUserProfile(**profile_data)
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "GET",
+                INSTAGRAM_ENDPOINTS["user_profile"],
+                endpoint="user_profile",
+                params=params
+            )
+            profile_data = response.json()
+            
+            logger.info(f"Successfully retrieved profile for user: {profile_data.get('username')}")
+            return InstagramUserProfile(**profile_data)
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to get user profile: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
 
     async def get_user_media(
         self, 
@@ -155,7 +409,7 @@ class InstagramAPIService:
     ) -> InstagramMediaList:
         """Get Instagram user media posts."""
         params = {
-            "fields": "id,media_type,media_url,permalink,caption,timestamp",
+            "fields": INSTAGRAM_MEDIA_FIELDS,
             "access_token": access_token,
             "limit": limit
         }
@@ -164,43 +418,242 @@ class InstagramAPIService:
             params["after"] = after
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    INSTAGRAM_ENDPOINTS["user_media"],
-                    params=params
-                )
-                response.raise_for_status()
-                media_data = response.json()
-                
-                logger.info(f"Successfully retrieved {len(media_data.get('data', []))} media items")
-                return InstagramMediaList(**media_data)
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "GET",
+                INSTAGRAM_ENDPOINTS["user_media"],
+                endpoint="user_media",
+                params=params
+            )
+            media_data = response.json()
+            
+            logger.info(f"Successfully retrieved {len(media_data.get('data', []))} media items")
+            return InstagramMediaList(**media_data)
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to get user media: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
+
+    async def iter_user_media(
+        self,
+        access_token: str,
+        page_size: int = INSTAGRAM_DEFAULT_LIMIT,
+        until: Optional[datetime] = None,
+        stop_when: Optional[Callable[[InstagramMediaItem], bool]] = None,
+        prefetch_pages: int = INSTAGRAM_MEDIA_PREFETCH_PAGES
+    ) -> AsyncIterator[InstagramMediaItem]:
+        """
+        Stream all Instagram user media posts, newest first.
+
+        Pages are fetched by a background task into a bounded queue, so the next
+        page is downloaded while the current one is consumed and at most
+        `prefetch_pages` pages are held in memory. Iteration stops at the first
+        item older than `until` (naive UTC) or for which `stop_when` returns True.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(prefetch_pages, 1))
+
+        async def produce() -> None:
+            after: Optional[str] = None
+            try:
+                while True:
+                    page = await self.get_user_media(access_token, limit=page_size, after=after)
+                    await queue.put(page)
+
+                    paging = page.paging or {}
+                    after = (paging.get("cursors") or {}).get("after")
+                    if not page.data or not paging.get("next") or not after:
+                        break
+            except Exception as e:
+                await queue.put(e)
+                return
+            await queue.put(_END_OF_PAGES)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                page = await queue.get()
+                if page is _END_OF_PAGES:
+                    return
+                if isinstance(page, Exception):
+                    raise page
+
+                for item in page.data:
+                    if until is not None:
+                        item_time = parse_instagram_timestamp(item.timestamp)
+                        if item_time is not None and item_time < until:
+                            return
+                    if stop_when is not None and stop_when(item):
+                        return
+                    yield item
+        finally:
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
 
     async def get_media_details(self, media_id: str, access_token: str) -> InstagramMediaItem:
         """Get details for a specific media item."""
         params = {
-            "fields": "id,media_type,media_url,permalink,caption,timestamp",
+            "fields": INSTAGRAM_MEDIA_FIELDS,
             "access_token": access_token
         }
 
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{INSTAGRAM_ENDPOINTS['media_details']}/{media_id}",
-                    params=params
-                )
-                response.raise_for_status()
-                media_data = response.json()
-                
-                logger.info(f"Successfully retrieved media details for: {media_id}")
-                return InstagramMediaItem(**media_data)
-                
-        except httpx.HTTPError as e:
+            response = await self._request(
+                "GET",
+                f"{INSTAGRAM_ENDPOINTS['media_details']}/{media_id}",
+                endpoint="media_details",
+                rate_limit_key=access_token,
+                params=params
+            )
+            media_data = response.json()
+            
+            logger.info(f"Successfully retrieved media details for: {media_id}")
+            return InstagramMediaItem(**media_data)
+            
+        except InstagramAPIError as e:
             logger.error(f"Failed to get media details for {media_id}: {str(e)}")
-            raise Exception(f"Instagram API error: {str(e)}")
+            raise
+
+    async def get_media_details_batch(
+        self,
+        media_ids: List[str],
+        access_token: str,
+        max_concurrency: Optional[int] = None
+    ) -> List[InstagramMediaDetailsResult]:
+        """
+        Get details for many media items concurrently.
+
+        At most `max_concurrency` requests are in flight and calls are paced by
+        the per-access-token rate limiter. Results are returned in input order;
+        failed items carry an error message instead of aborting the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or settings.INSTAGRAM_MAX_CONCURRENT_REQUESTS)
+
+        async def fetch(media_id: str) -> InstagramMediaDetailsResult:
+            async with semaphore:
+                try:
+                    item = await self.get_media_details(media_id, access_token)
+                    return InstagramMediaDetailsResult(media_id=media_id, item=item)
+                except InstagramAPIError as e:
+                    return InstagramMediaDetailsResult(media_id=media_id, error=str(e))
+
+        results = await asyncio.gather(*(fetch(media_id) for media_id in media_ids))
+
+        failed = sum(1 for result in results if result.error)
+        if failed:
+            logger.warning(f"Failed to retrieve {failed} of {len(media_ids)} media details")
+        return list(results)
+
+    async def batch_get(
+        self,
+        relative_urls: List[str],
+        access_token: str,
+        batch_size: int = INSTAGRAM_BATCH_MAX_REQUESTS
+    ) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+        """
+        Run GET sub-requests through Graph API batch calls.
+
+        URLs are relative to the Graph API root (e.g. "me?fields=id").
+        Requests are packed into batches of at most `batch_size` and the
+        responses are returned as (status code, decoded body) pairs in input
+        order. Sub-requests the API did not process come back as (0, None)
+        and bodies that fail to decode as (status code, None).
+        """
+        batch_size = min(batch_size, INSTAGRAM_BATCH_MAX_REQUESTS)
+        results: List[Tuple[int, Optional[Dict[str, Any]]]] = []
+
+        for start in range(0, len(relative_urls), batch_size):
+            chunk = relative_urls[start:start + batch_size]
+            data = {
+                "access_token": access_token,
+                "include_headers": "false",
+                "batch": json.dumps([{"method": "GET", "relative_url": url} for url in chunk])
+            }
+
+            try:
+                response = await self._request("POST", self.batch_url, endpoint="batch", data=data)
+                entries = response.json()
+            except InstagramAPIError as e:
+                logger.error(f"Failed to execute Instagram batch request: {str(e)}")
+                raise
+            except json.JSONDecodeError:
+                raise InstagramServerError("malformed batch response", endpoint="batch")
+
+            if not isinstance(entries, list) or len(entries) != len(chunk):
+                raise InstagramServerError("malformed batch response", endpoint="batch")
+
+            for url, entry in zip(chunk, entries):
+                if not entry:
+                    results.append((0, None))
+                    continue
+                code = entry.get("code", 0)
+                body = entry.get("body")
+                try:
+                    results.append((code, json.loads(body) if body else None))
+                except json.JSONDecodeError:
+                    logger.warning(f"Undecodable batch sub-response for {url} (status {code})")
+                    results.append((code, None))
+
+        logger.info(f"Executed {len(relative_urls)} Instagram sub-requests in batch")
+        return results
+
+    async def get_media_details_batched(
+        self,
+        media_ids: List[str],
+        access_token: str
+    ) -> List[InstagramMediaDetailsResult]:
+        """Get details for many media items using Graph API batch calls."""
+        responses = await self.batch_get(
+            [f"{media_id}?fields={INSTAGRAM_MEDIA_FIELDS}" for media_id in media_ids],
+            access_token
+        )
+        return [
+            self._to_media_details_result(media_id, code, body)
+            for media_id, (code, body) in zip(media_ids, responses)
+        ]
+
+    async def get_profile_and_media_batched(
+        self,
+        media_ids: List[str],
+        access_token: str
+    ) -> Tuple[InstagramUserProfile, List[InstagramMediaDetailsResult]]:
+        """Get the user profile and media details in as few batch calls as possible."""
+        responses = await self.batch_get(
+            [f"me?fields={INSTAGRAM_PROFILE_FIELDS}"]
+            + [f"{media_id}?fields={INSTAGRAM_MEDIA_FIELDS}" for media_id in media_ids],
+            access_token
+        )
+
+        profile_code, profile_data = responses[0]
+        if profile_code != 200 or not profile_data:
+            raise InstagramAPIError(
+                f"profile request failed with status {profile_code}",
+                status_code=profile_code,
+                endpoint="batch"
+            )
+
+        media_results = [
+            self._to_media_details_result(media_id, code, body)
+            for media_id, (code, body) in zip(media_ids, responses[1:])
+        ]
+        return InstagramUserProfile(**profile_data), media_results
+
+    @staticmethod
+    def _to_media_details_result(
+        media_id: str,
+        code: int,
+        body: Optional[Dict[str, Any]]
+    ) -> InstagramMediaDetailsResult:
+        """Convert one batch sub-response into a media details result."""
+        if code == 200 and body:
+            return InstagramMediaDetailsResult(media_id=media_id, item=InstagramMediaItem(**body))
+
+        error = (body or {}).get("error", {}).get("message") if isinstance(body, dict) else None
+        return InstagramMediaDetailsResult(
+            media_id=media_id,
+            error=f"Instagram API error: {error or f'status {code}'}"
+        )
 
     def calculate_token_expiry(self, expires_in_seconds: int) -> datetime:
         """Calculate token expiry date."""
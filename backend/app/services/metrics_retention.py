@@ -0,0 +1,94 @@
+"""
+Scheduled metrics snapshot retention.
+
+A task started from the app lifespan downsamples and expires metrics
+snapshots every METRICS_RETENTION_INTERVAL_SECONDS (see
+MetricsSnapshotCRUD.apply_retention). A Postgres advisory lock keeps several
+app processes from applying retention at once; `python -m app.cli
+metrics-retention` runs it by hand.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.metrics import metrics_snapshot_crud
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key held while a process applies retention
+RETENTION_LOCK_KEY = 0x5A9F7E2
+
+
+class RetentionScheduler:
+    """Applies the metrics snapshot retention policy in the background."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "skipped_runs": 0,
+            "failed_runs": 0,
+            "last_run_at": None,
+            "last_run_seconds": None,
+            "last_result": None,
+        }
+
+    async def startup(self) -> None:
+        """Start the retention scheduler."""
+        if not settings.METRICS_RETENTION_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """Stop the retention scheduler."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def apply(self) -> Optional[Dict[str, int]]:
+        """Apply retention unless another process is; returns its stats, None when skipped."""
+        async with AsyncSessionLocal() as db:
+            # Held until apply_retention commits, so concurrent processes skip the run
+            locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RETENTION_LOCK_KEY})
+            if not locked:
+                self.stats["skipped_runs"] += 1
+                return None
+            return await metrics_snapshot_crud.apply_retention(db)
+
+    async def _run(self) -> None:
+        """Apply retention every METRICS_RETENTION_INTERVAL_SECONDS."""
+        while True:
+            started = time.perf_counter()
+            try:
+                result = await self.apply()
+                if result is not None:
+                    self.stats["runs"] += 1
+                    self.stats["last_result"] = result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed_runs"] += 1
+                logger.error(f"Metrics snapshot retention failed: {e}")
+            self.stats["last_run_at"] = datetime.utcnow().isoformat()
+            self.stats["last_run_seconds"] = round(time.perf_counter() - started, 3)
+
+            await asyncio.sleep(settings.METRICS_RETENTION_INTERVAL_SECONDS)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export retention run stats for monitoring."""
+        return {**self.stats, "scheduled": self._task is not None}
+
+
+# Create instance to use in the app lifespan
+retention_scheduler = RetentionScheduler()
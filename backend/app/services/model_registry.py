@@ -0,0 +1,209 @@
+"""
+Forecast model registry and background retraining.
+
+Prediction endpoints read fitted parameters through an in-process LRU backed
+by the instagram_forecast_models table instead of refitting per request. A
+scheduler task started from the app lifespan periodically looks for accounts
+whose model is missing or was fitted before their data version last moved,
+and refits them in a process pool so
+fitting never blocks the event loop. A Postgres advisory lock keeps several
+app processes from retraining the same accounts at once.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.predictions import forecast_model_crud
+from app.models.predictions import InstagramForecastModel
+from app.services.forecasting import (
+    MODEL_HOLT_WINTERS,
+    MODEL_MEAN,
+    MIN_SEASONAL_OBSERVATIONS,
+    PARAMS_DTYPE,
+    PARAMS_FORMAT,
+    StoredModel,
+    fit_packed,
+    load_daily_interactions
+)
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key held while a process retrains a batch
+RETRAIN_LOCK_KEY = 0x1F0CA57
+
+
+def _stored_model(record: InstagramForecastModel) -> Optional[StoredModel]:
+    """Decode a registry row, None if it uses an unknown parameter format."""
+    if record.params_format != PARAMS_FORMAT:
+        return None
+    return StoredModel(
+        version=record.version,
+        fitted_through=record.fitted_through,
+        history_days=record.history_days,
+        observations=record.observations,
+        params=np.frombuffer(record.params, dtype=PARAMS_DTYPE)
+    )
+
+
+class ModelRegistry:
+    """Serves stored forecast models and keeps them fresh in the background."""
+
+    def __init__(self):
+        self.cache: TTLCache[StoredModel] = TTLCache(
+            settings.MODEL_CACHE_MAX_ENTRIES, settings.MODEL_CACHE_TTL_SECONDS
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "skipped_runs": 0,
+            "failed_runs": 0,
+            "models_fitted": 0,
+            "last_run_at": None,
+            "last_run_seconds": None,
+        }
+
+    async def startup(self) -> None:
+        """Start the worker processes and the retraining scheduler."""
+        if not settings.MODEL_RETRAIN_ENABLED or self._task is not None:
+            return
+        # Spawned workers do not inherit the event loop, pools or threads of this process
+        self._pool = ProcessPoolExecutor(
+            max_workers=settings.MODEL_RETRAIN_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def shutdown(self) -> None:
+        """Stop the scheduler and the worker processes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def request_retrain(self) -> None:
+        """Wake the scheduler before its next periodic check."""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def get_models(self, db: AsyncSession, account_ids: Sequence[int]) -> Dict[int, StoredModel]:
+        """Get the latest stored model of each account that has one."""
+        models: Dict[int, StoredModel] = {}
+        missing: List[int] = []
+        for account_id in account_ids:
+            model = self.cache.get(account_id)
+            if model is None:
+                missing.append(account_id)
+            else:
+                models[account_id] = model
+
+        if missing:
+            for record in await forecast_model_crud.get_latest(db, missing):
+                model = _stored_model(record)
+                if model is not None:
+                    models[record.account_id] = model
+                    self.cache.set(record.account_id, model)
+            if len(models) < len(account_ids):
+                self.request_retrain()
+        return models
+
+    async def fit(self, series: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Fit series off the event loop: in the worker processes, or a thread when retraining is disabled."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, fit_packed, series)
+
+    async def retrain_stale(self) -> int:
+        """Refit every account whose model is missing or stale; returns the number of models fitted."""
+        history_days = settings.PREDICTION_HISTORY_DAYS
+        fitted = 0
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Held until the batch commits, so concurrent processes skip the run
+                locked = await db.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": RETRAIN_LOCK_KEY})
+                if not locked:
+                    self.stats["skipped_runs"] += 1
+                    return fitted
+
+                fitted_at = datetime.utcnow()
+                end = fitted_at.date() - timedelta(days=1)
+                start = end - timedelta(days=history_days - 1)
+                # Versions are read before the series, so data committed in between triggers a refit
+                candidates = await forecast_model_crud.get_retrain_candidates(
+                    db, limit=settings.MODEL_RETRAIN_BATCH_SIZE
+                )
+                if not candidates:
+                    return fitted
+                account_ids = list(candidates)
+
+                series = await load_daily_interactions(db, account_ids, start, end)
+                params, observations = await self.fit(series)
+                model_names = [
+                    MODEL_HOLT_WINTERS if count >= MIN_SEASONAL_OBSERVATIONS else MODEL_MEAN
+                    for count in observations.tolist()
+                ]
+                versions = await forecast_model_crud.save(
+                    db, account_ids, list(candidates.values()), model_names, params, observations,
+                    PARAMS_FORMAT, history_days, end, fitted_at
+                )
+                await db.commit()
+
+            for account_id, row, count in zip(account_ids, params, observations.tolist()):
+                self.cache.set(account_id, StoredModel(versions[account_id], end, history_days, count, row.copy()))
+            fitted += len(account_ids)
+            logger.info(f"Retrained forecast models of {len(account_ids)} accounts")
+            if len(account_ids) < settings.MODEL_RETRAIN_BATCH_SIZE:
+                return fitted
+
+    async def _run(self) -> None:
+        """Retrain stale models every MODEL_RETRAIN_CHECK_SECONDS or when woken."""
+        while True:
+            started = time.perf_counter()
+            try:
+                self.stats["models_fitted"] += await self.retrain_stale()
+                self.stats["runs"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["failed_runs"] += 1
+                logger.error(f"Forecast model retraining failed: {e}")
+            self.stats["last_run_at"] = datetime.utcnow().isoformat()
+            self.stats["last_run_seconds"] = round(time.perf_counter() - started, 3)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.MODEL_RETRAIN_CHECK_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export registry cache and retraining stats for monitoring."""
+        return {
+            **self.stats,
+            "scheduler_running": self._task is not None and not self._task.done(),
+            "workers": settings.MODEL_RETRAIN_WORKERS if self._pool is not None else 0,
+            "cache": self.cache.get_stats(),
+        }
+
+
+# Create instance to use in endpoints
+model_registry = ModelRegistry()
@@ -0,0 +1,122 @@
+"""
+Optimal posting times engine.
+
+Each account's posts are kept pre-aggregated in a 7x24 UTC hour-of-week
+histogram of decay-weighted post counts and interactions (see
+app.crud.posting_times), so a request is a single small-row read. The bins are
+decayed to now, shifted into the requested timezone, smoothed circularly over
+neighbouring hours and blended with the account mean; the best times are the
+highest local peaks of the resulting expected interactions per post.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from app.core.config import settings
+from app.crud.posting_times import HOURS_PER_WEEK, SECONDS_PER_DAY
+from app.models.instagram import InstagramAccount
+from app.models.rollups import InstagramPostingTimeHistogram
+from app.schemas.predictions import OptimalPostingTimes, PostingTimeSlot
+
+# Circular smoothing over the two hours either side of each bin
+SMOOTHING_KERNEL = np.array([1.0, 4.0, 6.0, 4.0, 1.0]) / 16.0
+SECONDS_PER_HOUR = 3600
+
+
+def shift_bins(values: np.ndarray, hours: float) -> np.ndarray:
+    """
+    Shift hour-of-week bins later by `hours`, wrapping around the week.
+
+    Offsets that are not whole hours split each bin between the two local
+    hours it overlaps.
+    """
+    whole = int(np.floor(hours))
+    fraction = hours - whole
+    shifted = np.roll(values, whole)
+    if fraction:
+        shifted = (1.0 - fraction) * shifted + fraction * np.roll(values, whole + 1)
+    return shifted
+
+
+def smooth_bins(values: np.ndarray) -> np.ndarray:
+    """Smooth hour-of-week bins with SMOOTHING_KERNEL, wrapping around the week."""
+    radius = len(SMOOTHING_KERNEL) // 2
+    return sum(
+        weight * np.roll(values, offset)
+        for offset, weight in zip(range(-radius, radius + 1), SMOOTHING_KERNEL)
+    )
+
+
+def get_optimal_posting_times(
+    account: InstagramAccount,
+    histogram: Optional[InstagramPostingTimeHistogram],
+    timezone: str,
+    top: int,
+    now: Optional[datetime] = None
+) -> OptimalPostingTimes:
+    """
+    Rank an account's local hours of the week by expected interactions per post.
+
+    The UTC histogram is shifted by the timezone's current UTC offset. Each
+    hour's score blends POSTING_TIMES_PRIOR_POSTS posts' worth of the account
+    mean into its smoothed decay-weighted mean, so hours backed by a single
+    lucky post do not win.
+    """
+    now = now or datetime.utcnow()
+    # ZoneInfo.utcoffset reads a naive datetime as local time, so convert from UTC instead
+    offset = now.replace(tzinfo=dt_timezone.utc).astimezone(ZoneInfo(timezone)).utcoffset()
+    offset_hours = offset.total_seconds() / SECONDS_PER_HOUR
+
+    if histogram is None:
+        weights = np.zeros(HOURS_PER_WEEK)
+        interactions = np.zeros(HOURS_PER_WEEK)
+        posts = 0
+        half_life_days = settings.POSTING_TIMES_HALF_LIFE_DAYS
+    else:
+        # Stored weights are relative to the anchor; rescale them to posts' worth as of now
+        half_life_days = histogram.half_life_days
+        age_days = (now - histogram.decay_anchor).total_seconds() / SECONDS_PER_DAY
+        scale = 2.0 ** (-age_days / half_life_days)
+        weights = np.asarray(histogram.weights, dtype=np.float64) * scale
+        interactions = np.asarray(histogram.interactions, dtype=np.float64) * scale
+        posts = int(sum(histogram.posts))
+
+    weights = shift_bins(weights, offset_hours)
+    interactions = shift_bins(interactions, offset_hours)
+    smoothed_weights = smooth_bins(weights)
+    smoothed_interactions = smooth_bins(interactions)
+
+    total_weight = weights.sum()
+    mean = interactions.sum() / total_weight if total_weight > 0 else 0.0
+    prior = settings.POSTING_TIMES_PRIOR_POSTS
+    scores = (smoothed_interactions + prior * mean) / (smoothed_weights + prior)
+
+    # Local maxima with posts nearby, so neighbours of one peak are not all listed
+    peaks = np.flatnonzero(
+        (scores >= np.roll(scores, 1))
+        & (scores >= np.roll(scores, -1))
+        & (smoothed_weights > 0)
+    )
+    best = peaks[np.argsort(-scores[peaks], kind="stable")][:top]
+
+    return OptimalPostingTimes(
+        account_id=account.id,
+        username=account.username,
+        timezone=timezone,
+        utc_offset_hours=offset_hours,
+        half_life_days=half_life_days,
+        posts=posts,
+        best_times=[
+            PostingTimeSlot(
+                day_of_week=int(slot) // 24,
+                hour=int(slot) % 24,
+                expected_interactions=round(float(scores[slot]), 2),
+                effective_posts=round(float(weights[slot]), 3)
+            )
+            for slot in best
+        ],
+        heatmap=np.round(scores, 2).reshape(7, 24).tolist()
+    )
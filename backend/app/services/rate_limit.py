@@ -0,0 +1,64 @@
+"""
+Token-bucket rate limiting for outbound API calls.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available and consume them."""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+
+class KeyedRateLimiter:
+    """Keeps one token bucket per key (e.g. per access token), evicting the least recently used."""
+
+    def __init__(self, rate: float, capacity: float, max_keys: int = 10000):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def get_bucket(self, key: str) -> TokenBucket:
+        """Get the bucket for a key, creating it if needed."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    async def acquire(self, key: str, tokens: float = 1.0) -> None:
+        """Wait for capacity in the bucket for `key`."""
+        await self.get_bucket(key).acquire(tokens)
+
+    def get_stats(self) -> Dict[str, float]:
+        """Get limiter stats for monitoring."""
+        return {"keys": len(self._buckets), "rate": self.rate, "capacity": self.capacity}
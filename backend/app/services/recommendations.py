@@ -0,0 +1,62 @@
+"""
+Content recommendations engine.
+
+Captions are tokenized at ingest time into the per-account caption term index
+(see app.crud.captions), whose terms carry running post and interaction
+totals. Recommendations rank an account's hashtags, mentions and words by lift
+over the account mean straight from those totals, so a request reads at most
+`limit` term rows and never re-tokenizes captions.
+"""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.captions import caption_index_crud
+from app.models.instagram import InstagramAccount
+from app.models.rollups import InstagramCaptionTerm
+from app.schemas.predictions import ContentRecommendations, ContentTermRecommendation
+
+
+async def get_content_recommendations(
+    db: AsyncSession,
+    account: InstagramAccount,
+    totals: Optional[InstagramCaptionTerm],
+    kind: Optional[str],
+    min_posts: int,
+    limit: int
+) -> ContentRecommendations:
+    """
+    Rank an account's caption terms by lift in mean interactions per post.
+
+    A term's mean is blended with CONTENT_TERMS_PRIOR_POSTS posts' worth of
+    the account mean before dividing by it, so terms seen on a few lucky
+    posts do not outrank consistently strong ones.
+    """
+    posts = totals.posts if totals else 0
+    mean = totals.interactions / posts if posts else 0.0
+    prior = settings.CONTENT_TERMS_PRIOR_POSTS
+
+    terms = []
+    if posts and mean > 0:
+        rows = await caption_index_crud.get_top_terms(db, account.id, mean, prior, min_posts, limit, kind)
+        terms = [
+            ContentTermRecommendation(
+                term=term,
+                kind=term_kind,
+                posts=term_posts,
+                mean_interactions=round(interactions / term_posts, 2),
+                lift=round((interactions + prior * mean) / (term_posts + prior) / mean, 3)
+            )
+            for term, term_kind, term_posts, interactions in rows
+        ]
+
+    return ContentRecommendations(
+        account_id=account.id,
+        username=account.username,
+        posts=posts,
+        mean_interactions=round(mean, 2),
+        min_posts=min_posts,
+        terms=terms
+    )
@@ -0,0 +1,180 @@
+"""
+Retry, backoff and circuit breaker primitives for outbound API calls.
+"""
+
+import json
+import random
+import time
+from bisect import bisect_left
+from typing import Dict, Any, List, Optional
+
+import httpx
+
+# Latency histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+# Graph API usage headers, values are JSON with percentages of the quota used
+USAGE_HEADERS = ["x-app-usage", "x-business-use-case-usage"]
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Exponential backoff with full jitter for the given 1-based attempt."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """
+    Get the server-requested wait in seconds, if any.
+
+    Uses the Retry-After header, falling back to the
+    estimated_time_to_regain_access (minutes) of Graph API usage headers.
+    """
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+    regain_minutes = [
+        entry.get("estimated_time_to_regain_access", 0)
+        for entry in _iter_usage_entries(response)
+    ]
+    if regain_minutes and max(regain_minutes) > 0:
+        return max(regain_minutes) * 60.0
+    return None
+
+
+def parse_usage_percent(response: httpx.Response) -> Optional[float]:
+    """Get the highest quota usage percentage reported by Graph API usage headers."""
+    values = [
+        float(value)
+        for entry in _iter_usage_entries(response)
+        for key, value in entry.items()
+        if key in ("call_count", "total_time", "total_cputime") and isinstance(value, (int, float))
+    ]
+    return max(values) if values else None
+
+
+def _iter_usage_entries(response: httpx.Response) -> List[Dict[str, Any]]:
+    """Flatten Graph API usage headers into a list of usage dicts."""
+    entries: List[Dict[str, Any]] = []
+    for header in USAGE_HEADERS:
+        raw = response.headers.get(header)
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            continue
+        # X-Business-Use-Case-Usage maps business ids to lists of usage dicts
+        if isinstance(data, dict) and all(isinstance(value, list) for value in data.values()):
+            entries.extend(entry for value in data.values() for entry in value if isinstance(entry, dict))
+        elif isinstance(data, dict):
+            entries.append(data)
+    return entries
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `reset_timeout` seconds, then lets a single probe through (half-open).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed."""
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Count a failure and open the breaker when the threshold is reached."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Let another probe through when the half-open probe ended without a verdict."""
+        if self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+
+class LatencyHistogram:
+    """Latency histogram with per-bucket (non-cumulative) counts over LATENCY_BUCKETS."""
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        """Record one latency sample."""
+        self.counts[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the histogram for monitoring."""
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "sum": round(self.total, 6),
+        }
+
+
+class EndpointStats:
+    """Resilience counters for a single API endpoint."""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.latency = LatencyHistogram()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the endpoint stats for monitoring."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "breaker_state": self.breaker.state,
+            "breaker_trips": self.breaker.trips,
+            "latency_seconds": self.latency.to_dict(),
+        }
@@ -0,0 +1,405 @@
+"""
+Similar post search over caption TF-IDF vectors.
+
+Posts are compared by cosine similarity of binary TF-IDF vectors over the
+terms of the caption index (see app.crud.captions), so captions are never
+re-tokenized. Each account's L2-normalized vectors are stored as a CSR matrix
+in .npy files under SIMILARITY_INDEX_DIR and memory-mapped, so every worker
+process on a host shares one copy through the page cache. Posts updated since
+a matrix was built are read from the caption index per query into a small
+delta matrix that overrides their rows; once more than
+SIMILARITY_MAX_DELTA_POSTS have changed the matrix is rebuilt in the
+background. Accounts without a stored matrix get one built in the background
+on their first query, which answers without results meanwhile.
+"""
+
+import asyncio
+import contextvars
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.crud.captions import caption_index_crud
+from app.crud.instagram import MEDIA_RESPONSE_COLUMNS
+from app.models.instagram import InstagramMedia
+from app.schemas.predictions import SimilarMedia, SimilarMediaItem
+
+logger = logging.getLogger(__name__)
+
+# Arrays of a stored matrix, one .npy file each
+MATRIX_FILES = ("indptr", "indices", "data", "media_ids", "vocabulary")
+
+# Names the version directory currently in use, replaced atomically
+CURRENT_FILE = "CURRENT"
+
+# Posts updated this long before a build's snapshot started are re-read as
+# changed. Media updated_at comes from the application clock before the write
+# commits, so this covers clock skew and write transactions still open when
+# the snapshot was taken.
+SNAPSHOT_OVERLAP = timedelta(seconds=settings.SIMILARITY_SNAPSHOT_OVERLAP_SECONDS)
+
+
+class TermVectors(NamedTuple):
+    """L2-normalized binary TF-IDF rows of a set of posts."""
+    matrix: sparse.csr_matrix  # One row per post, one column per vocabulary term
+    media_ids: np.ndarray  # int64, sorted, row order
+    vocabulary: np.ndarray  # int64 term ids, sorted, column order
+
+
+class StoredVectors(NamedTuple):
+    """An account's memory-mapped term vectors."""
+    version: str
+    built_at: datetime  # Start of the build's snapshot, UTC
+    vectors: TermVectors
+
+
+def _find(sorted_values: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of `values` in `sorted_values`, and whether each is present there."""
+    positions = np.searchsorted(sorted_values, values)
+    found = np.zeros(len(values), dtype=bool)
+    inside = positions < len(sorted_values)
+    found[inside] = sorted_values[positions[inside]] == values[inside]
+    return positions, found
+
+
+def build_term_vectors(
+    media_ids: np.ndarray,
+    term_ids: np.ndarray,
+    term_posts: np.ndarray,
+    posts: int,
+    vocabulary: Optional[np.ndarray] = None
+) -> TermVectors:
+    """
+    Build TF-IDF rows from (media_id, term_id) postings.
+
+    Captions are short, so term frequency is binary and the weight of a term
+    is its smoothed IDF, ln((1 + posts) / (1 + term_posts)) + 1. Terms missing
+    from a given `vocabulary` get columns after it, in term id order.
+    """
+    row_ids, rows = np.unique(media_ids, return_inverse=True)
+    if vocabulary is None:
+        vocabulary = np.unique(term_ids)
+        columns = np.searchsorted(vocabulary, term_ids)
+    else:
+        columns, known = _find(vocabulary, term_ids)
+        new_terms, new_columns = np.unique(term_ids[~known], return_inverse=True)
+        columns[~known] = len(vocabulary) + new_columns
+        vocabulary = np.concatenate([vocabulary, new_terms])
+
+    weights = np.log((1.0 + posts) / (1.0 + term_posts)) + 1.0
+    norms = np.sqrt(np.bincount(rows, weights * weights, minlength=len(row_ids)))
+    weights = (weights / norms[rows]).astype(np.float32)
+
+    matrix = sparse.csr_matrix(
+        (weights, (rows, columns)), shape=(len(row_ids), len(vocabulary)), dtype=np.float32
+    )
+    return TermVectors(matrix, row_ids, vocabulary)
+
+
+def top_similar(
+    base: TermVectors,
+    delta: TermVectors,
+    changed: np.ndarray,
+    media_id: int,
+    limit: int
+) -> List[Tuple[int, float]]:
+    """
+    Get the `limit` posts most similar to `media_id` as (media_id, cosine) pairs.
+
+    Rows of `base` for posts in `changed` are superseded by `delta`, whose
+    vocabulary extends the base one.
+    """
+    query_ids = np.array([media_id], dtype=np.int64)
+    (delta_row,), (in_delta,) = _find(delta.media_ids, query_ids)
+    (base_row,), (in_base,) = _find(base.media_ids, query_ids)
+    if in_delta:
+        query = delta.matrix[delta_row]
+    elif in_base and media_id not in changed:
+        query = base.matrix[base_row]
+    else:
+        return []  # No terms, or changed to a caption without any
+
+    dense_query = np.zeros(len(delta.vocabulary), dtype=np.float32)
+    dense_query[query.indices] = query.data
+
+    base_scores = base.matrix @ dense_query[:base.matrix.shape[1]]
+    superseded, found = _find(base.media_ids, changed)
+    base_scores[superseded[found]] = 0.0
+
+    media_ids = np.concatenate([base.media_ids, delta.media_ids])
+    scores = np.concatenate([base_scores, delta.matrix @ dense_query])
+    scores[media_ids == media_id] = 0.0
+
+    if len(scores) > limit:
+        candidates = np.argpartition(-scores, limit)[:limit]
+    else:
+        candidates = np.arange(len(scores))
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [
+        (int(media_ids[index]), float(scores[index]))
+        for index in candidates
+        if scores[index] > 0
+    ]
+
+
+class SimilarityIndex:
+    """Builds, maps and queries per-account caption term vectors."""
+
+    def __init__(self):
+        self.root = Path(settings.SIMILARITY_INDEX_DIR)
+        self.cache: TTLCache[StoredVectors] = TTLCache(
+            settings.SIMILARITY_CACHE_MAX_ENTRIES, settings.SIMILARITY_CACHE_TTL_SECONDS
+        )
+        # Rebuilds are at least SIMILARITY_SNAPSHOT_OVERLAP_SECONDS apart, so a
+        # briefly stale CURRENT still names a version that is kept on disk
+        self.current: TTLCache[Tuple[str, datetime]] = TTLCache(
+            settings.SIMILARITY_CACHE_MAX_ENTRIES, settings.SIMILARITY_CURRENT_TTL_SECONDS
+        )
+        self._rebuilding: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.stats: Dict[str, Any] = {
+            "queries": 0,
+            "cold_queries": 0,
+            "builds": 0,
+            "background_builds": 0,
+            "failed_builds": 0,
+            "last_build_posts": None,
+            "last_build_seconds": None,
+        }
+
+    def _account_dir(self, account_id: int) -> Path:
+        """Directory holding an account's stored versions."""
+        return self.root / str(account_id)
+
+    def _read_current(self, account_id: int) -> Optional[Tuple[str, datetime]]:
+        """Get the version and build time of an account's stored matrix."""
+        try:
+            version, built_at = (self._account_dir(account_id) / CURRENT_FILE).read_text().split()
+        except FileNotFoundError:
+            return None
+        return version, datetime.fromisoformat(built_at)
+
+    async def _get_current(self, account_id: int) -> Optional[Tuple[str, datetime]]:
+        """Get an account's current version, reading CURRENT off the event loop at most every few seconds."""
+        current = self.current.get(account_id)
+        if current is None:
+            current = await asyncio.get_running_loop().run_in_executor(None, self._read_current, account_id)
+            if current is not None:
+                self.current.set(account_id, current)
+        return current
+
+    async def is_built(self, account_id: int) -> bool:
+        """Check whether an account has stored vectors."""
+        return await self._get_current(account_id) is not None
+
+    def _map(self, account_id: int, version: str, built_at: datetime) -> StoredVectors:
+        """Memory-map a stored matrix version."""
+        directory = self._account_dir(account_id) / version
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in MATRIX_FILES}
+        matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=(len(arrays["media_ids"]), len(arrays["vocabulary"])),
+            copy=False
+        )
+        return StoredVectors(version, built_at, TermVectors(matrix, arrays["media_ids"], arrays["vocabulary"]))
+
+    async def _load(self, account_id: int) -> Optional[StoredVectors]:
+        """Map an account's current stored matrix, reusing this process's mapping when unchanged."""
+        current = await self._get_current(account_id)
+        if current is None:
+            return None
+        version, built_at = current
+
+        stored = self.cache.get(account_id)
+        if stored is not None and stored.version == version:
+            return stored
+
+        stored = await asyncio.get_running_loop().run_in_executor(None, self._map, account_id, version, built_at)
+        self.cache.set(account_id, stored)
+        return stored
+
+    def _save(self, account_id: int, vectors: TermVectors, built_at: datetime) -> None:
+        """Write a matrix as a new version and make it current, keeping the previous one for open readers."""
+        account_dir = self._account_dir(account_id)
+        # Versions sort by creation time
+        version = f"{int(time.time() * 1000):015d}-{os.getpid()}"
+        directory = account_dir / version
+        directory.mkdir(parents=True)
+
+        matrix = vectors.matrix
+        arrays = {
+            "indptr": matrix.indptr,
+            "indices": matrix.indices,
+            "data": matrix.data,
+            "media_ids": vectors.media_ids,
+            "vocabulary": vectors.vocabulary,
+        }
+        for name in MATRIX_FILES:
+            np.save(directory / f"{name}.npy", arrays[name])
+
+        previous = self._read_current(account_id)
+        pointer = account_dir / f"{CURRENT_FILE}.{version}"
+        pointer.write_text(f"{version} {built_at.isoformat()}")
+        os.replace(pointer, account_dir / CURRENT_FILE)
+
+        # Versions before the replaced one are unused, and deleting newer ones
+        # could remove a version another worker is still writing
+        if previous is not None:
+            for entry in account_dir.iterdir():
+                if entry.is_dir() and entry.name < previous[0]:
+                    shutil.rmtree(entry, ignore_errors=True)
+
+    async def build(self, db: AsyncSession, account_id: int) -> StoredVectors:
+        """Build and store an account's term vectors from the caption index."""
+        started = time.perf_counter()
+        built_at, posts, media_ids, term_ids, term_posts = await caption_index_crud.get_term_vectors(db, account_id)
+
+        def build_and_save() -> TermVectors:
+            vectors = build_term_vectors(
+                np.asarray(media_ids, dtype=np.int64),
+                np.asarray(term_ids, dtype=np.int64),
+                np.asarray(term_posts, dtype=np.float64),
+                posts or 0
+            )
+            self._save(account_id, vectors, built_at)
+            return vectors
+
+        # Large accounts take a while to build; keep other requests served meanwhile
+        vectors = await asyncio.get_running_loop().run_in_executor(None, build_and_save)
+        self.current.pop(account_id)
+        stored = await self._load(account_id)
+
+        self.stats["builds"] += 1
+        self.stats["last_build_posts"] = len(vectors.media_ids)
+        self.stats["last_build_seconds"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Built caption vectors of {len(vectors.media_ids)} posts for account {account_id}")
+        return stored
+
+    async def rebuild(self, db: AsyncSession, account_id: Optional[int] = None) -> int:
+        """
+        Rebuild the stored vectors of one account, or all accounts with
+        indexed captions. Returns the number of accounts rebuilt.
+        """
+        account_ids = [account_id] if account_id is not None else await caption_index_crud.get_indexed_account_ids(db)
+        for indexed_account_id in account_ids:
+            await self.build(db, indexed_account_id)
+            await db.rollback()  # End the read snapshot between accounts
+        return len(account_ids)
+
+    def _rebuild_in_background(self, account_id: int) -> None:
+        """Rebuild an account's vectors in a background task unless one is running."""
+        if account_id in self._rebuilding:
+            return
+        self._rebuilding.add(account_id)
+
+        async def rebuild() -> None:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await self.build(db, account_id)
+                self.stats["background_builds"] += 1
+            except Exception as e:
+                self.stats["failed_builds"] += 1
+                logger.error(f"Rebuilding caption vectors of account {account_id} failed: {e}")
+            finally:
+                self._rebuilding.discard(account_id)
+
+        # A fresh context keeps the build out of the triggering request's query budget
+        task = asyncio.create_task(rebuild(), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def find_similar(
+        self, db: AsyncSession, account_id: int, media_id: int, limit: int
+    ) -> Optional[List[Tuple[int, float]]]:
+        """
+        Get an account's posts most similar to one of its posts, as
+        (media_id, cosine similarity) pairs, best first.
+
+        Returns None while the account's vectors are built in the background
+        after its first query.
+        """
+        self.stats["queries"] += 1
+        stored = await self._load(account_id)
+        if stored is None:
+            self.stats["cold_queries"] += 1
+            self._rebuild_in_background(account_id)
+            return None
+
+        changed, posts, media_ids, term_ids, term_posts = await caption_index_crud.get_changed_term_vectors(
+            db, account_id, stored.built_at - SNAPSHOT_OVERLAP
+        )
+        changed = np.asarray(changed, dtype=np.int64)
+        # Posts updated within SNAPSHOT_OVERLAP of a build stay in the delta,
+        # so rebuilding sooner than that after the last build would not shrink it
+        if (
+            len(changed) > settings.SIMILARITY_MAX_DELTA_POSTS
+            and datetime.utcnow() - stored.built_at > SNAPSHOT_OVERLAP
+        ):
+            self._rebuild_in_background(account_id)
+
+        delta = build_term_vectors(
+            np.asarray(media_ids, dtype=np.int64),
+            np.asarray(term_ids, dtype=np.int64),
+            np.asarray(term_posts, dtype=np.float64),
+            posts or 0,
+            vocabulary=np.asarray(stored.vectors.vocabulary)
+        )
+        return top_similar(stored.vectors, delta, changed, media_id, limit)
+
+    async def shutdown(self) -> None:
+        """Cancel running background rebuilds."""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Export search and build stats for monitoring."""
+        return {
+            **self.stats,
+            "rebuilding": len(self._rebuilding),
+            "cache": self.cache.get_stats(),
+        }
+
+
+# Create instance to use in endpoints
+similarity_index = SimilarityIndex()
+
+
+async def get_similar_posts(db: AsyncSession, account_id: int, media_id: int, limit: int) -> SimilarMedia:
+    """Get the posts of an account whose captions are most similar to one of its posts."""
+    matches = await similarity_index.find_similar(db, account_id, media_id, limit)
+    if matches is None:
+        return SimilarMedia(account_id=account_id, media_id=media_id, items=[], indexing=True)
+
+    items: List[SimilarMediaItem] = []
+    if matches:
+        result = await db.execute(
+            select(*MEDIA_RESPONSE_COLUMNS).where(
+                InstagramMedia.id.in_([match_id for match_id, _ in matches]),
+                InstagramMedia.account_id == account_id
+            )
+        )
+        rows = {row.id: row for row in result.all()}
+        items = [
+            SimilarMediaItem(
+                **rows[match_id]._mapping,
+                similarity=round(score, 4),
+                interactions=rows[match_id].like_count + rows[match_id].comments_count
+            )
+            for match_id, score in matches
+            if match_id in rows
+        ]
+
+    return SimilarMedia(account_id=account_id, media_id=media_id, items=items)
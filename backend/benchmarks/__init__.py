@@ -0,0 +1,11 @@
+"""
+Benchmarks backing the performance figures quoted in commit messages.
+
+Run from the backend directory against a migrated development database
+(DATABASE_URL from .env), for example:
+
+    python -m benchmarks.engagement_analytics
+
+Benchmarks that need data create a throwaway user and account and delete
+them afterwards; timings are the best of several runs.
+"""
@@ -0,0 +1,78 @@
+"""
+Helpers shared by the benchmarks.
+"""
+
+import time
+import uuid
+from typing import Any, Awaitable, Callable, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.user import user_crud
+from app.models.instagram import InstagramAccount
+from app.models.user import User
+
+# Synthetic posts: a mix of media types, one per hour from 2020, 1% without a timestamp
+SEED_MEDIA_SQL = """
+INSERT INTO instagram_media (
+    account_id, instagram_media_id, media_type, caption, permalink, media_url,
+    like_count, comments_count, timestamp, created_at, updated_at
+)
+SELECT
+    :account_id,
+    :prefix || g,
+    (ARRAY['IMAGE', 'VIDEO', 'CAROUSEL_ALBUM'])[1 + g % 3],
+    'benchmark caption #tag' || g % 50,
+    'https://www.instagram.com/p/' || :prefix || g,
+    'https://cdn.example.com/' || :prefix || g || '.jpg',
+    (random() * 500)::int,
+    (random() * 50)::int,
+    CASE WHEN g % 100 = 0 THEN NULL ELSE timestamp '2020-01-01' + g * interval '1 hour' END,
+    timezone('utc', now()),
+    timezone('utc', now())
+FROM generate_series(1, :posts) AS g
+"""
+
+
+async def create_account(db: AsyncSession, posts: int = 0, followers_count: int = 10000) -> Tuple[int, int]:
+    """Create a throwaway user and account with `posts` synthetic posts. Returns (user_id, account_id)."""
+    tag = uuid.uuid4().hex[:12]
+    user = User(email=f"bench-{tag}@example.com", username=f"bench{tag}", hashed_password="-")
+    db.add(user)
+    await db.flush()
+    account = InstagramAccount(
+        user_id=user.id, instagram_user_id=f"bench{tag}", username=f"bench{tag}",
+        access_token="-", followers_count=followers_count
+    )
+    db.add(account)
+    await db.flush()
+    if posts:
+        await db.execute(text(SEED_MEDIA_SQL), {"account_id": account.id, "prefix": f"bench{tag}_", "posts": posts})
+    await db.commit()
+    return user.id, account.id
+
+
+async def drop_user(db: AsyncSession, user_id: int) -> None:
+    """Delete a benchmark user with their account and all its data."""
+    await user_crud.delete(db, user_id)
+
+
+def best_of(function: Callable[[], Any], repeats: int = 7) -> Tuple[float, Any]:
+    """Run `function` `repeats` times, returning the best time in milliseconds and the last result."""
+    timings: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
+
+
+async def best_of_async(function: Callable[[], Awaitable[Any]], repeats: int = 7) -> Tuple[float, Any]:
+    """Await `function()` `repeats` times, returning the best time in milliseconds and the last result."""
+    timings: List[float] = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await function()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000, result
@@ -0,0 +1,33 @@
+"""
+Engagement analytics: loading an account's media as column arrays and
+computing the /analytics/engagement response from them.
+
+    python -m benchmarks.engagement_analytics [--posts 50000]
+"""
+
+import argparse
+import asyncio
+
+from app.core.database import AsyncSessionLocal
+from app.services.analytics import compute_engagement, load_media_columns
+from benchmarks.common import best_of, best_of_async, create_account, drop_user
+
+
+async def main(posts: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id, account_id = await create_account(db, posts)
+        try:
+            load_ms, columns = await best_of_async(lambda: load_media_columns(db, account_id))
+            compute_ms, analytics = best_of(lambda: compute_engagement(account_id, columns, 10000))
+        finally:
+            await drop_user(db, user_id)
+
+    print(f"{posts} posts ({analytics.totals.posts} counted)")
+    print(f"  query + decode  {load_ms:8.1f} ms")
+    print(f"  compute         {compute_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark engagement analytics.")
+    parser.add_argument("--posts", type=int, default=50000)
+    asyncio.run(main(parser.parse_args().posts))
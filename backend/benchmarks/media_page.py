@@ -0,0 +1,76 @@
+"""
+Media page fetch and serialization: ORM entities validated through
+InstagramMediaResponse and rendered with the stdlib encoder, against the
+MEDIA_RESPONSE_COLUMNS rows rendered with orjson that the endpoint returns.
+
+    python -m benchmarks.media_page [--posts 10000]
+"""
+
+import argparse
+import asyncio
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.responses import ORJSONResponse
+from app.crud.instagram import MEDIA_RESPONSE_FIELDS, instagram_media_crud
+from app.models.instagram import InstagramMedia
+from app.schemas.instagram import InstagramMediaPage
+from benchmarks.common import best_of, best_of_async, create_account, drop_user
+
+
+async def main(posts: int) -> None:
+    async with AsyncSessionLocal() as db:
+        user_id, account_id = await create_account(db, posts)
+        try:
+            async def fetch_entities():
+                db.expunge_all()
+                result = await db.execute(
+                    select(InstagramMedia)
+                    .where(InstagramMedia.account_id == account_id)
+                    .order_by(InstagramMedia.timestamp.desc().nulls_last(), InstagramMedia.id.desc())
+                    .limit(posts)
+                )
+                return list(result.scalars().all())
+
+            async def fetch_rows():
+                rows, _ = await instagram_media_crud.get_owned_page(db, account_id, user_id, limit=posts)
+                return rows
+
+            entities_ms, entities = await best_of_async(fetch_entities)
+            rows_ms, rows = await best_of_async(fetch_rows)
+        finally:
+            await drop_user(db, user_id)
+
+    def pydantic_stdlib() -> bytes:
+        return JSONResponse(jsonable_encoder(InstagramMediaPage(items=entities))).body
+
+    def pydantic_orjson() -> bytes:
+        return ORJSONResponse(jsonable_encoder(InstagramMediaPage(items=entities))).body
+
+    def rows_orjson() -> bytes:
+        return ORJSONResponse({
+            "items": [dict(zip(MEDIA_RESPONSE_FIELDS, row)) for row in rows],
+            "next_cursor": None
+        }).body
+
+    stdlib_ms, before = best_of(pydantic_stdlib)
+    mixed_ms, _ = best_of(pydantic_orjson)
+    orjson_ms, after = best_of(rows_orjson)
+
+    print(f"{posts}-post page, {len(after) / 1e6:.1f} MB, bodies equal: {json.loads(before) == json.loads(after)}")
+    print(f"  fetch      ORM entities {entities_ms:8.1f} ms   rows {rows_ms:8.1f} ms")
+    print(
+        f"  serialize  pydantic + stdlib json {stdlib_ms:.1f} ms, pydantic + orjson {mixed_ms:.1f} ms, "
+        f"rows + orjson {orjson_ms:.1f} ms"
+    )
+    print(f"  total      {entities_ms + stdlib_ms:.1f} ms -> {rows_ms + orjson_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark media page serialization.")
+    parser.add_argument("--posts", type=int, default=10000)
+    asyncio.run(main(parser.parse_args().posts))
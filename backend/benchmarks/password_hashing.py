@@ -0,0 +1,95 @@
+"""
+Event loop latency while logins hash passwords.
+
+Concurrent logins run against the app while /health is probed open-loop
+every 10 ms; probe latency counts from when each probe was due, so a blocked
+event loop shows up in full. --blocking verifies the passwords with the sync
+helper on the event loop instead, as login did before the hashing pool.
+
+    python -m benchmarks.password_hashing [--logins 40] [--blocking]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+import httpx
+
+from app.core.database import AsyncSessionLocal
+from app.core.security import verify_password
+from app.crud.user import user_crud
+from app.main import app
+from app.schemas.user import UserCreate
+from benchmarks.common import drop_user
+
+PASSWORD = "benchmark-password"
+PROBE_INTERVAL = 0.01  # Seconds
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+async def main(logins: int, blocking: bool) -> None:
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user = await user_crud.create(
+            db, UserCreate(email=f"bench-{tag}@example.com", username=f"bench{tag}", password=PASSWORD)
+        )
+        user_id, hashed_password = user.id, user.hashed_password
+
+    latencies: List[float] = []
+    stopped = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/health")
+
+        async def probe() -> None:
+            started = time.perf_counter()
+            sent = 0
+            while not stopped.is_set():
+                due = started + sent * PROBE_INTERVAL
+                sent += 1
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await client.get("/health")
+                latencies.append(time.perf_counter() - due)
+
+        async def login() -> None:
+            if blocking:
+                await asyncio.sleep(0)
+                assert verify_password(PASSWORD, hashed_password)
+                return
+            response = await client.post("/api/v1/auth/login", json={"login": f"bench{tag}", "password": PASSWORD})
+            assert response.status_code == 200, response.text
+
+        try:
+            prober = asyncio.create_task(probe())
+            started = time.perf_counter()
+            await asyncio.gather(*(login() for _ in range(logins)))
+            elapsed = time.perf_counter() - started
+            stopped.set()
+            await prober
+        finally:
+            async with AsyncSessionLocal() as db:
+                await drop_user(db, user_id)
+
+    latencies.sort()
+    mode = "blocking verify_password" if blocking else "login endpoint"
+    print(f"{logins} logins ({mode}) in {elapsed:.2f}s")
+    print(
+        f"  /health probes {len(latencies)}: p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark event loop latency during logins.")
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--blocking", action="store_true", help="Hash on the event loop, the pre-pool behaviour")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.logins, arguments.blocking))
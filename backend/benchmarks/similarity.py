@@ -0,0 +1,95 @@
+"""
+Similar post search: a query against an account's memory-mapped caption
+vectors, with no and with some posts changed since the build, and the first
+query of a process that still has to map the stored matrix.
+
+    python -m benchmarks.similarity [--posts 100000] [--changed 500]
+"""
+
+import argparse
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.crud.captions import caption_index_crud
+from app.services.similarity import similarity_index
+from benchmarks.common import best_of_async, create_account, drop_user
+
+# Captions of eight words from a skewed ~17k word vocabulary, one in four a
+# hashtag, last updated well before the vectors are built
+CAPTIONS_SQL = """
+UPDATE instagram_media AS media
+SET caption = words.caption, updated_at = timezone('utc', now()) - interval '1 day'
+FROM (
+    SELECT media.id, string_agg(
+        CASE WHEN word % 4 = 0 THEN '#tag' || (random() ^ 2 * 300)::int
+        ELSE chr(97 + (random() ^ 2 * 25)::int) || chr(97 + (random() * 25)::int) || chr(97 + (random() * 25)::int)
+        END, ' '
+    ) AS caption
+    FROM instagram_media AS media, generate_series(1, 8) AS word
+    WHERE media.account_id = :account_id
+    GROUP BY media.id
+) AS words
+WHERE media.id = words.id
+"""
+
+# Marks the newest posts as changed since the build
+TOUCH_SQL = """
+UPDATE instagram_media SET updated_at = timezone('utc', now())
+WHERE id IN (
+    SELECT id FROM instagram_media WHERE account_id = :account_id ORDER BY id DESC LIMIT :changed
+)
+"""
+
+
+async def main(posts: int, changed: int) -> None:
+    similarity_index.root = Path(tempfile.mkdtemp(prefix="similarity-"))
+    async with AsyncSessionLocal() as db:
+        user_id, account_id = await create_account(db, posts)
+        try:
+            await db.execute(text(CAPTIONS_SQL), {"account_id": account_id})
+            await db.commit()
+            await caption_index_crud.rebuild(db, account_id)
+            media_id = (await db.execute(
+                text("SELECT min(id) FROM instagram_media WHERE account_id = :account_id"),
+                {"account_id": account_id}
+            )).scalar_one()
+
+            await similarity_index.rebuild(db, account_id)
+            build_seconds = similarity_index.stats["last_build_seconds"]
+
+            async def query():
+                matches = await similarity_index.find_similar(db, account_id, media_id, 10)
+                await db.rollback()
+                return matches
+
+            async def cold_query():
+                similarity_index.cache.clear()
+                similarity_index.current.clear()
+                return await query()
+
+            cold_ms, _ = await best_of_async(cold_query)
+            warm_ms, matches = await best_of_async(query)
+            await db.execute(text(TOUCH_SQL), {"account_id": account_id, "changed": changed})
+            await db.commit()
+            delta_ms, _ = await best_of_async(query)
+        finally:
+            await drop_user(db, user_id)
+            shutil.rmtree(similarity_index.root, ignore_errors=True)
+
+    print(f"{posts} posts, build {build_seconds * 1000:.0f} ms, best match {matches[0][1]:.3f}")
+    print(f"  first query (maps the matrix)  {cold_ms:8.1f} ms")
+    print(f"  query                          {warm_ms:8.1f} ms")
+    print(f"  query, {changed:6d} posts changed    {delta_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark similar post search.")
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--changed", type=int, default=500)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.posts, arguments.changed))
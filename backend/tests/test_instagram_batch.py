@@ -0,0 +1,132 @@
+"""Tests for Graph API batch calls and the batched reassembly helpers."""
+
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.core.constants import INSTAGRAM_BATCH_MAX_REQUESTS
+from app.core.exceptions import InstagramAPIError, InstagramServerError
+from app.services.instagram import InstagramAPIService
+
+
+def media_body(media_id: str) -> str:
+    return json.dumps({"id": media_id, "media_type": "IMAGE"})
+
+
+def make_service(handler) -> InstagramAPIService:
+    """Build a service whose shared client answers batch calls with `handler`."""
+    service = InstagramAPIService()
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def sub_requests(request: httpx.Request) -> list:
+    form = parse_qs(request.content.decode())
+    return json.loads(form["batch"][0])
+
+
+def echo_handler(calls: list):
+    """Answer every sub-request with a 200 echoing the requested id."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        batch = sub_requests(request)
+        calls.append(len(batch))
+        entries = []
+        for sub in batch:
+            object_id = sub["relative_url"].split("?")[0]
+            if object_id == "me":
+                body = json.dumps({"id": "1", "username": "someone"})
+            else:
+                body = media_body(object_id)
+            entries.append({"code": 200, "body": body})
+        return httpx.Response(200, json=entries)
+    return handler
+
+
+async def test_batch_get_chunks_past_the_sub_request_limit():
+    calls = []
+    service = make_service(echo_handler(calls))
+    urls = [f"m{i}?fields=id" for i in range(INSTAGRAM_BATCH_MAX_REQUESTS * 2 + 1)]
+
+    results = await service.batch_get(urls, "token")
+
+    assert calls == [INSTAGRAM_BATCH_MAX_REQUESTS, INSTAGRAM_BATCH_MAX_REQUESTS, 1]
+    assert [body["id"] for _, body in results] == [url.split("?")[0] for url in urls]
+    await service.shutdown()
+
+
+async def test_batch_get_maps_null_entries_and_bad_bodies():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[
+            {"code": 200, "body": media_body("a")},
+            None,
+            {"code": 200, "body": "not json"},
+        ])
+
+    service = make_service(handler)
+    results = await service.batch_get(["a", "b", "c"], "token")
+
+    assert results == [(200, {"id": "a", "media_type": "IMAGE"}), (0, None), (200, None)]
+    await service.shutdown()
+
+
+async def test_batch_get_rejects_mismatched_length():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[{"code": 200, "body": media_body("a")}])
+
+    service = make_service(handler)
+    with pytest.raises(InstagramServerError):
+        await service.batch_get(["a", "b"], "token")
+    await service.shutdown()
+
+
+async def test_batch_get_rejects_undecodable_response():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=b"<html>")
+
+    service = make_service(handler)
+    with pytest.raises(InstagramServerError):
+        await service.batch_get(["a"], "token")
+    await service.shutdown()
+
+
+async def test_media_details_batched_keeps_input_order_and_errors():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[
+            {"code": 200, "body": media_body("a")},
+            None,
+            {"code": 400, "body": json.dumps({"error": {"message": "unsupported"}})},
+        ])
+
+    service = make_service(handler)
+    results = await service.get_media_details_batched(["a", "b", "c"], "token")
+
+    assert [result.media_id for result in results] == ["a", "b", "c"]
+    assert results[0].item.id == "a" and results[0].error is None
+    assert results[1].item is None and "status 0" in results[1].error
+    assert results[2].item is None and "unsupported" in results[2].error
+    await service.shutdown()
+
+
+async def test_profile_and_media_batched_splits_profile_from_media():
+    calls = []
+    service = make_service(echo_handler(calls))
+    media_ids = [f"m{i}" for i in range(INSTAGRAM_BATCH_MAX_REQUESTS)]
+
+    profile, media = await service.get_profile_and_media_batched(media_ids, "token")
+
+    assert calls == [INSTAGRAM_BATCH_MAX_REQUESTS, 1]
+    assert profile.username == "someone"
+    assert [result.item.id for result in media] == media_ids
+    await service.shutdown()
+
+
+async def test_profile_and_media_batched_raises_on_failed_profile():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[None, {"code": 200, "body": media_body("a")}])
+
+    service = make_service(handler)
+    with pytest.raises(InstagramAPIError):
+        await service.get_profile_and_media_batched(["a"], "token")
+    await service.shutdown()
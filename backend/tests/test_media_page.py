@@ -0,0 +1,74 @@
+"""Tests for the media page endpoint. Needs the database at DATABASE_URL."""
+
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.core.query_budget import QUERY_COUNT_HEADER
+from app.core.security import create_access_token
+from app.crud.user import user_crud
+from app.main import app
+from app.models.instagram import InstagramAccount, InstagramMedia
+from app.models.user import User
+
+
+@pytest.fixture
+async def account():
+    """A throwaway user and account with a few posts. Yields (user_id, account_id)."""
+    tag = uuid.uuid4().hex[:12]
+    async with AsyncSessionLocal() as db:
+        user = User(email=f"test-{tag}@example.com", username=f"test{tag}", hashed_password="-")
+        db.add(user)
+        await db.flush()
+        account = InstagramAccount(user_id=user.id, instagram_user_id=f"test{tag}", username=f"test{tag}", access_token="-")
+        db.add(account)
+        await db.flush()
+        db.add_all(
+            InstagramMedia(
+                account_id=account.id, instagram_media_id=f"test{tag}_{i}", media_type="IMAGE",
+                timestamp=datetime(2024, 1, 1) + timedelta(hours=i) if i % 2 else None
+            )
+            for i in range(5)
+        )
+        await db.commit()
+        user_id, account_id = user.id, account.id
+
+    yield user_id, account_id
+
+    async with AsyncSessionLocal() as db:
+        await user_crud.delete(db, user_id)
+    await engine.dispose()
+
+
+@pytest.fixture
+def raise_on_query_budget(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_MODE", "raise")
+
+
+async def test_media_pages_run_one_query(account, raise_on_query_budget):
+    user_id, account_id = account
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+    url = f"/api/v1/instagram/accounts/{account_id}/media"
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # Warm the auth cache so only the page query is left
+        await client.get(url, headers=headers, params={"limit": 1})
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            response = await client.get(url, headers=headers, params=params)
+            assert response.status_code == 200
+            assert response.headers[QUERY_COUNT_HEADER] == "1"
+            page = response.json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert len(seen) == len(set(seen)) == 5
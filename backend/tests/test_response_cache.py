@@ -0,0 +1,141 @@
+"""Tests for the versioned single-flight response cache."""
+
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import MemoryCacheBackend, ResponseCache
+
+
+class Payload(BaseModel):
+    value: int
+
+
+class FlakyBackend(MemoryCacheBackend):
+    """In-memory backend that raises like an unreachable Redis while `down` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+    async def get(self, key):
+        self._check()
+        return await super().get(key)
+
+    async def set(self, key, value, ttl):
+        self._check()
+        await super().set(key, value, ttl)
+
+    async def add(self, key, value, ttl):
+        self._check()
+        return await super().add(key, value, ttl)
+
+    async def delete(self, key):
+        self._check()
+        await super().delete(key)
+
+    def _check(self):
+        if self.down:
+            raise ConnectionRefusedError("backend down")
+
+
+def counting_compute(calls: list, value: int = 1):
+    async def compute():
+        calls.append(value)
+        return Payload(value=value)
+    return compute
+
+
+def make_cache(backend=None, **kwargs) -> ResponseCache:
+    return ResponseCache(backend or MemoryCacheBackend(), ttl=60, lock_timeout=1, **kwargs)
+
+
+def test_key_depends_on_every_data_version():
+    key = ResponseCache.make_key("ns", 1, {1: 3, 2: 5}, {"days": 30})
+
+    assert key == ResponseCache.make_key("ns", 1, {2: 5, 1: 3}, {"days": 30})
+    assert key != ResponseCache.make_key("ns", 1, {1: 3, 2: 6}, {"days": 30})
+    assert key != ResponseCache.make_key("ns", 1, {1: 3}, {"days": 30})
+    assert key != ResponseCache.make_key("ns", 1, {1: 3, 2: 5}, {"days": 7})
+
+
+async def test_new_data_version_recomputes():
+    cache = make_cache()
+    calls = []
+
+    for versions in ({1: 1}, {1: 1}, {1: 2}, {1: 2}):
+        await cache.get_or_compute("ns", 1, versions, {}, counting_compute(calls), Payload)
+
+    assert len(calls) == 2
+    assert cache.stats["hits"] == 2
+
+
+async def test_concurrent_misses_compute_once():
+    cache = make_cache()
+    release = asyncio.Event()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await release.wait()
+        return Payload(value=7)
+
+    tasks = [
+        asyncio.create_task(cache.get_or_compute("ns", 1, {1: 1}, {}, compute, Payload))
+        for _ in range(5)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert [result.value for result in results] == [7] * 5
+    assert calls == [1]
+    assert cache.stats["coalesced"] == 4
+
+
+async def test_waiter_takes_over_a_cancelled_computation():
+    cache = make_cache()
+    started = asyncio.Event()
+
+    async def never_finishes():
+        started.set()
+        await asyncio.Event().wait()
+
+    leader = asyncio.create_task(cache.get_or_compute("ns", 1, {1: 1}, {}, never_finishes, Payload))
+    await started.wait()
+    calls = []
+    waiter = asyncio.create_task(
+        cache.get_or_compute("ns", 1, {1: 1}, {}, counting_compute(calls, 9), Payload)
+    )
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert (await waiter).value == 9
+    assert calls == [9]
+    assert not cache._inflight
+
+
+async def test_backend_outage_falls_back_and_recovers():
+    backend = FlakyBackend()
+    cache = make_cache(backend, retry_after=0.05)
+    calls = []
+
+    backend.down = True
+    await cache.get_or_compute("ns", 1, {1: 1}, {}, counting_compute(calls), Payload)
+    await cache.get_or_compute("ns", 1, {1: 1}, {}, counting_compute(calls), Payload)
+
+    assert len(calls) == 1
+    assert cache.stats["backend_errors"] == 1
+    assert not cache.get_stats()["backend_available"]
+    assert not backend._entries
+
+    backend.down = False
+    await asyncio.sleep(0.06)
+    await cache.get_or_compute("ns", 1, {1: 2}, {}, counting_compute(calls), Payload)
+
+    assert len(calls) == 2
+    assert cache.get_stats()["backend_available"]
+    assert [key for key in backend._entries if ":v2:" in key]
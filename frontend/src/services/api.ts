@@ -199,7 +199,8 @@ class ApiService {
       throw new Error(error.detail || 'Failed to get Instagram media');
     }
 
-    return response.json();
+    const page: { items: InstagramMedia[]; next_cursor?: string | null } = await response.json();
+    return page.items;
   }
 
   async disconnectInstagramAccount(accountId: number): Promise<{ message: string }> {